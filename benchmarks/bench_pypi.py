@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+"""Benchmark of the uv.lock registry rewriting of `fast pypi`.
+
+Synthetic lock files with mixed registries and download hosts are generated,
+then both the old whole-file read-and-replace (inlined here as the baseline,
+so that it can be compared with any commit) and the streaming rewrite of
+`fast pypi` are measured for throughput and peak memory.
+
+Usage::
+
+    python benchmarks/bench_pypi.py --output baseline.json
+    # After some changes
+    python benchmarks/bench_pypi.py --compare baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+PYPI = "https://pypi.org/simple"
+HOST = "https://files.pythonhosted.org"
+
+MIRRORS = [
+    ("https://pypi.tuna.tsinghua.edu.cn/simple/", "https://pypi.tuna.tsinghua.edu.cn"),
+    ("https://mirrors.aliyun.com/pypi/simple/", "https://mirrors.aliyun.com/pypi"),
+    ("https://pypi.org/simple", "https://files.pythonhosted.org"),
+]
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+MIN_DELTA = {"seconds": 0.01, "peak_mb": 0.1}
+
+
+def generate_lock(path: Path, packages: int) -> None:
+    """Write a uv.lock like file with `packages` entries"""
+    with path.open("w", encoding="utf-8") as f:
+        f.write('version = 1\nrevision = 3\nrequires-python = ">=3.9"\n')
+        for i in range(packages):
+            registry, host = MIRRORS[i % len(MIRRORS)]
+            digest = f"{i:064x}"
+            prefix = f"{host}/packages/{digest[:2]}/{digest[2:4]}/{digest[4:]}"
+            extra = f', size = {1000 + i}, upload-time = "2024-01-10T00:56:10.189Z"'
+            extra = extra if i % 2 else ""
+            f.write(
+                f'\n[[package]]\nname = "package-{i}"\nversion = "1.0.{i}"\n'
+                f'source = {{ registry = "{registry}" }}\n'
+                f'sdist = {{ url = "{prefix}/package-{i}.tar.gz", '
+                f'hash = "sha256:{digest}"{extra} }}\n'
+                "wheels = [\n"
+                f'    {{ url = "{prefix}/package_{i}-py3-none-any.whl", '
+                f'hash = "sha256:{digest}"{extra} }},\n'
+                "]\n"
+            )
+
+
+def rewrite_text(p: Path) -> None:
+    """The implementation before streaming: read, replace and write whole file"""
+    text = p.read_text("utf-8")
+    registry_pattern = r'(registry = ")(.*?)"'
+    download_pattern = r'(url = ")(https?://.*?)(/packages/.*?\.)(gz|whl|zip)"'
+    registry_urls = {i[1] for i in re.findall(registry_pattern, text)}
+    download_hosts = {i[1] for i in re.findall(download_pattern, text)}
+    if registry_urls == {PYPI} and download_hosts == {HOST}:
+        return
+    text = re.sub(registry_pattern, rf'\1{PYPI}"', text)
+    text = re.sub(download_pattern, rf'\1{HOST}\3\4"', text)
+    text = re.sub(r', size = \d+, upload-time = ".*?"', "", text)
+    p.write_text(text, encoding="utf-8")
+
+
+def rewrite_stream(p: Path) -> None:
+    # Imported here, so the baseline still runs at commits without streaming
+    from fast_dev_cli.commands.pypi import UvPypi
+
+    UvPypi.rewrite_lock(p, PYPI, HOST, slim=True)
+
+
+CASES: dict[str, Callable[[Path], None]] = {
+    "text": rewrite_text,
+    "stream": rewrite_stream,
+}
+
+
+def measure(
+    func: Callable[[Path], None], source: Path, target: Path, repeat: int
+) -> dict[str, float]:
+    seconds = []
+    for _ in range(repeat):
+        shutil.copyfile(source, target)
+        start = time.perf_counter()
+        func(target)
+        seconds.append(time.perf_counter() - start)
+    # Measure memory in another round, as tracing slows down the function
+    shutil.copyfile(source, target)
+    tracemalloc.start()
+    try:
+        func(target)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    size = source.stat().st_size / 1024 / 1024
+    best = min(seconds)
+    return {
+        "seconds": round(best, 4),
+        "mb_per_s": round(size / best, 2),
+        "peak_mb": round(peak / 1024 / 1024, 2),
+        "lock_mb": round(size, 2),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(sizes: list[int], cases: list[str], repeat: int) -> dict[str, Any]:
+    results: dict[str, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as d:
+        target = Path(d, "uv.lock")
+        for packages in sizes:
+            source = Path(d, f"uv-{packages}.lock")
+            generate_lock(source, packages)
+            for name in cases:
+                key = f"{name}-{packages}"
+                try:
+                    result = measure(CASES[name], source, target, repeat)
+                except (ImportError, AttributeError) as e:
+                    print(f"{key:<14}skipped, not available at this commit: {e}")
+                    continue
+                results[key] = result
+                print(
+                    f"{key:<14}{result['lock_mb']:>9.2f}MB{result['seconds']:>9.3f}s"
+                    f"{result['mb_per_s']:>10.2f}MB/s{result['peak_mb']:>10.2f}MB peak"
+                )
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> int:
+    """Print the ratios to baseline, return count of regressions"""
+    regressions = 0
+    commit = baseline.get("meta", {}).get("commit") or "baseline"
+    print(f"\nCompare with {commit} (threshold: {threshold:.0%})")
+    for key, old in baseline.get("results", {}).items():
+        if (new := current["results"].get(key)) is None:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            if not old.get(metric):
+                continue
+            ratio = new[metric] / old[metric]
+            mark = ""
+            # Ignore jitter of the tiny numbers
+            if ratio > 1 + threshold and new[metric] - old[metric] > MIN_DELTA[metric]:
+                mark = "  <-- regression"
+                regressions += 1
+            print(
+                f"{key:<14}{metric:<9}{old[metric]:>10}{new[metric]:>10}{ratio:>8.2f}x{mark}"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Package counts"
+    )
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3, help="Take the best of N")
+    parser.add_argument("--output", type=Path, help="Save results as json")
+    parser.add_argument("--compare", type=Path, help="Results json of baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Allowed slowdown ratio"
+    )
+    args = parser.parse_args()
+    current = run(list(args.sizes), args.cases, args.repeat)
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2))
+        print(f"Results saved to {args.output}")
+    if args.compare and compare(
+        current, json.loads(args.compare.read_text()), args.threshold
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
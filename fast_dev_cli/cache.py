@@ -0,0 +1,350 @@
+"""Persistent cache of project detection results.
+
+Detecting the manage tool of a project needs to stat the lock files and parse
+pyproject.toml, getting the version of a tool even spawns a subprocess. The
+results are saved to a json file in the user cache dir, keyed by the mtime and
+size of the files they depend on, so they are recomputed automatically after
+any of those files changed.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, ClassVar
+
+from .profiling import profiled
+from .utils import ShellCommandError, capture_cmd_output, load_bool
+
+CACHE_FILE = "detection.json"
+
+
+def get_cache_dir() -> Path:
+    if d := os.getenv("FASTDEVCLI_CACHE_DIR"):
+        return Path(d)
+    if sys.platform == "win32" and (d := os.getenv("LOCALAPPDATA")):
+        return Path(d, "fast-dev-cli", "Cache")
+    if d := os.getenv("XDG_CACHE_HOME"):
+        return Path(d, "fast-dev-cli")
+    return Path.home() / ".cache" / "fast-dev-cli"
+
+
+def make_ignored_dir(directory: Path) -> None:
+    """Create the directory with a `.gitignore` that excludes all of its content"""
+    directory.mkdir(parents=True, exist_ok=True)
+    if not (ignore := directory / ".gitignore").exists():
+        ignore.write_text("*\n")
+
+
+def file_signature(path: Path) -> list[int] | None:
+    """Return [mtime_ns, size] of the path, or None if it does not exist"""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class DetectionCache:
+    """Json file cache shared by all projects of current user.
+
+    Set `FASTDEVCLI_NO_CACHE=1` to disable it.
+    """
+
+    _data: ClassVar[dict[str, Any] | None] = None
+    _changed: ClassVar[bool] = False
+
+    @staticmethod
+    def path() -> Path:
+        return get_cache_dir() / CACHE_FILE
+
+    @staticmethod
+    def disabled() -> bool:
+        return load_bool("FASTDEVCLI_NO_CACHE")
+
+    @classmethod
+    @profiled("cache")
+    def load(cls) -> dict[str, Any]:
+        if cls._data is None:
+            data: Any = None
+            with contextlib.suppress(OSError, ValueError):
+                data = json.loads(cls.path().read_bytes())
+            if not isinstance(data, dict):
+                data = {}
+            data.setdefault("projects", {})
+            data.setdefault("tools", {})
+            data.setdefault("which", {})
+            cls._data = data
+        return cls._data
+
+    @classmethod
+    def save(cls) -> None:
+        if not cls._changed or cls._data is None:
+            return
+        path = cls.path()
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(cls._data, indent=1), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            # Cache is optional, never fail the command because of it
+            tmp.unlink(missing_ok=True)
+        else:
+            cls._changed = False
+
+    @classmethod
+    def clear(cls) -> bool:
+        """Remove the cache file, return whether it existed"""
+        cls._data = None
+        cls._changed = False
+        try:
+            cls.path().unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    @classmethod
+    def get(cls, section: str, name: str, key: list[Any]) -> dict[str, Any] | None:
+        if cls.disabled():
+            return None
+        item = cls.load()[section].get(name)
+        if item is None or item.get("key") != key:
+            return None
+        return item
+
+    @classmethod
+    def set(cls, section: str, name: str, key: list[Any], **values: Any) -> None:
+        if cls.disabled():
+            return
+        items = cls.load()[section]
+        item = items.get(name)
+        if item is None or item.get("key") != key:
+            item = items[name] = {"key": key}
+        item.update(values)
+        cls._changed = True
+        cls.save()
+
+    @staticmethod
+    def project_key(root_dir: Path, toml_file: Path) -> list[Any]:
+        # Creating or deleting a lock file changes the mtime of the directory
+        env = [
+            os.getenv(name, "")
+            for name in (
+                "FASTDEVCLI_SKIP_UV",
+                "FASTDEVCLI_PREFER_POETRY",
+                "FASTDEVCLI_PREFER_uv",
+            )
+        ]
+        return [file_signature(toml_file), file_signature(root_dir), env]
+
+    @classmethod
+    def tool_version(cls, command: str) -> str | None:
+        """Return cached output of `<command> --version`"""
+        if (key := cls._tool_key(command)) is None:
+            return None
+        if (item := cls.get("tools", command, key)) is None:
+            return None
+        return item.get("version")
+
+    @classmethod
+    def set_tool_version(cls, command: str, output: str) -> None:
+        if (key := cls._tool_key(command)) is not None:
+            cls.set("tools", command, key, version=output)
+
+    @classmethod
+    def get_tool_version(cls, command: str) -> str:
+        """Output of `<command> --version`, cached if command is an executable"""
+        if (text := cls.tool_version(command)) is None:
+            try:
+                text = capture_cmd_output(f"{command} --version", raises=True)
+            except ShellCommandError as e:
+                # Not cache the error, it may be fixed without touching the file
+                return str(e).strip()
+            cls.set_tool_version(command, text)
+        return text
+
+    @classmethod
+    def _tool_key(cls, command: str) -> list[Any] | None:
+        # Commands like `uvx poetry` may resolve to another version at any time
+        if " " in command.strip() or not (exe := shutil.which(command)):
+            return None
+        return cls.executable_key(exe)
+
+    @staticmethod
+    def executable_key(exe: str) -> list[Any] | None:
+        """Key of the real file of executable, None if it is a shim
+
+        Shims of pyenv/asdf/mise are not changed when the tool behind them is
+        upgraded, so the results of them can not be cached.
+        """
+        real = os.path.realpath(exe)
+        if Path(real).parent.name == "shims":
+            return None
+        return [exe, real, file_signature(Path(real))]
+
+
+class ResultCache:
+    """Marks of commands that passed with the same inputs, one file per key.
+
+    The directory can be persisted by CI to skip the unchanged checks.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def default_dir(cls, root: Path) -> Path:
+        if d := os.getenv("FASTDEVCLI_CHECK_CACHE_DIR"):
+            return Path(d)
+        return root / ".fast_cache" / "check"
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        text = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    @staticmethod
+    def hash_files(paths: Iterable[Path]) -> str:
+        """Digest of the names and contents of the files"""
+        digest = hashlib.sha256()
+        for path in sorted(paths):
+            digest.update(path.as_posix().encode())
+            digest.update(b"\0")
+            try:
+                digest.update(hashlib.sha256(path.read_bytes()).digest())
+            except OSError:
+                digest.update(b"-")
+        return digest.hexdigest()
+
+    def hit(self, key: str) -> bool:
+        if self.directory.joinpath(key).exists():
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, key: str) -> None:
+        with contextlib.suppress(OSError):
+            make_ignored_dir(self.directory.parent)
+            self.directory.mkdir(exist_ok=True)
+            self.directory.joinpath(key).touch()
+
+    def clear(self) -> int:
+        """Remove all marks, return the number of them"""
+        count = 0
+        if self.directory.is_dir():
+            for path in self.directory.iterdir():
+                path.unlink()
+                count += 1
+        return count
+
+    def count(self) -> int:
+        if not self.directory.is_dir():
+            return 0
+        return sum(1 for _ in self.directory.iterdir())
+
+
+class IndexCache:
+    """Stable versions of packages fetched from a package index, one file each.
+
+    Entries older than `FASTDEVCLI_INDEX_TTL` seconds(default to one day) are
+    fetched again unless offline, the least recently fetched ones are evicted
+    when there are more than `max_entries` of them.
+    """
+
+    TTL = 24 * 60 * 60
+    MAX_ENTRIES = 2000
+
+    def __init__(self, url: str, ttl: float | None = None) -> None:
+        digest = hashlib.sha256(url.encode()).hexdigest()[:12]
+        self.directory = self.root_dir() / digest
+        if ttl is None:
+            try:
+                ttl = float(os.getenv("FASTDEVCLI_INDEX_TTL") or self.TTL)
+            except ValueError:
+                ttl = self.TTL
+        self.ttl = ttl
+        self.max_entries = self.MAX_ENTRIES
+
+    @staticmethod
+    def root_dir() -> Path:
+        return get_cache_dir() / "index"
+
+    def _path(self, name: str) -> Path:
+        return self.directory / f"{name}.json"
+
+    def get(
+        self, name: str, offline: bool = False
+    ) -> tuple[list[str], dict[str, list[str]]] | None:
+        """Cached versions and their `requires-python`, None if missing or
+        expired(always valid if offline)
+        """
+        if DetectionCache.disabled():
+            return None
+        path = self._path(name)
+        try:
+            if not offline and time.time() - path.stat().st_mtime > self.ttl:
+                return None
+            data = json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or not isinstance(data.get("versions"), list):
+            return None
+        # Entries saved before `requires-python` was recorded
+        if not isinstance(requires := data.get("requires_python"), dict):
+            if not offline:
+                return None
+            requires = {}
+        return data["versions"], requires
+
+    def set(
+        self, name: str, versions: list[str], requires_python: dict[str, list[str]]
+    ) -> None:
+        if DetectionCache.disabled():
+            return
+        path = self._path(name)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            data = {
+                "name": name,
+                "versions": versions,
+                "requires_python": requires_python,
+            }
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+
+    def evict(self) -> int:
+        """Remove the oldest entries exceed `max_entries`, return count of them"""
+        try:
+            paths = [(p.stat().st_mtime, p) for p in self.directory.glob("*.json")]
+        except OSError:
+            return 0
+        if (extra := len(paths) - self.max_entries) <= 0:
+            return 0
+        for _, path in sorted(paths)[:extra]:
+            path.unlink(missing_ok=True)
+        return extra
+
+    @classmethod
+    def count(cls) -> int:
+        return sum(1 for _ in cls.root_dir().glob("*/*.json"))
+
+    @classmethod
+    def clear(cls) -> int:
+        """Remove cached versions of all indexes, return the number of them"""
+        count = cls.count()
+        shutil.rmtree(cls.root_dir(), ignore_errors=True)
+        return count
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, MutableMapping
+from importlib import import_module
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import typer
+from typer import Exit, Option, echo
+from typer.core import TyperGroup
+from typer.main import get_group
+
+from .. import __version__
+from ..profiling import Profiler
+from ..utils import load_bool
+
+if TYPE_CHECKING:
+    from typer.core import TyperCommand
+
+# Command name -> module in this package, keep the order of `fast --help`
+COMMAND_MODULES: dict[str, str] = {
+    "version": "version",
+    "bump": "bump",
+    "upgrade": "upgrade",
+    "tag": "tag",
+    "lint": "lint",
+    "check": "lint",
+    "sync": "sync",
+    "test": "test",
+    "upload": "upload",
+    "dev": "dev",
+    "exec": "exec",
+    "deps": "deps",
+    "pypi": "pypi",
+    "cache": "cache",
+    "doctor": "doctor",
+    "dmypy": "dmypy",
+    "watch": "watch",
+}
+
+
+def load_command(name: str) -> TyperCommand:
+    """Import the module that defines the subcommand and build it"""
+    module = import_module(f"{__name__}.{COMMAND_MODULES[name]}")
+    group = get_group(module.cli)
+    return group.commands[name]  # type:ignore[return-value]
+
+
+class LazyCommands(MutableMapping[str, Any]):
+    """Commands mapping that only import the module of a command when accessed"""
+
+    def __init__(self, names: list[str]) -> None:
+        self._names = names
+        self._loaded: dict[str, Any] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return self._loaded[name]
+        except KeyError:
+            if name not in self._names:
+                raise
+        command = self._loaded[name] = load_command(name)
+        return command
+
+    def __setitem__(self, name: str, command: Any) -> None:
+        if name not in self._names:
+            self._names.append(name)
+        self._loaded[name] = command
+
+    def __delitem__(self, name: str) -> None:
+        self._names.remove(name)
+        self._loaded.pop(name, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._names
+
+
+class LazyGroup(TyperGroup):
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        commands = LazyCommands(list(COMMAND_MODULES))
+        commands.update(self.commands)
+        self.commands = commands
+
+
+cli = typer.Typer(cls=LazyGroup, no_args_is_help=True)
+
+
+def version_callback(value: bool) -> None:
+    if value:
+        echo("Fast Dev Cli Version: " + typer.style(__version__, bold=True))
+        raise Exit()
+
+
+@cli.callback()
+def common(
+    version: bool = Option(
+        None,
+        "--version",
+        "-V",
+        callback=version_callback,
+        is_eager=True,
+        help="Show the version of this tool",
+    ),
+    profile: bool = Option(
+        False,
+        "--profile",
+        help="Print time spent by each phase and subprocess at exit"
+        " (or set FASTDEVCLI_PROFILE=1)",
+    ),
+    trace_file: str | None = Option(
+        None,
+        "--trace-file",
+        envvar="FASTDEVCLI_TRACE_FILE",
+        help="Save the timeline as Chrome Trace json, which can be opened by"
+        " https://ui.perfetto.dev",
+    ),
+) -> None:
+    trace = Path(trace_file) if isinstance(trace_file, str) and trace_file else None
+    if profile is True or load_bool("FASTDEVCLI_PROFILE"):
+        Profiler.enable(trace_file=trace)
+    elif trace is not None:
+        Profiler.enable(report=False, trace_file=trace)
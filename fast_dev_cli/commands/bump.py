@@ -0,0 +1,774 @@
+from __future__ import annotations
+
+import contextlib
+import fnmatch
+import importlib.metadata as importlib_metadata
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
+from typing import Any, Literal, cast, overload
+
+import typer
+from typer import Exit, Option, echo, secho
+
+from ..git import GitQuery
+from ..project import Project, ProjectContext
+from ..utils import (
+    TOML_FILE,
+    DryOption,
+    DryRun,
+    EnvError,
+    FastDevCliError,
+    ParseError,
+    ShellCommandError,
+    StrEnum,
+    _ensure_bool,
+    _quote_shell_arg,
+    capture_cmd_output,
+    is_emoji,
+    load_bool,
+    poetry_module_name,
+    yellow_warn,
+)
+
+cli = typer.Typer()
+
+BUMP_MESSAGE = "Bump version: {} \u2192 {}"
+BUMP_EMOJI = "\u2b06\ufe0f  "
+# Tables of pyproject.toml that the version item of the project belongs to
+VERSION_TABLES = ("project", "tool.poetry")
+
+
+def _parse_version(line: str, pattern: re.Pattern[str]) -> str:
+    return pattern.sub("", line).split("#")[0].strip().strip(" '\"")
+
+
+def read_version_from_file(
+    package_name: str, work_dir: Path | None = None, toml_text: str | None = None
+) -> str:
+    if not package_name and toml_text:
+        pattern = re.compile(r"version\s*=")
+        for line in toml_text.splitlines():
+            if pattern.match(line):
+                return _parse_version(line, pattern)
+    version_file = BumpUp.parse_filename(toml_text, work_dir, package_name)
+    if version_file == TOML_FILE:
+        return version_in_toml(Project.load_toml(toml_text))
+    text = ProjectContext.current().read_text(Path(version_file))
+    return version_in_text(text, version_file)
+
+
+def version_in_toml(context: dict[str, Any]) -> str:
+    with contextlib.suppress(KeyError):
+        return cast(str, context["project"]["version"])
+    with contextlib.suppress(KeyError):  # Poetry V1
+        return cast(str, context["tool"]["poetry"]["version"])
+    secho(f"WARNING: can not find 'version' item in {TOML_FILE}!")
+    return "0.0.0"
+
+
+def version_in_text(text: str, version_file: str) -> str:
+    pattern = re.compile(r"__version__\s*=")
+    all_lines = text.strip().splitlines()
+    for line in all_lines:
+        if pattern.match(line):
+            return _parse_version(line, pattern)
+    pattern = re.compile(r"VERSION\s*=")
+    for line in all_lines:
+        if pattern.match(line):
+            return _parse_version(line, pattern)
+    secho(f"WARNING: can not find version pattern in {version_file}!")
+    return "0.0.0"
+
+
+def _get_frontend_version() -> tuple[Path, str] | None:
+    try:
+        frontend_version_file = Project.get_work_dir("package.json", be_file=True)
+    except EnvError:
+        return None
+    try:
+        from asynctor.jsons import json_loads
+    except ImportError:
+        from json import loads as json_loads  # type:ignore[assignment]
+    content = frontend_version_file.read_bytes()
+    metadata: dict[str, str] = json_loads(content)  # type:ignore
+    try:
+        current_version = metadata["version"]
+    except (KeyError, TypeError):
+        return None
+    with contextlib.suppress(ValueError):
+        frontend_version_file = frontend_version_file.relative_to(Path.cwd())
+    return frontend_version_file, current_version
+
+
+def _toml_table(text: str, pos: int) -> str:
+    headers = re.findall(r"^[ \t]*\[+\s*([^\[\]]+?)\s*\]+", text[:pos], re.MULTILINE)
+    return headers[-1] if headers else ""
+
+
+def find_version_span(filename: str, text: str, version: str) -> tuple[int, int] | None:
+    """Position of the version value in content of the version file"""
+    v = re.escape(version)
+    value = rf"""(?P<q>["'])(?P<v>{v})(?P=q)"""
+    if filename.endswith(".json"):
+        patterns = [rf'"version"\s*:\s*"(?P<v>{v})"']
+    elif filename.endswith(".toml"):
+        patterns = [rf"^[ \t]*version\s*=\s*{value}"]
+    else:
+        patterns = [
+            rf"^{name}\s*(?::\s*\w+\s*)?=\s*{value}"
+            for name in ("__version__", "VERSION")
+        ]
+    for pattern in patterns:
+        for m in re.finditer(pattern, text, re.MULTILINE):
+            if not filename.endswith(".toml") or (
+                _toml_table(text, m.start()) in VERSION_TABLES
+            ):
+                return m.span("v")
+    return None
+
+
+def replace_version(path: Path, current: str, new: str) -> None:
+    """Rewrite the version value in file, other content is kept as it is"""
+    # Decode bytes instead of read_text, so that line endings are not changed
+    text = path.read_bytes().decode("utf-8")
+    if (span := find_version_span(path.name, text, current)) is None:
+        raise ParseError(f"Version {current!r} not found in {path}")
+    start, end = span
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes((text[:start] + new + text[end:]).encode("utf-8"))
+        shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+@overload
+def get_current_version(
+    verbose: bool = False,
+    is_poetry: bool | None = None,
+    package_name: str | None = None,
+    *,
+    check_version: Literal[False] = False,
+) -> str: ...
+
+
+@overload
+def get_current_version(
+    verbose: bool = False,
+    is_poetry: bool | None = None,
+    package_name: str | None = None,
+    *,
+    check_version: Literal[True],
+) -> tuple[bool, str]: ...
+
+
+def get_current_version(
+    verbose: bool = False,
+    is_poetry: bool | None = None,
+    package_name: str | None = None,
+    *,
+    check_version: bool = False,
+) -> str | tuple[bool, str]:
+    if is_poetry is True or Project.manage_by_poetry():
+        out = _get_poetry_project_version(verbose)
+        if check_version:
+            return True, out
+        return out
+    toml_text = work_dir = None
+    if package_name is None:
+        try:
+            context = ProjectContext.current()
+        except EnvError:
+            if (res := _get_frontend_version()) is None:
+                raise
+            current_version = res[1]
+            if check_version:
+                return False, current_version
+            return current_version
+        else:
+            work_dir, toml_text = context.root_dir, context.text
+            package_name = context.package_name
+    local_version = read_version_from_file(package_name, work_dir, toml_text)
+    try:
+        installed_version = importlib_metadata.version(package_name)
+    except importlib_metadata.PackageNotFoundError:
+        installed_version = ""
+    current_version = local_version or installed_version
+    if not current_version:
+        raise FastDevCliError(f"Failed to get current version of {package_name!r}")
+    if check_version:
+        is_conflict = bool(local_version) and local_version != installed_version
+        return is_conflict, current_version
+    return current_version
+
+
+def _get_poetry_project_version(verbose: bool) -> str:
+    cmd = ["poetry", "version", "-s"]
+    if verbose:
+        echo(f"--> {' '.join(cmd)}")
+    if out := capture_cmd_output(cmd, raises=True):
+        out = out.splitlines()[-1].strip().split()[-1]
+    return out
+
+
+class BumpUp(DryRun):
+    class PartChoices(StrEnum):
+        patch = "patch"
+        minor = "minor"
+        major = "major"
+
+    def __init__(
+        self,
+        commit: bool,
+        part: str,
+        filename: str | None = None,
+        dry: bool = False,
+        no_sync: bool = False,
+        emoji: bool | None = None,
+        bumpversion: bool | None = None,
+    ) -> None:
+        self.commit = commit
+        self.part = part
+        if filename is None:
+            try:
+                filename = ProjectContext.current().version_file
+            except EnvError:
+                if (res := _get_frontend_version()) is not None:
+                    filename = res[0].name
+                else:
+                    raise
+        self.filename = filename
+        self._no_sync = no_sync
+        self._emoji = emoji
+        if bumpversion is None:
+            bumpversion = load_bool("FASTDEVCLI_BUMPVERSION")
+        self.use_bumpversion = bumpversion
+        self.versions: tuple[str, str] | None = None
+        self.git = GitQuery()
+        super().__init__(dry=dry)
+
+    @staticmethod
+    def get_last_commit_message(
+        raises: bool = False, git: GitQuery | None = None
+    ) -> str:
+        try:
+            return (git or GitQuery()).last_commit_subject()
+        except ShellCommandError:
+            if raises:
+                raise
+            return ""
+
+    @classmethod
+    def should_add_emoji(cls, git: GitQuery | None = None) -> bool:
+        """
+        If last commit message is startswith emoji,
+        add a ⬆️ flag at the prefix of bump up commit message.
+        """
+        try:
+            first_char = cls.get_last_commit_message(raises=True, git=git)[0]
+        except (IndexError, ShellCommandError):
+            return False
+        else:
+            return is_emoji(first_char)
+
+    @staticmethod
+    def parse_dynamic_version(
+        toml_text: str | None,
+        context: dict[str, Any],
+        work_dir: Path | None = None,
+    ) -> str | None:
+        if work_dir is None:
+            work_dir = ProjectContext.current().root_dir
+        for tool in ("pdm", "hatch"):
+            with contextlib.suppress(KeyError):
+                version_path = cast(str, context["tool"][tool]["version"]["path"])
+                if (
+                    Path(version_path).exists()
+                    or work_dir.joinpath(version_path).exists()
+                ):
+                    return version_path
+        # e.g.: version = { source = "file", path = "fast_dev_cli/__init__.py" }
+        v_key = "version = "
+        p_key = 'path = "'
+        if toml_text is None:
+            toml_text = Project.load_toml_text()
+        for line in toml_text.splitlines():
+            if not line.startswith(v_key):
+                continue
+            if p_key in (value := line.split(v_key, 1)[-1].split("#")[0]):
+                filename = value.split(p_key, 1)[-1].split('"')[0]
+                if work_dir.joinpath(filename).exists():
+                    return filename
+        return None
+
+    @classmethod
+    def parse_filename(
+        cls,
+        toml_text: str | None = None,
+        work_dir: Path | None = None,
+        package_name: str | None = None,
+        context: dict[str, Any] | None = None,
+        root: Path | None = None,
+    ) -> str:
+        """Path of the file that defines version of the project
+
+        :param root: directory of the project and the returned path is relative
+            to, default to the current project and the current directory
+        """
+        if context is None:
+            context = Project.load_toml(toml_text)
+        is_dynamic_version = False
+        with contextlib.suppress(KeyError):
+            if "version" in context["project"]["dynamic"]:
+                is_dynamic_version = True
+        if is_dynamic_version:
+            if filename := cls.parse_dynamic_version(toml_text, context, work_dir):
+                return filename
+            yellow_warn("Failed to find version file for this dynamic version project.")
+        by_version_plugin = False
+        try:
+            ver = context["project"]["version"]
+        except KeyError:
+            pass
+        else:
+            if isinstance(ver, str):
+                if ver in ("0", "0.0.0"):
+                    by_version_plugin = True
+                elif re.match(r"\d+\.\d+\.\d+", ver):
+                    return TOML_FILE
+        if not by_version_plugin:
+            try:
+                version_value = context["tool"]["poetry"]["version"]
+            except KeyError:
+                if root is None:
+                    by_poetry = Project.manage_by_poetry()
+                else:
+                    by_poetry = ProjectContext.current(root).manage_tool == "poetry"
+                if not by_poetry and (
+                    filename := cls.parse_dynamic_version(toml_text, context, work_dir)
+                ):
+                    return filename
+            else:
+                by_version_plugin = version_value in ("0", "0.0.0", "init")
+        if by_version_plugin:
+            return cls.parse_plugin_version(context, package_name, root)
+        return TOML_FILE
+
+    @staticmethod
+    def parse_plugin_version(
+        context: dict[str, Any], package_name: str | None, root: Path | None = None
+    ) -> str:
+        try:
+            package_item = context["tool"]["poetry"]["packages"]
+        except KeyError:
+            try:
+                project_name = context["project"]["name"]
+            except KeyError:
+                packages: list[tuple[str, str]] = []
+            else:
+                packages = [(poetry_module_name(project_name), "")]
+        else:
+            packages = [
+                (j, i.get("from", "")) for i in package_item if (j := i.get("include"))
+            ]
+        # In case of managed by `poetry-plugin-version`
+        cwd = root or Path.cwd()
+        pattern = re.compile(r"__version__\s*=\s*['\"]")
+        ds: list[Path] = []
+        if package_name is not None:
+            packages.insert(0, (package_name, ""))
+        for pack_name, source_dir in packages:
+            ds.append(cwd / pack_name)
+            ds.append(cwd / "src" / pack_name)
+            if source_dir and source_dir != "src":
+                ds.append(cwd / source_dir / pack_name)
+        module_name = poetry_module_name(cwd.name)
+        ds.extend([cwd / module_name, cwd / "src" / module_name, cwd])
+        for d in ds:
+            init_file = d / "__init__.py"
+            if (init_file.exists() and pattern.search(init_file.read_text("utf8"))) or (
+                (init_file := init_file.with_name("__version__.py")).exists()
+                and pattern.search(init_file.read_text("utf8"))
+            ):
+                break
+        else:
+            raise ParseError("Version file not found! Where are you now?")
+        return os.path.relpath(init_file, cwd)
+
+    def get_part(self, s: str) -> str:
+        choices: dict[str, str] = {}
+        for i, p in enumerate(self.PartChoices, 1):
+            v = str(p)
+            choices.update({str(i): v, v: v})
+        try:
+            return choices[s]
+        except KeyError as e:
+            echo(f"Invalid part: {s!r}")
+            raise Exit(1) from e
+
+    @staticmethod
+    def parse_new_version(part: str, version: str) -> str:
+        version_parts = version.split(".")
+        if not version_parts[-1].isdigit():
+            try:
+                p1, p2, p3 = version_parts[:3]
+                p2i = int(p2)
+                p1i = int(p1)
+            except ValueError:
+                ...
+            else:
+                match part:
+                    case "patch":
+                        p3i = int(m.group()) if (m := re.match(r"\d+", p3)) else 0
+                        if len(version_parts) == 3:
+                            p3i += 1
+                        return f"{p1}.{p2}.{p3i}"
+                    case "minor":
+                        return f"{p1}.{p2i + 1}.0"
+                    case "major":
+                        return f"{p1i + 1}.0.0"
+        return ""
+
+    @classmethod
+    def next_version(cls, part: str, version: str) -> str:
+        if new_version := cls.parse_new_version(part, version):
+            return new_version
+        if not (m := re.match(r"(\d+)\.(\d+)\.(\d+)$", version)):
+            raise ParseError(f"Unsupported version format: {version!r}")
+        major, minor, patch = map(int, m.groups())
+        match part:
+            case "major":
+                return f"{major + 1}.0.0"
+            case "minor":
+                return f"{major}.{minor + 1}.0"
+        return f"{major}.{minor}.{patch + 1}"
+
+    def _should_add_emoji(self) -> bool:
+        return bool(
+            self._emoji or (self._emoji is None and self.should_add_emoji(self.git))
+        )
+
+    def gen_bumpversion(self, part: str, version: str) -> str:
+        parse = r'--parse "(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)"'
+        filename_arg = _quote_shell_arg(self.filename)
+        cmd = f'bumpversion {parse} --current-version="{version}" '
+        if new_version := self.parse_new_version(part, version):
+            cmd += f'--new-version="{new_version}" '
+        cmd += f"{part} {filename_arg}"
+        if self.commit:
+            if part != "patch":
+                cmd += " --tag"
+            cmd += " --commit"
+            if self._should_add_emoji():
+                cmd += " --message-emoji=1"
+            if not load_bool("DONT_GIT_PUSH"):
+                cmd += " && git push && git push --tags && git log -1"
+        else:
+            cmd += " --allow-dirty"
+        return cmd
+
+    def gen_git(self, part: str, version: str, new_version: str) -> str:
+        """Commit/tag/push commands the same as `bumpversion --commit --tag`"""
+        if not self.commit:
+            return ""
+        message = BUMP_MESSAGE.format(version, new_version)
+        if self._should_add_emoji():
+            message = BUMP_EMOJI + message
+        message = _quote_shell_arg(message)
+        cmd = (
+            f"git add --update {_quote_shell_arg(self.filename)}"
+            f" && git commit -m {message}"
+        )
+        if part != "patch":
+            cmd += f" && git tag -a v{new_version} -m {message}"
+        if not load_bool("DONT_GIT_PUSH"):
+            cmd += " && git push && git push --tags && git log -1"
+        return cmd
+
+    def gen(self) -> str:
+        should_sync, _version = get_current_version(check_version=True)
+        filename = self.filename
+        echo(f"Current version(@{filename}): {_version}")
+        if self.part:
+            part = self.get_part(self.part)
+        else:
+            part = "patch"
+            if a := input("Which one?").strip():
+                part = self.get_part(a)
+        self.part = part
+        if self.commit:
+            self.git.prefetch(GitQuery.LAST_SUBJECT, GitQuery.STATUS)
+        if self.use_bumpversion:
+            cmd = self.gen_bumpversion(part, _version)
+        else:
+            try:
+                new_version = self.next_version(part, _version)
+            except ParseError as e:
+                secho(f"{e} Try again with `--bumpversion`.", fg="red")
+                raise Exit(1) from e
+            self.versions = (_version, new_version)
+            cmd = self.gen_git(part, _version, new_version)
+        if (
+            should_sync
+            and not self._no_sync
+            and (sync := Project.get_sync_command(only_me=True))
+        ):
+            cmd = f"{sync} && {cmd}" if cmd else sync
+        return cmd
+
+    def rewrite(self) -> None:
+        """Change version in file by current process, instead of bumpversion"""
+        assert self.versions is not None, "`gen` should be called before rewrite"
+        current, new = self.versions
+        echo(f"--> Bump version(@{self.filename}): {current} \u2192 {new}")
+        if self.dry:
+            return
+        if self.commit:
+            check_clean(self.git)
+        try:
+            replace_version(Path(self.filename), current, new)
+        except (OSError, ParseError) as e:
+            secho(str(e), fg="red")
+            raise Exit(1) from e
+
+    def run(self) -> None:
+        if self.use_bumpversion:
+            super().run()
+        else:
+            plan = self.plan()
+            self.rewrite()
+            plan.finish(_exit=self._exit, dry=self.dry)
+        if not self.commit and not self.dry:
+            new_version = get_current_version(True)
+            echo(new_version)
+            if self.part != "patch":
+                echo("You may want to pin tag by `fast tag`")
+
+
+def check_clean(git: GitQuery) -> None:
+    """Exit if there are uncommitted changes, as `bumpversion --commit` does"""
+    try:
+        dirty = git.changes(untracked=False)
+    except ShellCommandError as e:
+        secho(str(e), fg="red")
+        raise Exit(1) from e
+    if dirty:
+        secho("Git working directory is not clean:", fg="red")
+        echo("\n".join(dirty))
+        raise Exit(1)
+
+
+def find_workspace_root() -> Path:
+    """The nearest parent directory that defines `[tool.uv.workspace]`"""
+    root = Project.get_work_dir(allow_cwd=True)
+    for path in (root, *root.parents):
+        toml_file = path / TOML_FILE
+        with contextlib.suppress(OSError):
+            if "[tool.uv.workspace]" in toml_file.read_text("utf-8"):
+                return path
+    return root
+
+
+def find_workspace_members(root: Path, patterns: list[str] | None = None) -> list[Path]:
+    """Directories of the projects in workspace, including root if it is a project
+
+    Members are globs of `--member` options or `[tool.uv.workspace] members`.
+    """
+    doc = ProjectContext.current(root).doc
+    workspace = doc.get("tool", {}).get("uv", {}).get("workspace", {})
+    excludes: list[str] = []
+    if not patterns:
+        patterns = workspace.get("members") or []
+        excludes = workspace.get("exclude") or []
+    members: dict[Path, None] = {}
+    if "project" in doc:
+        members[root] = None
+    for pattern in patterns:
+        projects = [p for p in sorted(root.glob(pattern)) if (p / TOML_FILE).is_file()]
+        if not projects:
+            raise ParseError(f"No project with {TOML_FILE} matches member {pattern!r}")
+        for path in projects:
+            name = path.relative_to(root).as_posix()
+            if not any(fnmatch.fnmatch(name, i.rstrip("/")) for i in excludes):
+                members[path] = None
+    return list(members)
+
+
+def _resolve_member(path: Path) -> tuple[str, str, str, str]:
+    """Package name, version file and version of a member project"""
+    try:
+        context = ProjectContext.current(path)
+        doc = context.doc
+        name = (
+            doc.get("project", {}).get("name")
+            or doc.get("tool", {}).get("poetry", {}).get("name")
+            or context.package_name
+        )
+        filename = BumpUp.parse_filename(
+            context.text, path, context.package_name, context=doc, root=path
+        )
+        if filename == TOML_FILE:
+            version = version_in_toml(doc)
+        else:
+            version = version_in_text(context.read_text(path / filename), filename)
+    except (OSError, FastDevCliError) as e:
+        return path.name, "", "", str(e) or type(e).__name__
+    return name, str(path / filename), version, ""
+
+
+class WorkspaceBump(DryRun):
+    """Bump versions of all projects in workspace, with only one commit"""
+
+    def __init__(
+        self,
+        part: str,
+        commit: bool,
+        members: list[str] | None = None,
+        emoji: bool | None = None,
+        dry: bool = False,
+    ) -> None:
+        self.part = part
+        self.commit = commit
+        self.members = members
+        self._emoji = emoji
+        self.bumps: list[tuple[str, Path, str, str]] = []
+        self.git = GitQuery()
+        super().__init__(dry=dry)
+
+    def resolve(self, paths: list[Path]) -> list[tuple[str, str, str, str]]:
+        # Only a few small files of each member are read, cheaper than spawning
+        return [_resolve_member(path) for path in paths]
+
+    def gen_git(self, bumps: list[tuple[str, Path, str, str]]) -> str:
+        if not self.commit:
+            return ""
+        subject = f"Bump version: {self.part} of {len(bumps)} packages"
+        if self._emoji or (self._emoji is None and BumpUp.should_add_emoji(self.git)):
+            subject = BUMP_EMOJI + subject
+        body = "\n".join(f"{name}: {old} \u2192 {new}" for name, _, old, new in bumps)
+        files = " ".join(_quote_shell_arg(os.path.relpath(p)) for _, p, _, _ in bumps)
+        cmd = (
+            f"git add --update {files} && git commit"
+            f" -m {_quote_shell_arg(subject)} -m {_quote_shell_arg(body)}"
+        )
+        if self.part != "patch":
+            for name, _, _, new in bumps:
+                tag = _quote_shell_arg(f"{name}-v{new}")
+                message = _quote_shell_arg(f"{name} {new}")
+                cmd += f" && git tag -a {tag} -m {message}"
+        if not load_bool("DONT_GIT_PUSH"):
+            cmd += " && git push && git push --tags && git log -1"
+        return cmd
+
+    def gen(self) -> str:
+        if self.commit:
+            self.git.prefetch(GitQuery.LAST_SUBJECT, GitQuery.STATUS)
+        root = find_workspace_root()
+        try:
+            paths = find_workspace_members(root, self.members)
+        except ParseError as e:
+            secho(str(e), fg="red")
+            raise Exit(1) from e
+        if not paths:
+            secho("No workspace members found, try `--member <glob>`", fg="red")
+            raise Exit(1)
+        resolved = self.resolve(paths)
+        bumps = self.bumps = []
+        failed = False
+        for name, filename, version, error in resolved:
+            if not error:
+                try:
+                    new_version = BumpUp.next_version(self.part, version)
+                except ParseError as e:
+                    error = str(e)
+            if error:
+                failed = True
+                secho(f"{name}: {error}", fg="red")
+                continue
+            bumps.append((name, Path(filename), version, new_version))
+            filename = os.path.relpath(filename)
+            echo(f"{name}(@{filename}): {version} \u2192 {new_version}")
+        if failed:
+            raise Exit(1)
+        return self.gen_git(bumps)
+
+    def run(self) -> None:
+        plan = self.plan()
+        if self.dry:
+            plan.finish(dry=True)
+            return
+        if self.commit:
+            check_clean(self.git)
+        for _, path, old, new in self.bumps:
+            replace_version(path, old, new)
+        echo(f"Bumped {len(self.bumps)} packages.")
+        plan.finish(_exit=self._exit)
+
+
+@cli.command(name="bump")
+def bump_version(
+    part: BumpUp.PartChoices,
+    sync: bool = False,
+    commit: bool = Option(
+        False, "--commit", "-c", help="Whether run `git commit` after version changed"
+    ),
+    emoji: bool | None = Option(
+        None, "--emoji", help="Whether add emoji prefix to commit message"
+    ),
+    bumpversion: bool = Option(
+        False,
+        "--bumpversion",
+        help="Run bumpversion instead of rewriting version file by fast itself",
+    ),
+    workspace: bool = Option(
+        False, "--workspace", help="Bump all projects of workspace in one commit"
+    ),
+    members: list[str] | None = Option(  # noqa:B008
+        None,
+        "--member",
+        help="Glob of member projects, default to [tool.uv.workspace] members",
+    ),
+    dry: bool = DryOption,
+) -> None:
+    """Bump up version string in pyproject.toml"""
+    if emoji is not None:
+        emoji = _ensure_bool(emoji)
+    if _ensure_bool(workspace):
+        return WorkspaceBump(
+            getattr(part, "value", part),
+            _ensure_bool(commit),
+            members=members if isinstance(members, list) else None,
+            emoji=emoji,
+            dry=dry,
+        ).run()
+    return BumpUp(
+        _ensure_bool(commit),
+        getattr(part, "value", part),
+        no_sync=not _ensure_bool(sync),
+        emoji=emoji,
+        # Not passed means to decide by env FASTDEVCLI_BUMPVERSION
+        bumpversion=_ensure_bool(bumpversion) or None,
+        dry=dry,
+    ).run()
+
+
+def bump() -> None:
+    part, commit = "", False
+    if args := sys.argv[2:]:
+        if "-c" in args or "--commit" in args:
+            commit = True
+        for a in args:
+            if not a.startswith("-"):
+                part = a
+                break
+    return BumpUp(
+        commit,
+        part,
+        no_sync="--no-sync" in args,
+        bumpversion=True if "--bumpversion" in args else None,
+        dry="--dry" in args,
+    ).run()
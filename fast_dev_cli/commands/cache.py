@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+
+import typer
+from typer import echo
+
+from ..cache import DetectionCache, IndexCache, ResultCache
+from ..project import Project, ProjectContext
+from ..utils import EnvError
+
+cli = typer.Typer()
+cache_cli = typer.Typer(
+    help="Manage the cache of project detection and check results",
+    no_args_is_help=True,
+)
+cli.add_typer(cache_cli, name="cache")
+
+
+@cache_cli.command(name="info")
+def cache_info() -> None:
+    """Show where the cache file is and what cached for current project"""
+    path = DetectionCache.path()
+    echo(f"Cache file: {path}")
+    if DetectionCache.disabled():
+        echo("Cache is disabled by FASTDEVCLI_NO_CACHE")
+    data = DetectionCache.load()
+    echo(f"Projects: {len(data['projects'])}")
+    echo(f"Tools: {len(data['tools'])}")
+    echo(f"Tool paths: {sum(len(v) - 1 for v in data['which'].values())}")
+    echo(f"Package index: {IndexCache.count()} ({IndexCache.root_dir()})")
+    results = ResultCache(ResultCache.default_dir(Project.get_work_dir(allow_cwd=True)))
+    echo(f"Check results: {results.count()} ({results.directory})")
+    try:
+        root_dir = ProjectContext.current().root_dir
+    except EnvError:
+        return
+    if item := data["projects"].get(str(root_dir)):
+        values = {k: v for k, v in item.items() if k != "key"}
+        echo(f"Current project: {root_dir}")
+        echo(json.dumps(values, indent=2))
+
+
+@cache_cli.command(name="clear")
+def cache_clear() -> None:
+    """Remove the cache file, versions of packages and check results of project"""
+    path = DetectionCache.path()
+    results = ResultCache(ResultCache.default_dir(Project.get_work_dir(allow_cwd=True)))
+    removed = False
+    if DetectionCache.clear():
+        echo(f"Removed {path}")
+        removed = True
+    if count := results.clear():
+        echo(f"Removed {count} check results in {results.directory}")
+        removed = True
+    if count := IndexCache.clear():
+        echo(f"Removed {count} versions of packages in {IndexCache.root_dir()}")
+        removed = True
+    if not removed:
+        echo("Cache is empty.")
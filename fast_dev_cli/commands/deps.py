@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+from pathlib import Path
+from typing import Annotated, Any, cast
+
+import typer
+from typer import Option, echo
+
+from ..cache import ResultCache, file_signature
+from ..project import Project, ProjectContext
+from ..utils import (
+    DryOption,
+    DryRun,
+    EnvError,
+    ToolOption,
+    _quote_shell_arg,
+    exit_if_run_failed,
+    load_bool,
+)
+
+cli = typer.Typer()
+
+
+class MakeDeps(DryRun):
+    # Saved in the venv after installed, to skip next install if nothing changed
+    STAMP_FILE = ".fast-deps.json"
+
+    def __init__(
+        self,
+        tool: str,
+        prod: bool = False,
+        dry: bool = False,
+        active: bool = False,
+        inexact: bool = False,
+        no_dev: bool = False,
+        verbose: bool = False,
+        frozen: bool = False,
+        no_extra: list[str] | None = None,
+        no_group: list[str] | None = None,
+        force: bool = False,
+    ) -> None:
+        self._tool = tool
+        self._prod = prod
+        self._active = active or load_bool("FASTDEVCLI_DEPS_ACTIVE")
+        self._inexact = inexact or load_bool("FASTDEVCLI_DEPS_INEXACT")
+        self._verbose = verbose
+        self._frozen = frozen
+        self._no_dev = no_dev
+        self._no_extra = no_extra
+        self._no_group = no_group
+        self._force = force
+        super().__init__(dry=dry)
+
+    def get_venv(self) -> Path | None:
+        """Virtual environment that the dependencies will be installed into
+
+        None if it is unknown, e.g.: `sys.prefix` is the environment of fast
+        itself(pipx/uv tool), not the one of `python` that runs the install.
+        """
+        if self._active or self._tool == "pip":
+            return Path(d) if (d := os.getenv("VIRTUAL_ENV")) else None
+        venv = Project.get_work_dir(allow_cwd=True) / ".venv"
+        return venv if venv.is_dir() else None
+
+    def stamp_key(self, cmd: str, venv: Path) -> str:
+        """Digest of everything that decides what will be installed"""
+        root = Project.get_work_dir(allow_cwd=True)
+        doc: dict[str, Any] = {}
+        with contextlib.suppress(EnvError, ValueError):
+            doc = ProjectContext.current(root).doc
+        tool = doc.get("tool", {})
+        tables = [
+            doc.get(name) for name in ("project", "dependency-groups", "build-system")
+        ] + [tool.get(name) for name in ("poetry", "pdm", "uv")]
+        locks = ResultCache.hash_files(
+            p for name in ProjectContext.LOCK_FILES if (p := root / name).exists()
+        )
+        interpreter = [str(venv), file_signature(venv / "pyvenv.cfg")]
+        return ResultCache.make_key(cmd, tables, locks, interpreter)
+
+    def is_synced(self, cmd: str) -> bool:
+        if self._force or self.dry or (venv := self.get_venv()) is None:
+            return False
+        with contextlib.suppress(OSError, ValueError):
+            data = json.loads(venv.joinpath(self.STAMP_FILE).read_text())
+            return bool(data.get("key") == self.stamp_key(cmd, venv))
+        return False
+
+    def save_stamp(self, cmd: str) -> None:
+        if (venv := self.get_venv()) is None:
+            return
+        data = {"key": self.stamp_key(cmd, venv), "command": cmd}
+        with contextlib.suppress(OSError):
+            venv.joinpath(self.STAMP_FILE).write_text(json.dumps(data))
+
+    def run(self) -> None:
+        cmd = self.gen()
+        if self.is_synced(cmd):
+            echo("Dependencies are up to date, skip install(use --force to reinstall).")
+            return
+        exit_if_run_failed(cmd, _exit=self._exit, dry=self.dry)
+        if not self.dry:
+            # Lock file may be updated by the install command, so stamp after it
+            self.save_stamp(cmd)
+
+    def should_ensure_pip(self) -> bool:
+        return True
+
+    def should_upgrade_pip(self) -> bool:
+        return True
+
+    def get_groups(self) -> list[str]:
+        if self._prod:
+            return []
+        return ["dev"]
+
+    def gen(self) -> str:
+        cmd = self._gen()
+        if self._verbose:
+            cmd += " --verbose"
+        if self._no_dev:
+            opt = " --no-dev"
+            if opt not in cmd:
+                cmd += opt
+        if self._no_extra:
+            cmd += " " + " ".join(
+                f"--no-extra {_quote_shell_arg(i)}" for i in self._no_extra
+            )
+        if self._no_group:
+            cmd += " " + " ".join(
+                f"--no-group {_quote_shell_arg(i)}" for i in self._no_group
+            )
+        if self._frozen:
+            cmd += " --frozen"
+        if opts := os.getenv("FASTDEVCLI_DEPS_OPTS"):
+            cmd += " " + opts.strip()
+        return cmd
+
+    def get_package_name(self) -> str:
+        with contextlib.suppress(FileNotFoundError, KeyError):
+            try:
+                doc = Project.load_toml()
+            except EnvError:
+                return ""
+            tool_section = doc["tool"]
+            uv_package = tool_section.get("uv", {}).get("package")
+            if uv_package is not None:
+                if not uv_package:
+                    return ""
+            else:
+                match doc["build-system"]["build-backend"]:
+                    case "pdm.backend":
+                        if not tool_section.get("pdm", {}).get("distribution", True):
+                            return ""
+                    case x if x.startswith("poetry"):
+                        if not tool_section.get("poetry", {}).get("package-mode", True):
+                            return ""
+            return cast(str, doc["project"]["name"])
+        return ""
+
+    def _gen(self) -> str:
+        if self._tool == "pdm":
+            return "pdm install --frozen " + ("--prod" if self._prod else "-G :all")
+        elif self._tool == "uv":
+            uv_sync = "uv sync"
+            if project := self.get_package_name():
+                uv_sync += " " + _quote_shell_arg(f"--reinstall-package={project}")
+            uv_sync += " --inexact" * self._inexact + " --active" * self._active
+            return uv_sync + (
+                " --no-dev" if self._prod else " --all-extras --all-groups"
+            )
+        elif self._tool == "poetry":
+            return "poetry install " + (
+                "--only=main" if self._prod else "--all-extras --all-groups"
+            )
+        else:
+            cmd = "python -m pip install -e ."
+            if gs := self.get_groups():
+                cmd += " " + " ".join(f"--group {g}" for g in gs)
+            upgrade = "python -m pip install --upgrade pip"
+            if self.should_ensure_pip():
+                cmd = f"python -m ensurepip && {upgrade} && {cmd}"
+            elif self.should_upgrade_pip():
+                cmd = f"{upgrade} && {cmd}"
+            return cmd
+
+
+@cli.command(name="deps")
+def make_deps(
+    prod: bool = Option(
+        False,
+        "--prod",
+        help="Only instead production dependencies.",
+    ),
+    tool: str = ToolOption,
+    use_uv: bool = Option(False, "--uv", help="Use `uv` to install deps"),
+    use_pdm: bool = Option(False, "--pdm", help="Use `pdm` to install deps"),
+    use_pip: bool = Option(False, "--pip", help="Use `pip` to install deps"),
+    use_poetry: bool = Option(False, "--poetry", help="Use `poetry` to install deps"),
+    active: bool = Option(
+        False, help="Add `--active` to uv sync command(Only work for uv project)"
+    ),
+    inexact: bool = Option(
+        False, help="Add `--inexact` to uv sync command(Only work for uv project)"
+    ),
+    no_dev: bool = Option(False, "--no-dev"),
+    no_extra: Annotated[list[str] | None, Option()] = None,
+    no_group: Annotated[list[str] | None, Option()] = None,
+    frozen: bool = Option(False, "--frozen", "--frozen-lockfile", "--no-lock"),
+    verbose: bool = Option(False, "--verbose"),
+    force: bool = Option(
+        False, "--force", help="Install even if nothing changed since last install"
+    ),
+    dry: bool = DryOption,
+) -> None:
+    """Run: ruff check/format to reformat code and then mypy to check"""
+    if use_uv + use_pdm + use_pip + use_poetry > 1:
+        raise typer.BadParameter(
+            "can only choose one",
+            param_hint=("--uv", "--pdm", "--pip", "--poetry"),
+        )
+    if use_uv:
+        tool = "uv"
+    elif use_pdm:
+        tool = "pdm"
+    elif use_pip:
+        tool = "pip"
+    elif use_poetry:
+        tool = "poetry"
+    elif tool == ToolOption.default:
+        tool = Project.get_manage_tool(cache=True) or "pip"
+    bool_opts = {
+        "active": active,
+        "inexact": inexact,
+        "no_dev": no_dev,
+        "verbose": verbose,
+        "frozen": frozen,
+        "force": force,
+        "dry": dry,
+    }
+    MakeDeps(tool, prod, no_extra=no_extra, no_group=no_group, **bool_opts).run()
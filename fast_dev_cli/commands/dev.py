@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import re
+import shutil
+import sys
+from pathlib import Path
+
+import typer
+from typer import Option
+from typer.models import ArgumentInfo, OptionInfo
+
+from ..project import Project
+from ..utils import (
+    DryOption,
+    EnvError,
+    _join_shell_args,
+    _quote_shell_arg,
+    capture_cmd_output,
+    exit_if_run_failed,
+    load_bool,
+)
+
+cli = typer.Typer()
+
+
+def should_use_just() -> bool:
+    if shutil.which("just") is None or load_bool("FASTDEVCLI_IGNORE_JUST_DEV"):
+        return False
+    d = Path.cwd()
+    for _ in range(5):
+        f = d / "justfile"
+        if f.exists():
+            return _prefer_just_dev(f)
+        if d.joinpath("pyproject.toml").exists():
+            break
+        d = d.parent
+    return False
+
+
+def _prefer_just_dev(f: Path) -> bool:
+    text = f.read_text(encoding="utf-8")
+    lines = text.splitlines()
+    dev_recipe = "dev *args:"
+    re_import = re.compile(r"import[?]? ")
+    has_import = False
+    total = len(lines)
+    for i, line in enumerate(lines):
+        if line.startswith(dev_recipe):
+            # Avoid cycle callback
+            command_lines = []
+            for j in range(i + 1, total):
+                try:
+                    s = lines[j]
+                except IndexError:
+                    break
+                if not s.startswith(" "):
+                    break
+                command_lines.append(s)
+            if not command_lines:  # Invalid justfile
+                return False
+            return all("fast dev" not in i for i in command_lines)
+        elif not has_import and re_import.match(line):
+            has_import = True
+    if has_import:
+        recipes = capture_cmd_output("just --list").splitlines()
+        for recipe in recipes:
+            recipe = recipe.strip()
+            if recipe.startswith(dev_recipe):
+                return "fast dev" not in recipe
+    return False
+
+
+def _load_fastapi_entrypoint() -> str:
+    with contextlib.suppress(FileNotFoundError, KeyError):
+        try:
+            doc = Project.load_toml()
+        except EnvError:
+            return ""
+        return doc["tool"]["fastapi"]["entrypoint"]
+    return ""
+
+
+def _parse_serve_file(
+    uvicorn: bool | None, filename: str, cmd: str, args: list[str]
+) -> str:
+    if m := re.search(r"(.*):(\d+)$", filename):
+        h, p = m.group(1), m.group(2)
+        if h and "--host" not in str(args):
+            if h == "0":
+                args.append("--host=0.0.0.0")
+            else:
+                args.append(f"--host={h}")
+        args.append(f"--port={p}")
+        if uvicorn:
+            if entrypoint := _load_fastapi_entrypoint():
+                cmd += " " + entrypoint
+            else:
+                p = Path("main.py")
+                if p.exists():
+                    cmd += " main:app"
+                elif Path("app", p.name).exists():
+                    cmd += " app.main:app"
+                elif Path("app.py").exists():
+                    cmd += " app:app"
+        return cmd
+    if uvicorn and ((filepath := Path(filename)).is_file() or filepath.suffix == ".py"):
+        filename = filepath.stem + ":app"
+        parent_names = [j for i in filepath.parents if (j := i.name)]
+        if parent_names:
+            filename = ".".join([*parent_names[::-1], filename])
+    cmd += " " + _quote_shell_arg(filename)
+    return cmd
+
+
+def _runserver(
+    uvicorn: bool | None,
+    host: OptionInfo | str | None,
+    port: OptionInfo | int | None,
+    file: ArgumentInfo | str | None,
+) -> tuple[str, list[str]]:
+    cmd = "uvicorn" if uvicorn else "fastapi dev"
+    args = []
+    if (host := getattr(host, "default", host)) and host not in (
+        "localhost",
+        "127.0.0.1",
+    ):
+        args.append(f"--host={host}")
+    no_port_yet = True
+    if file is not None:
+        filename = str(file)
+        try:
+            port = int(filename)
+        except ValueError:
+            cmd = _parse_serve_file(uvicorn, filename, cmd, args)
+        else:
+            if port != 8000:
+                args.append(f"--port={port}")
+                no_port_yet = False
+    elif uvicorn and (entrypoint := _load_fastapi_entrypoint()):
+        cmd += " " + entrypoint
+    if no_port_yet and (port := getattr(port, "default", port)) and str(port) != "8000":
+        args.append(f"--port={port}")
+    if shutil.which("pdm") is not None:
+        cmd = "pdm run " + cmd
+    return cmd, args
+
+
+def dev(
+    port: int | None | OptionInfo,
+    host: str | None | OptionInfo,
+    fastapi: bool | None = None,
+    uvicorn: bool | None = None,
+    prod: bool | None = None,
+    reload: bool | None = None,
+    just: bool | None = None,
+    file: str | None | ArgumentInfo = None,
+    dry: bool = False,
+) -> None:
+    if just is True or (just is None and should_use_just()):
+        args = [i for i in sys.argv[2:] if i != "--dry"]
+        cmd = "just dev"
+    else:
+        cmd, args = _runserver(uvicorn, host, port, file)
+    if args:
+        cmd += " " + _join_shell_args(args)
+    exit_if_run_failed(cmd, dry=dry)
+
+
+@cli.command(name="dev")
+def runserver(
+    file_or_port: str | None = typer.Argument(default=None),
+    port: int | None = Option(None, "-p", "--port"),
+    host: str | None = Option(None, "-h", "--host"),
+    fastapi: bool | None = None,
+    uvicorn: bool | None = None,
+    prod: bool | None = None,
+    reload: bool | None = None,
+    just: bool | None = None,
+    dry: bool = DryOption,
+) -> None:
+    """Start a fastapi server(only for fastapi>=0.111.0)"""
+    f = functools.partial(
+        dev, port, host, fastapi, uvicorn, prod, reload, just, dry=dry
+    )
+    if getattr(file_or_port, "default", file_or_port):
+        f(file=file_or_port)
+    else:
+        f()
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import typer
+from typer import Exit, echo
+
+from ..daemon import DmypyDaemon
+from ..utils import run_and_echo
+
+cli = typer.Typer()
+dmypy_cli = typer.Typer(
+    help="Manage the dmypy daemon used by `fast lint --dmypy`", no_args_is_help=True
+)
+cli.add_typer(dmypy_cli, name="dmypy")
+
+
+@dmypy_cli.command(name="status")
+def dmypy_status() -> None:
+    """Show status of the dmypy daemon of current project"""
+    daemon = DmypyDaemon()
+    if rc := run_and_echo(daemon.command("status")):
+        raise Exit(rc)
+    if (flags := daemon.load_state().get("flags")) is None:
+        echo("Daemon was not started by fast-dev-cli.")
+    else:
+        echo(f"Daemon was started with mypy flags: {flags}")
+
+
+@dmypy_cli.command(name="stop")
+def dmypy_stop() -> None:
+    """Stop the dmypy daemon of current project"""
+    if rc := DmypyDaemon().stop():
+        raise Exit(rc)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import time
+
+import typer
+from typer import echo, secho
+
+from ..tools import Tool, ToolRegistry
+
+cli = typer.Typer()
+
+TOOLS = (
+    "python",
+    "uv",
+    "pdm",
+    "poetry",
+    "ruff",
+    "mypy",
+    "coverage",
+    "pytest",
+    "bumpversion",
+    "just",
+    "pipx",
+    "git",
+)
+
+
+def render(tools: list[Tool]) -> list[str]:
+    lines = [f"{'Tool':<12}{'Version':<12}{'Source':<11}{'ms':>7}  Path"]
+    lines.extend(
+        f"{t.name:<12}{t.version or '-':<12}{t.source or '-':<11}"
+        f"{t.seconds * 1000:>7.1f}  {t.path or 'not found'}"
+        for t in tools
+    )
+    return lines
+
+
+@cli.command()
+def doctor() -> None:
+    """Show the path and version of the tools used by fast commands"""
+    start = time.perf_counter()
+    tools = [ToolRegistry.resolve(name) for name in TOOLS]
+    header, *rows = render(tools)
+    secho(header, bold=True)
+    for tool, line in zip(tools, rows, strict=True):
+        if tool.path is None:
+            secho(line, fg="yellow")
+        else:
+            echo(line)
+    cost = (time.perf_counter() - start) * 1000
+    echo(f"\nPATH fingerprint: {ToolRegistry.fingerprint()}")
+    echo(f"Resolved {len(tools)} tools in {cost:.1f}ms")
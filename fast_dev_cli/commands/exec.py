@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import typer
+from typer import Exit, echo
+
+from ..utils import DryOption, _ensure_bool, run_and_echo
+
+cli = typer.Typer()
+
+
+@cli.command(name="exec")
+def run_by_subprocess(cmd: str, dry: bool = DryOption) -> None:
+    """Run cmd by subprocess, auto set shell=True when cmd contains '|>'"""
+    try:
+        rc = run_and_echo(cmd, verbose=True, dry=_ensure_bool(dry))
+    except FileNotFoundError as e:
+        command = cmd.split()[0]
+        if e.filename == command or (
+            e.filename is None and "系统找不到指定的文件" in str(e)
+        ):
+            echo(f"Command not found: {command}")
+            raise Exit(1) from None
+        raise
+    else:
+        if rc:
+            raise Exit(rc)
@@ -0,0 +1,710 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import os
+import re
+import shlex
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import typer
+from typer import Exit, Option, echo, secho
+
+from ..cache import DetectionCache, ResultCache
+from ..daemon import DmypyDaemon
+from ..plan import Plan
+from ..profiling import profiled
+from ..project import Project, ProjectContext
+from ..tools import ToolRegistry
+from ..utils import (
+    TOML_FILE,
+    DryOption,
+    DryRun,
+    ShellCommandError,
+    ToolOption,
+    _convert_bool,
+    _ensure_bool,
+    _ensure_str,
+    _join_shell_args,
+    _quote_shell_arg,
+    capture_cmd_output,
+    is_venv,
+    is_windows,
+    load_bool,
+    prefer_uv_tool,
+    run_and_echo,
+    run_parallel,
+    yellow_warn,
+)
+
+if TYPE_CHECKING:
+    if sys.version_info >= (3, 11):
+        from typing import Self
+    else:
+        from typing_extensions import Self
+
+cli = typer.Typer()
+ParallelOption = Option(
+    False, "--parallel", help="Run lint tools concurrently and print output grouped"
+)
+ChangedOption = Option(
+    False, "--changed", help="Only lint python files that changed from git HEAD"
+)
+CacheOption = Option(
+    None,
+    "--cache/--no-cache",
+    help="Skip the check tools that passed with the same inputs"
+    " (default to env FASTDEVCLI_CHECK_CACHE)",
+)
+SinceOption = Option(
+    None, "--since", help="Only lint python files that changed since the git ref"
+)
+RUFF_PATTERN = re.compile(r"\bruff (format|check)\b")
+LINT_TOOLS = ("ruff", "mypy", "dmypy", "ty", "bandit", "prettier")
+# Directories that ruff excludes by default, other than the hidden ones
+SKIP_DIRS = {
+    "__pycache__",
+    "__pypackages__",
+    "_build",
+    "buck-out",
+    "build",
+    "dist",
+    "node_modules",
+    "site-packages",
+    "venv",
+}
+# Change of these files may affect the lint result of all python files
+LINT_CONFIG_FILES = (
+    TOML_FILE,
+    "setup.cfg",
+    "tox.ini",
+    "mypy.ini",
+    ".mypy.ini",
+    "ruff.toml",
+    ".ruff.toml",
+    ".bandit",
+)
+
+
+class LintCode(DryRun):
+    def __init__(
+        self,
+        args: list[str] | str | None,
+        check_only: bool = False,
+        _exit: bool = False,
+        dry: bool = False,
+        bandit: bool = False,
+        skip_mypy: bool = False,
+        dmypy: bool = False,
+        tool: str = ToolOption.default,
+        prefix: bool = False,
+        up: bool = False,
+        sim: bool = True,
+        strict: bool = False,
+        ty: bool = False,
+        fix: bool = True,
+        parallel: bool = False,
+        cache: bool = False,
+    ) -> None:
+        self.args = args
+        self.check_only = check_only
+        self._bandit = bandit
+        self._skip_mypy = skip_mypy
+        self._use_dmypy = dmypy
+        self._tool = tool
+        self._prefix = prefix
+        self._up = up
+        self._sim = sim
+        self._strict = strict
+        self._ty = _ensure_bool(ty)
+        self._fix = _ensure_bool(fix)
+        self._parallel = _ensure_bool(parallel)
+        self._cache = _ensure_bool(cache)
+        super().__init__(_exit, dry)
+
+    @staticmethod
+    @profiled("detect")
+    def check_lint_tool_installed() -> bool:
+        return ToolRegistry.is_installed("ruff")
+
+    @staticmethod
+    def missing_mypy_exec() -> bool:
+        return not ToolRegistry.is_installed("mypy")
+
+    @staticmethod
+    def prefer_dmypy(paths: str, tools: list[str], use_dmypy: bool = False) -> bool:
+        return any(t.startswith("mypy") for t in tools) and (
+            use_dmypy or (paths == "." and load_bool("FASTDEVCLI_DMYPY"))
+        )
+
+    @staticmethod
+    def get_package_name() -> str:
+        root = Project.get_work_dir(allow_cwd=True)
+        module_name = root.name.replace("-", "_").replace(" ", "_")
+        package_maybe = (module_name, "src")
+        for name in package_maybe:
+            if root.joinpath(name).is_dir():
+                return name
+        return "."
+
+    @classmethod
+    def to_cmd(cls: type[Self], *args: Any, **kw: Any) -> str:
+        return " && ".join(cls.to_commands(*args, **kw))
+
+    @classmethod
+    def to_commands(
+        cls: type[Self],
+        paths: str | list[str] = ".",
+        check_only: bool = False,
+        bandit: bool = False,
+        skip_mypy: bool = False,
+        use_dmypy: bool = False,
+        tool: str = ToolOption.default,
+        with_prefix: bool = False,
+        ruff_check_up: bool = False,
+        ruff_check_sim: bool = True,
+        mypy_strict: bool = False,
+        prefer_ty: bool = False,
+        ruff_check_fix: bool = True,
+    ) -> list[str]:
+        path_args = shlex.split(paths) if isinstance(paths, str) else paths
+        if not path_args:
+            path_args = ["."]
+        quoted_paths = _join_shell_args(path_args)
+        if path_args != ["."] and all(i.endswith(".html") for i in path_args):
+            return [f"prettier -w {quoted_paths}"]
+        ruff_rules = ["I", "B"]
+        if ruff_check_sim and not load_bool("FASTDEVCLI_NO_SIM"):
+            ruff_rules.append("SIM")
+        if ruff_check_up or load_bool("FASTDEVCLI_UP"):
+            ruff_rules.append("UP")
+        ruff_check = "ruff check --extend-select=" + ",".join(ruff_rules)
+        if (
+            ruff_check_fix
+            and not check_only
+            and (not load_bool("NO_FIX") and not load_bool("FASTDEVCLI_NO_FIX"))
+        ):
+            ruff_check += " --fix"
+        tools = ["ruff format", ruff_check, "mypy"]
+        if check_only:
+            tools[0] += " --check"
+        if skip_mypy or load_bool("SKIP_MYPY") or load_bool("FASTDEVCLI_NO_MYPY"):
+            # Sometimes mypy is too slow
+            tools = tools[:-1]
+        else:
+            if prefer_ty or load_bool("FASTDEVCLI_TY"):
+                tools[-1] = "ty check"
+            else:
+                if load_bool("IGNORE_MISSING_IMPORTS"):
+                    tools[-1] += " --ignore-missing-imports"
+                if mypy_strict or load_bool("FASTDEVCLI_STRICT"):
+                    tools[-1] += " --strict"
+        ruff_exists = cls.check_lint_tool_installed()
+        prefix = ""
+        should_run_by_tool = with_prefix
+        requires_mypy = any(tool.startswith("mypy") for tool in tools)
+        global_mypy = False
+        if requires_mypy:
+            # TODO: move this long logic to a single function
+            local_bin = Path.home().joinpath(".local/bin")
+            if local_bin.joinpath("mypy").exists():
+                global_mypy = True
+                mypy_opt = "--python-executable=.venv/bin/python"
+                for i, t in enumerate(tools):
+                    if t.startswith("mypy"):
+                        if mypy_opt not in t:
+                            tools[i] = t + " " + mypy_opt
+                        break
+            if not should_run_by_tool:
+                if is_venv() and Path(sys.argv[0]).parent != local_bin:
+                    # Virtual environment activated and fast-dev-cli is installed in it
+                    if not ruff_exists:
+                        should_run_by_tool = True
+                        command = "pipx install ruff"
+                        if not ToolRegistry.is_installed("pipx"):
+                            ensure_pipx = (
+                                "pip install --user pipx\n  pipx ensurepath\n  "
+                            )
+                            command = ensure_pipx + command
+                        elif prefer_uv_tool():
+                            command = "uv tool install ruff"
+                        yellow_warn(
+                            "You may need to run the following command"
+                            f" to install ruff:\n\n  {command}\n"
+                        )
+                    elif global_mypy:
+                        should_run_by_tool = True
+                    elif cls.missing_mypy_exec():
+                        should_run_by_tool = True
+                        if ToolRegistry.has_module("fast_dev_cli"):
+                            command = "python -m pip install -U mypy"
+                            yellow_warn(
+                                "You may need to run the following command"
+                                f" to install lint tools:\n\n  {command}\n"
+                            )
+                elif tool == ToolOption.default:
+                    root = Project.get_work_dir(allow_cwd=True)
+                    if py := ToolRegistry.which("python"):
+                        try:
+                            Path(py).relative_to(root)
+                        except ValueError:
+                            # Virtual environment not activated
+                            should_run_by_tool = True
+                else:
+                    should_run_by_tool = True
+        if should_run_by_tool and tool:
+            if tool == ToolOption.default:
+                tool = Project.get_manage_tool() or ""
+            if tool:
+                prefix = tool + " run "
+                if tool == "uv":
+                    if is_windows():
+                        prefix += "--no-sync "
+                    elif Path(bin_dir := ".venv/bin/").exists():
+                        prefix = bin_dir
+        if cls.prefer_dmypy(quoted_paths, tools, use_dmypy=use_dmypy):
+            mypy_flags = tools[-1].split()[1:]
+            tools[-1] = "dmypy run"
+            if mypy_flags:
+                tools[-1] += " -- " + " ".join(mypy_flags)
+        commands = [
+            (
+                tool
+                # `ruff <command>` get the same result with `pdm run ruff <command>`.
+                # Other tools should run inside the selected environment.
+                if (
+                    ruff_exists
+                    and tool.startswith("ruff")
+                    or (global_mypy and tool.startswith("mypy"))
+                )
+                else prefix + tool
+            )
+            + f" {quoted_paths}"
+            for tool in tools
+        ]
+        if bandit or load_bool("FASTDEVCLI_BANDIT"):
+            command = prefix + "bandit"
+            if Path("pyproject.toml").exists():
+                toml_text = Project.load_toml_text()
+                if "[tool.bandit" in toml_text:
+                    command += " -c pyproject.toml"
+            if quoted_paths == "." and " -c " not in command:
+                quoted_paths = _quote_shell_arg(cls.get_package_name())
+            command += f" -r {quoted_paths}"
+            commands.append(command)
+        return commands
+
+    @staticmethod
+    def group_commands(commands: list[str], check_only: bool = False) -> list[str]:
+        """Split commands into the ones that can run concurrently"""
+        if check_only:
+            return commands
+        # `ruff format` and `ruff check --fix` both rewrite files, keep them ordered
+        ruff_commands = [i for i in commands if RUFF_PATTERN.search(i)]
+        others = [i for i in commands if i not in ruff_commands]
+        if ruff_commands:
+            others.insert(0, " && ".join(ruff_commands))
+        return others
+
+    @staticmethod
+    def to_plan(commands: list[str], check_only: bool = False) -> Plan:
+        """Steps of commands, which run concurrently as `group_commands`"""
+        plan = Plan()
+        ruff_steps: list[int] = []
+        for cmd in commands:
+            if not check_only and RUFF_PATTERN.search(cmd):
+                ruff_steps = [plan.add(cmd, ruff_steps)]
+            else:
+                plan.add(cmd, [])
+        return plan
+
+    def run(self) -> None:
+        commands = self.gen_commands()
+        daemon = None
+        if not self.dry and (dmypy := [i for i in commands if "dmypy run" in i]):
+            daemon = DmypyDaemon.from_command(dmypy[0])
+        if self._cache and self.check_only:
+            rc = self.run_with_cache(commands, daemon)
+        elif self._parallel or daemon is not None:
+            rc = max(self.run_commands(commands, daemon), key=abs, default=0)
+        else:
+            plan = self.to_plan(commands, self.check_only)
+            plan.finish(_exit=self._exit, dry=self.dry)
+            return
+        if rc:
+            if self._exit:
+                sys.exit(rc)
+            raise Exit(rc)
+
+    def run_commands(
+        self, commands: list[str], daemon: DmypyDaemon | None = None
+    ) -> list[int]:
+        """Run commands one by one(or concurrently), stop at the first failure"""
+        if self._parallel:
+            if daemon is not None:
+                warm = daemon.ensure()
+                echo(f"Use {'warm' if warm else 'cold'} dmypy daemon")
+                commands = [
+                    daemon.check_command() if "dmypy run" in i else i for i in commands
+                ]
+            groups = self.group_commands(commands, self.check_only)
+            return run_parallel(groups, dry=self.dry)
+        codes: list[int] = []
+        for cmd in commands:
+            if daemon is not None and "dmypy run" in cmd:
+                rc = daemon.run()
+            else:
+                rc = run_and_echo(cmd, dry=self.dry)
+            codes.append(rc)
+            if rc:
+                break
+        return codes
+
+    @staticmethod
+    def get_tool_version(command: str) -> str:
+        """Version of the tool that command runs, to be part of the cache key
+
+        A tool on PATH is resolved to the real executable and the version of
+        its installed distribution, so upgrading it behind a shim is noticed.
+        """
+        args = shlex.split(command)
+        index = next((i for i, a in enumerate(args) if Path(a).stem in LINT_TOOLS), -1)
+        if index < 0:
+            return ""
+        if (
+            index == 0
+            and os.sep not in args[0]
+            and (tool := ToolRegistry.resolve(args[0])).path
+        ):
+            return f"{os.path.realpath(tool.path)} {tool.version}"
+        try:
+            return DetectionCache.get_tool_version(_join_shell_args(args[: index + 1]))
+        except FileNotFoundError:
+            return ""
+
+    def run_with_cache(
+        self, commands: list[str], daemon: DmypyDaemon | None = None
+    ) -> int:
+        """Skip the commands that passed with the same inputs before"""
+        root = Project.get_work_dir(allow_cwd=True)
+        cache = ResultCache(ResultCache.default_dir(root))
+        configs = ResultCache.hash_files(
+            p for name in LINT_CONFIG_FILES if (p := root / name).exists()
+        )
+        inputs = ResultCache.hash_files(collect_python_files(self.parse_paths()))
+        # Type checkers depend on the installed packages as well
+        environment = (
+            sys.executable,
+            os.getenv("VIRTUAL_ENV", ""),
+            ResultCache.hash_files(
+                p for name in ProjectContext.LOCK_FILES if (p := root / name).exists()
+            ),
+        )
+        keys: dict[str, str] = {}
+        for cmd in commands:
+            version = self.get_tool_version(cmd)
+            key = cache.make_key(cmd, version, configs, inputs, environment)
+            if cache.hit(key):
+                echo(f"--> {cmd} (cached)")
+            else:
+                keys[cmd] = key
+        todo = list(keys)
+        codes = self.run_commands(todo, daemon)
+        if not self.dry:
+            for cmd, rc in zip(todo, codes, strict=False):
+                if rc == 0:
+                    cache.add(keys[cmd])
+        echo(f"Check cache: {cache.hits} hit, {cache.misses} miss")
+        return max(codes, key=abs, default=0)
+
+    def gen(self) -> str:
+        return " && ".join(self.gen_commands())
+
+    def gen_commands(self) -> list[str]:
+        return self.to_commands(
+            self.parse_paths(),
+            self.check_only,
+            self._bandit,
+            self._skip_mypy,
+            self._use_dmypy,
+            tool=self._tool,
+            with_prefix=self._prefix,
+            ruff_check_up=self._up,
+            ruff_check_sim=self._sim,
+            mypy_strict=self._strict,
+            prefer_ty=self._ty,
+            ruff_check_fix=self._fix,
+        )
+
+    def parse_paths(self) -> list[str]:
+        paths = ["."]
+        if args := self.args:
+            ps = shlex.split(args) if isinstance(args, str) else [str(i) for i in args]
+            if len(ps) == 1:
+                path = ps[0]
+                if (
+                    path != "."
+                    # `Path("a.").suffix` got "." in py3.14 and got "" with py<3.14
+                    and (p := Path(path)).suffix in ("", ".")
+                    and not p.exists()
+                ):
+                    # e.g.:
+                    # stem -> stem.py
+                    # me. -> me.py
+                    if path.endswith("."):
+                        p = p.with_name(path[:-1])
+                    for suffix in (".py", ".html"):
+                        p = p.with_suffix(suffix)
+                        if p.exists():
+                            ps[0] = p.name
+                            break
+            paths = ps
+        return paths
+
+
+def collect_python_files(paths: list[str]) -> list[Path]:
+    files: list[Path] = []
+    for path in map(Path, paths):
+        if not path.is_dir():
+            files.append(path)
+            continue
+        for root, dirs, names in os.walk(path):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d not in SKIP_DIRS]
+            files.extend(Path(root, n) for n in names if n.endswith((".py", ".pyi")))
+    return files
+
+
+def parse_files(args: list[str] | tuple[str, ...]) -> list[str]:
+    return [i for i in args if not i.startswith("-")]
+
+
+def lint(
+    files: list[str] | str | None = None,
+    dry: bool = False,
+    bandit: bool = False,
+    skip_mypy: bool = False,
+    dmypy: bool = False,
+    tool: str = ToolOption.default,
+    prefix: bool = False,
+    up: bool = False,
+    sim: bool = True,
+    strict: bool = False,
+    ty: bool = False,
+    fix: bool = True,
+    parallel: bool = False,
+) -> None:
+    if files is None:
+        files = parse_files(sys.argv[1:])
+    if files and files[0] == "lint":
+        files = files[1:]
+    LintCode(
+        files,
+        dry=dry,
+        skip_mypy=skip_mypy,
+        bandit=bandit,
+        dmypy=dmypy,
+        tool=tool,
+        prefix=prefix,
+        up=up,
+        sim=sim,
+        strict=strict,
+        ty=ty,
+        fix=fix,
+        parallel=parallel,
+    ).run()
+
+
+def check(
+    files: list[str] | str | None = None,
+    dry: bool = False,
+    bandit: bool = False,
+    skip_mypy: bool = False,
+    dmypy: bool = False,
+    tool: str = ToolOption.default,
+    up: bool = False,
+    sim: bool = True,
+    strict: bool = False,
+    ty: bool = False,
+    parallel: bool = False,
+    cache: bool | None = None,
+) -> None:
+    if cache is None:
+        cache = load_bool("FASTDEVCLI_CHECK_CACHE")
+    LintCode(
+        files,
+        check_only=True,
+        _exit=True,
+        dry=dry,
+        bandit=bandit,
+        skip_mypy=skip_mypy,
+        dmypy=dmypy,
+        tool=tool,
+        up=up,
+        sim=sim,
+        strict=strict,
+        ty=ty,
+        parallel=parallel,
+        cache=cache,
+    ).run()
+
+
+def get_changed_files(since: str | None = None) -> list[str] | None:
+    """Get python files that are modified, staged or untracked by git
+
+    :param since: git ref to compare with, default to HEAD
+    :return: paths relative to current directory, or None if lint config changed
+    """
+    base = "HEAD"
+    if since:
+        with contextlib.suppress(ShellCommandError):
+            base = capture_cmd_output(["git", "merge-base", since, base], raises=True)
+        base = base if base != "HEAD" else since
+    try:
+        root = capture_cmd_output(["git", "rev-parse", "--show-toplevel"], raises=True)
+        diff = capture_cmd_output(
+            ["git", "-C", root, "diff", "--name-only", base], raises=True
+        )
+        untracked = capture_cmd_output(
+            ["git", "-C", root, "ls-files", "--others", "--exclude-standard"],
+            raises=True,
+        )
+    except ShellCommandError as e:
+        secho(f"ERROR: Failed to get changed files by git:\n{e}", fg="red")
+        raise Exit(1) from e
+    # Paths are relative to the repo root, so that a config file in the parent
+    # directories is not dropped when running from a subdirectory
+    cwd = Path.cwd().resolve()
+    paths = [Path(root).resolve() / name for name in diff.splitlines()]
+    paths += [Path(root).resolve() / name for name in untracked.splitlines()]
+    if any(
+        p.name in LINT_CONFIG_FILES and (cwd in p.parents or p.parent in cwd.parents)
+        for p in paths
+    ):
+        return None
+    return [
+        os.path.relpath(p, cwd)
+        for p in dict.fromkeys(paths)
+        if p.suffix in (".py", ".pyi") and cwd in p.parents and p.exists()
+    ]
+
+
+def _filter_changed(paths: list[str], since: str | None) -> list[str]:
+    if (changed := get_changed_files(since)) is None:
+        echo("Lint config file changed, check all files.")
+        return paths
+    if paths != ["."]:
+        dirs = [Path(p) for p in paths]
+        changed = [
+            i
+            for i in changed
+            if any(d == (p := Path(i)) or d in p.parents for d in dirs)
+        ]
+    if not changed:
+        echo("No python file changed.")
+        raise Exit()
+    return changed
+
+
+def _should_bandit() -> bool:
+    if v := os.getenv("FASTDEVCLI_BANDIT"):
+        return _convert_bool(v) or True
+    toml_text = Project.load_toml_text()
+    lines = toml_text.splitlines()
+    return any(i.startswith("[tool.bandit") for i in lines)
+
+
+@cli.command(name="lint")
+def make_style(
+    files: list[str] | None = typer.Argument(default=None),  # noqa:B008
+    check_only: bool = Option(False, "--check-only", "-c"),
+    bandit: bool = Option(False, "--bandit", help="Run `bandit -r <package_dir>`"),
+    prefix: bool = Option(
+        False,
+        "--prefix",
+        help="Run lint command with tool prefix, e.g.: pdm run ruff ...",
+    ),
+    skip_mypy: bool = Option(False, "--skip-mypy"),
+    use_dmypy: bool = Option(
+        False, "--dmypy", help="Use `dmypy run` instead of `mypy`"
+    ),
+    tool: str = ToolOption,
+    dry: bool = DryOption,
+    up: bool = Option(False, help="Whether ruff check with --extend-select=UP"),
+    sim: bool = Option(True, help="Whether ruff check with --extend-select=SIM"),
+    strict: bool = Option(False, help="Whether run mypy with --strict"),
+    ty: bool = Option(False, help="Whether use ty instead of mypy"),
+    fix: bool | None = Option(None, help="Whether ruff check with --fix"),
+    auto_bandit: bool | None = Option(
+        None, help="Whether to run bandit if `[tool.bandit]` in pyproject.toml"
+    ),
+    parallel: bool = ParallelOption,
+    changed: bool = ChangedOption,
+    since: str | None = SinceOption,
+    cache: bool | None = CacheOption,
+) -> None:
+    """Run: ruff check/format to reformat code and then mypy to check"""
+    if getattr(files, "default", files) is None:
+        files = ["."]
+    elif isinstance(files, str):
+        files = [files]
+    if (since := _ensure_str(since)) or _ensure_bool(changed):
+        files = _filter_changed(files or ["."], since)
+    skip = _ensure_bool(skip_mypy)
+    dmypy = _ensure_bool(use_dmypy)
+    bandit = _ensure_bool(bandit) or (
+        auto_bandit is not None and _ensure_bool(auto_bandit) and _should_bandit()
+    )
+    tool = _ensure_str(tool) or ""
+    up = _ensure_bool(up)
+    sim = _ensure_bool(sim)
+    strict = _ensure_bool(strict)
+    kwargs = {"dry": dry, "skip_mypy": skip, "dmypy": dmypy, "bandit": bandit}
+    kwargs["parallel"] = _ensure_bool(parallel)
+    if _ensure_bool(check_only):
+        if isinstance(cache, bool):
+            kwargs["cache"] = cache
+        run = check
+    else:
+        prefix = _ensure_bool(prefix)
+        if fix is None or not isinstance(fix, bool):
+            fix = load_bool("FASTDEVCLI_FIX", True)
+        run = functools.partial(lint, prefix=prefix, fix=fix)
+    run(files, tool=tool, up=up, sim=sim, strict=strict, ty=ty, **kwargs)
+
+
+@cli.command(name="check")
+def only_check(
+    bandit: bool = Option(False, "--bandit", help="Run `bandit -r <package_dir>`"),
+    skip_mypy: bool = Option(False, "--skip-mypy"),
+    dry: bool = DryOption,
+    up: bool = Option(False, help="Whether ruff check with --extend-select=UP"),
+    sim: bool = Option(True, help="Whether ruff check with --extend-select=SIM"),
+    strict: bool = Option(False, help="Whether run mypy with --strict"),
+    ty: bool = Option(False, help="Whether use ty instead of mypy"),
+    parallel: bool = ParallelOption,
+    changed: bool = ChangedOption,
+    since: str | None = SinceOption,
+    cache: bool | None = CacheOption,
+) -> None:
+    """Check code style without reformat"""
+    files: list[str] | None = None
+    if (since := _ensure_str(since)) or _ensure_bool(changed):
+        files = _filter_changed(["."], since)
+    bandit = _ensure_bool(bandit)
+    up = _ensure_bool(up)
+    sim = _ensure_bool(sim)
+    skip_mypy = _ensure_bool(skip_mypy)
+    parallel = _ensure_bool(parallel)
+    check(
+        files,
+        dry=dry,
+        bandit=bandit,
+        skip_mypy=skip_mypy,
+        up=up,
+        sim=sim,
+        ty=ty,
+        parallel=parallel,
+        cache=cache if isinstance(cache, bool) else None,
+    )
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import glob
+import os
+import re
+import shutil
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import typer
+from typer import Exit, Option, echo, secho
+
+from ..project import Project
+from ..utils import (
+    DryOption,
+    DryRun,
+    _ensure_bool,
+    is_windows,
+    tomllib,
+    yellow_warn,
+)
+from .lint import SKIP_DIRS
+
+cli = typer.Typer()
+
+
+class UvPypi(DryRun):
+    PYPI = "https://pypi.org/simple"
+    HOST = "https://files.pythonhosted.org"
+
+    def __init__(
+        self,
+        lock_file: Path,
+        dry: bool,
+        verbose: bool,
+        quiet: bool,
+        slim: bool = False,
+        reverse: bool = False,
+    ) -> None:
+        super().__init__(dry=dry)
+        self.lock_file = lock_file
+        self._verbose = _ensure_bool(verbose)
+        self._quiet = _ensure_bool(quiet)
+        self._slim = _ensure_bool(slim)
+        self._reverse = _ensure_bool(reverse)
+
+    def run(self) -> None:
+        try:
+            rc = self.update_lock(
+                self.lock_file, self._verbose, self._quiet, self._slim, self._reverse
+            )
+        except ValueError as e:
+            secho(str(e), fg=typer.colors.RED)
+            raise Exit(1) from e
+        else:
+            if rc != 0:
+                raise Exit(rc)
+
+    @staticmethod
+    def get_target_content(
+        text: str, verbose: bool, target_registry: str, target_host: str
+    ) -> str | None:
+        rewriter = LockRewriter(target_registry, target_host)
+        text = "".join(rewriter.rewrite(text.splitlines(keepends=True)))
+        if rewriter.check(verbose):
+            return None
+        return text
+
+    @classmethod
+    def get_targets(cls, reverse: bool, verbose: bool) -> tuple[str, str] | None:
+        """Registry and download host to change to, None if not configured"""
+        if not reverse:
+            return cls.PYPI, cls.HOST
+        try:
+            return cls.get_register_from_uv_config()
+        except FileNotFoundError:
+            if verbose:
+                echo("Skip register reverse as global uv config file not found.")
+            return None
+
+    @classmethod
+    def update_lock(
+        cls,
+        p: Path,
+        verbose: bool,
+        quiet: bool,
+        slim: bool = False,
+        reverse: bool = False,
+    ) -> int:
+        if (targets := cls.get_targets(reverse, verbose)) is None:
+            return 0 if quiet else 1
+        size = cls.rewrite_lock(p, *targets, slim=slim, verbose=verbose)
+        if size is None:
+            if verbose:
+                echo(f"Registry of {p} is {targets[0]}, no need to change.")
+            return 0
+        if verbose:
+            echo(f"Updated {p} with {size} bytes.")
+        if quiet:
+            return 0
+        return 1
+
+    @staticmethod
+    def rewrite_lock(
+        p: Path, registry: str, host: str, slim: bool = False, verbose: bool = False
+    ) -> int | None:
+        """Point the lock file to registry/host
+
+        :return: size of the new content, or None if there is nothing to change
+        """
+        rewriter = LockRewriter(registry, host, slim)
+        tmp = p.with_name(f"{p.name}.{os.getpid()}.tmp")
+        try:
+            # Stream line by line, so memory usage not grows with size of lock
+            with p.open(encoding="utf-8") as src, tmp.open("w", encoding="utf-8") as f:
+                size = sum(f.write(line) for line in rewriter.rewrite(src))
+            if rewriter.check(verbose):
+                return None
+            shutil.copymode(p, tmp)
+            os.replace(tmp, p)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return size
+
+    @classmethod
+    def batch(
+        cls,
+        files: list[Path],
+        verbose: bool,
+        quiet: bool,
+        slim: bool = False,
+        reverse: bool = False,
+    ) -> int:
+        """Rewrite lock files concurrently and print a summary table"""
+        if (targets := cls.get_targets(reverse, verbose)) is None:
+            return 0 if quiet else 1
+        workers = min(len(files), os.cpu_count() or 1)
+        # Regex substitution is cpu bound, so use processes instead of threads
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_rewrite, p, *targets, slim) for p in files]
+            results = [future.result() for future in futures]
+        names = [_relpath(p) for p in files]
+        width = max(len("File"), *map(len, names))
+        echo(f"{'File':<{width}}  {'Changed':<7}  {'Bytes':>10}  {'Time':>7}")
+        changed = failed = 0
+        for name, (size, cost, error) in zip(names, results, strict=True):
+            if error:
+                failed += 1
+                secho(f"{name:<{width}}  error: {error}", fg="red")
+                continue
+            if size is not None:
+                changed += 1
+            mark, size_text = ("yes", str(size)) if size is not None else ("no", "-")
+            echo(f"{name:<{width}}  {mark:<7}  {size_text:>10}  {cost:>6.2f}s")
+        echo(f"{changed} of {len(files)} lock files changed, {failed} failed.")
+        if failed:
+            return 1
+        return 0 if quiet or not changed else 1
+
+    @classmethod
+    def get_register_from_uv_config(cls) -> tuple[str, str]:
+        config_file = cls.get_uv_config_file()
+        text = config_file.read_text("utf-8")
+        doc = tomllib.loads(text)
+        index_url = doc["index"][0]["url"]
+        return index_url, index_url.replace("/simple", "").rstrip("/")
+
+    @staticmethod
+    def get_uv_config_file() -> Path:
+        config_dir = "AppData/Roaming" if is_windows() else ".config"
+        return Path.home() / config_dir / "uv/uv.toml"
+
+    @staticmethod
+    def slim_and_write(
+        text: str, slim: bool, p: Path, verbose: bool, quiet: bool
+    ) -> int:
+        if slim:
+            text = re.sub(LockRewriter.SLIM_PATTERN, "", text)
+        size = p.write_text(text, encoding="utf-8")
+        if verbose:
+            echo(f"Updated {p} with {size} bytes.")
+        if quiet:
+            return 0
+        return 1
+
+
+class LockRewriter:
+    """Replace registry and download host of uv.lock in one pass of its lines
+
+    The urls found are collected during rewriting, `check` tells whether the
+    lock was already pointed to the targets.
+    """
+
+    REGISTRY_PATTERN = re.compile(r'(registry = ")(.*?)"')
+    DOWNLOAD_PATTERN = re.compile(
+        r'(url = ")(https?://.*?)(/packages/.*?\.)(gz|whl|zip)"'
+    )
+    SLIM_PATTERN = re.compile(r', size = \d+, upload-time = ".*?"')
+
+    def __init__(self, registry: str, host: str, slim: bool = False) -> None:
+        self.registry = registry
+        self.host = host
+        self.slim = slim
+        self.registry_urls: set[str] = set()
+        self.download_hosts: set[str] = set()
+
+    def _replace_registry(self, m: re.Match[str]) -> str:
+        self.registry_urls.add(m.group(2))
+        return f'{m.group(1)}{self.registry}"'
+
+    def _replace_host(self, m: re.Match[str]) -> str:
+        self.download_hosts.add(m.group(2))
+        return f'{m.group(1)}{self.host}{m.group(3)}{m.group(4)}"'
+
+    def rewrite_line(self, line: str) -> str:
+        # Most lines contain none of the patterns, skip them without regex
+        if 'registry = "' in line:
+            line = self.REGISTRY_PATTERN.sub(self._replace_registry, line)
+        if 'url = "' in line and "/packages/" in line:
+            line = self.DOWNLOAD_PATTERN.sub(self._replace_host, line)
+        if self.slim and "upload-time" in line:
+            line = self.SLIM_PATTERN.sub("", line)
+        return line
+
+    def rewrite(self, lines: Iterable[str]) -> Iterator[str]:
+        for line in lines:
+            yield self.rewrite_line(line)
+
+    def check(self, verbose: bool = False) -> bool:
+        """Whether the lock is unchanged, should be called after `rewrite`"""
+        if not self.registry_urls:
+            pattern = self.REGISTRY_PATTERN.pattern
+            raise ValueError(f"Failed to find pattern {pattern!r} in uv lock file")
+        if self.registry_urls == {self.registry} and self.download_hosts == {self.host}:
+            return True
+        if verbose:
+            for url in sorted(self.registry_urls - {self.registry}):
+                echo(f"{url} --> {self.registry}")
+            for host in sorted(self.download_hosts - {self.host}):
+                echo(f"{host} --> {self.host}")
+        return False
+
+
+def _rewrite(
+    p: Path, registry: str, host: str, slim: bool
+) -> tuple[int | None, float, str]:
+    start = time.perf_counter()
+    try:
+        size = UvPypi.rewrite_lock(p, registry, host, slim)
+    except (OSError, ValueError) as e:
+        return None, time.perf_counter() - start, str(e)
+    return size, time.perf_counter() - start, ""
+
+
+def _relpath(p: Path) -> str:
+    try:
+        return os.path.relpath(p)
+    except ValueError:  # On different drives of Windows
+        return str(p)
+
+
+def _is_glob(pattern: str) -> bool:
+    return any(c in pattern for c in "*?[")
+
+
+def find_lock_files(patterns: list[str], recursive: bool = False) -> list[Path]:
+    """Expand paths/globs to lock files, directories mean the uv.lock in them
+
+    :param recursive: also find all uv.lock under the project root
+    """
+    files: dict[Path, None] = {}
+    for pattern in patterns:
+        if _is_glob(pattern):
+            paths = [Path(i) for i in sorted(glob.glob(pattern, recursive=True))]
+        else:
+            paths = [Path(pattern)]
+        for p in paths:
+            if p.is_dir():
+                p = p / "uv.lock"
+            if p.is_file():
+                files[p] = None
+            else:
+                yellow_warn(f"{str(p)!r} not found!")
+    if recursive:
+        root = Project.get_work_dir(allow_cwd=True)
+        for dirpath, dirs, names in os.walk(root):
+            dirs[:] = sorted(
+                d for d in dirs if d not in SKIP_DIRS and not d.startswith(".")
+            )
+            if "uv.lock" in names:
+                files[Path(_relpath(Path(dirpath, "uv.lock")))] = None
+    return list(files)
+
+
+@cli.command()
+def pypi(
+    files: list[str] | None = typer.Argument(  # noqa:B008
+        default=None, help="Lock files, directories or globs, default to uv.lock"
+    ),
+    dry: bool = DryOption,
+    verbose: bool = False,
+    quiet: bool = False,
+    slim: bool = False,
+    reverse: bool = False,
+    recursive: bool = Option(
+        False, "--recursive", "-r", help="Find all uv.lock under the project root"
+    ),
+) -> None:
+    """Change registry of uv.lock to be pypi.org"""
+    if isinstance(files, str):
+        files = [files]
+    elif not isinstance(files, list):
+        files = None
+    recursive = _ensure_bool(recursive)
+    if recursive or (
+        files and (len(files) > 1 or _is_glob(files[0]) or Path(files[0]).is_dir())
+    ):
+        if not (paths := find_lock_files(files or [], recursive)):
+            yellow_warn("No lock files found!")
+            raise Exit(1)
+        verbose, quiet = _ensure_bool(verbose), _ensure_bool(quiet)
+        if rc := UvPypi.batch(paths, verbose, quiet, _ensure_bool(slim), reverse):
+            raise Exit(rc)
+        return
+    if not (p := Path(files[0] if files else "uv.lock")).exists() and not (
+        (p := Project.get_work_dir() / p.name).exists()
+    ):
+        yellow_warn(f"{p.name!r} not found!")
+        return
+    if p.is_dir():
+        p = p / "uv.lock"
+    UvPypi(p, dry, verbose, quiet, slim, reverse).run()
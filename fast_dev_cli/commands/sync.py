@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import typer
+from typer import Option
+
+from ..project import Project
+from ..tools import ToolRegistry
+from ..utils import DryOption, DryRun, EnvError, _quote_shell_arg, check_call, is_venv
+from .upgrade import UpgradeDependencies
+
+cli = typer.Typer()
+
+
+class Sync(DryRun):
+    def __init__(
+        self, filename: str, extras: str, save: bool, dry: bool = False
+    ) -> None:
+        self.filename = filename
+        self.extras = extras
+        self._save = save
+        super().__init__(dry=dry)
+
+    @staticmethod
+    def has_pip(prefix: str) -> bool:
+        """Whether pip is installed, read site-packages instead of running it"""
+        if not prefix:
+            return ToolRegistry.has_module("pip")
+        venv = Project.get_work_dir(allow_cwd=True) / ".venv"
+        python = venv / (
+            "Scripts/python.exe" if sys.platform == "win32" else "bin/python"
+        )
+        if python.exists():
+            return ToolRegistry.has_module("pip", str(python))
+        return check_call(prefix + "python -m pip --version")
+
+    def gen(self) -> str:
+        extras, save = self.extras, self._save
+        should_remove = not Path.cwd().joinpath(self.filename).exists()
+        filename = _quote_shell_arg(self.filename)
+        if not (tool := Project.get_manage_tool()):
+            if should_remove or not is_venv():
+                raise EnvError("There project is not managed by uv/pdm/poetry!")
+            return f"python -m pip install -r {filename}"
+        prefix = ""
+        if not is_venv():
+            prefix = f"{tool} run " + "--no-sync " * (tool == "uv")
+        ensure_pip = " {1}python -m ensurepip && {1}python -m pip install -U pip &&"
+        export_cmd = "uv export --no-hashes --all-extras --all-groups --frozen"
+        if tool in ("poetry", "pdm"):
+            export_cmd = f"{tool} export --without-hashes --with=dev"
+            if tool == "poetry":
+                ensure_pip = ""
+                if not UpgradeDependencies.should_with_dev():
+                    export_cmd = export_cmd.replace(" --with=dev", "")
+                if extras and isinstance(extras, str | list):
+                    export_cmd += f" --extras={_quote_shell_arg(str(extras))}"
+            elif self.has_pip(prefix):
+                ensure_pip = ""
+        elif self.has_pip(prefix):
+            ensure_pip = ""
+        install_cmd = (
+            f"{{2}} -o {{0}} &&{ensure_pip} {{1}}python -m pip install -r {{0}}"
+        )
+        if should_remove and not save:
+            install_cmd += " && rm -f {0}"
+        return install_cmd.format(filename, prefix, export_cmd)
+
+
+@cli.command()
+def sync(
+    filename: str = "dev_requirements.txt",
+    extras: str = Option("", "--extras", "-E"),
+    save: bool = Option(
+        False, "--save", "-s", help="Whether save the requirement file"
+    ),
+    dry: bool = DryOption,
+) -> None:
+    """Export dependencies by poetry to a txt file then install by pip."""
+    Sync(filename, extras, save, dry=dry).run()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import typer
+from typer import Option, echo
+
+from ..git import GitQuery
+from ..project import Project
+from ..utils import (
+    DryOption,
+    DryRun,
+    ShellCommandError,
+    _ensure_bool,
+    _quote_shell_arg,
+    run_and_echo,
+)
+from .bump import get_current_version
+
+cli = typer.Typer()
+
+
+class GitTag(DryRun):
+    def __init__(self, message: str, dry: bool, no_sync: bool = False) -> None:
+        self.message = message
+        self._no_sync = no_sync
+        self.git = GitQuery()
+        super().__init__(dry=dry)
+
+    def has_v_prefix(self) -> bool:
+        try:
+            return self.git.has_v_prefix()
+        except ShellCommandError:
+            return False
+
+    def should_push(self) -> bool:
+        try:
+            return self.git.ahead() > 0
+        except ShellCommandError:
+            return False
+
+    def gen(self) -> str:
+        should_sync, _version = get_current_version(verbose=False, check_version=True)
+        if self.has_v_prefix():
+            # Add `v` at prefix to compare with bumpversion tool
+            _version = "v" + _version
+        cmd = (
+            f"git tag -a {_quote_shell_arg(_version)} "
+            f"-m {_quote_shell_arg(self.message)} && git push --tags"
+        )
+        if self.should_push():
+            cmd += " && git push"
+        if should_sync and not self._no_sync and (sync := Project.get_sync_command()):
+            cmd = f"{sync} && " + cmd
+        return cmd
+
+    def mark_tag(self) -> bool:
+        self.git.prefetch(GitQuery.STATUS, GitQuery.V_TAG)
+        try:
+            is_clean = not self.git.changes()
+        except ShellCommandError:
+            is_clean = False
+        if not is_clean:
+            run_and_echo("git status")
+            echo("ERROR: Please run git commit to make sure working tree is clean!")
+            return False
+        return bool(super().run())
+
+    def run(self) -> None:
+        if self.mark_tag() and not self.dry:
+            echo("You may want to publish package:\n pdm publish")
+
+
+@cli.command()
+def tag(
+    message: str = Option("", "-m", "--message"),
+    no_sync: bool = Option(
+        False, "--no-sync", help="Do not run sync command to update version"
+    ),
+    dry: bool = DryOption,
+) -> None:
+    """Run shell command: git tag -a <current-version-in-pyproject.toml> -m {message}"""
+    GitTag(message, dry=dry, no_sync=_ensure_bool(no_sync)).run()
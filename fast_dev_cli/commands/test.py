@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import contextlib
+import importlib.util
+import json
+import os
+from collections import defaultdict
+from collections.abc import Mapping
+from pathlib import Path
+from xml.etree import ElementTree
+
+import typer
+from typer import Exit, Option, echo, secho
+
+from ..cache import ResultCache, make_ignored_dir
+from ..impact import ImpactMap, get_changed_lines
+from ..project import Project, ProjectContext
+from ..tools import ToolRegistry
+from ..utils import (
+    DryOption,
+    EnvError,
+    ShellCommandError,
+    _ensure_bool,
+    _ensure_str,
+    _join_shell_args,
+    _quote_shell_arg,
+    exit_if_run_failed,
+    is_venv,
+    run_parallel,
+)
+from .lint import SKIP_DIRS
+
+cli = typer.Typer()
+
+
+def _should_run_test_script(path: Path = Path("scripts")) -> Path | None:
+    for name in ("test.sh", "test.py"):
+        if (file := path / name).exists():
+            return file
+    return None
+
+
+def parse_workers(value: str | None) -> int:
+    """Convert value of `-n` to number of workers, 0 means not to shard"""
+    if not value:
+        return 0
+    if value == "auto":
+        return os.cpu_count() or 1
+    try:
+        workers = int(value)
+    except ValueError:
+        workers = -1
+    if workers < 0:
+        raise typer.BadParameter(
+            f"expect a positive integer or 'auto', got {value!r}", param_hint="-n"
+        )
+    return workers
+
+
+def _coverage_prefix() -> str:
+    if is_venv() and ToolRegistry.is_installed("coverage"):
+        return ""
+    return f"{tool} run " if (tool := Project.get_manage_tool()) else ""
+
+
+def _has_xdist() -> bool:
+    # pytest-cov is required to collect coverage data from the xdist workers
+    return is_venv() and all(
+        importlib.util.find_spec(name) is not None for name in ("xdist", "pytest_cov")
+    )
+
+
+def collect_test_files(root: Path, paths: list[str] | None = None) -> list[str]:
+    """Find out the test files that pytest will run, relative to root"""
+    if not paths:
+        try:
+            doc = ProjectContext.current(root).doc
+        except (EnvError, ValueError):
+            doc = {}
+        options = doc.get("tool", {}).get("pytest", {}).get("ini_options", {})
+        paths = options.get("testpaths") or (
+            ["tests"] if root.joinpath("tests").is_dir() else ["."]
+        )
+    files: set[Path] = set()
+    for path in map(root.joinpath, paths):
+        if path.is_file():
+            files.add(path)
+            continue
+        for pattern in ("test_*.py", "*_test.py"):
+            for p in path.rglob(pattern):
+                parents = p.relative_to(root).parts[:-1]
+                if not any(i in SKIP_DIRS or i.startswith(".") for i in parents):
+                    files.add(p)
+    return sorted(p.relative_to(root).as_posix() for p in files)
+
+
+def parse_shard(value: str | None) -> tuple[int, int] | None:
+    """Convert value of `--shard` like '1/4' to (1, 4)"""
+    if not value:
+        return None
+    index, _, total = value.partition("/")
+    try:
+        shard = int(index), int(total)
+    except ValueError:
+        shard = (0, 0)
+    if not 1 <= shard[0] <= shard[1]:
+        raise typer.BadParameter(
+            f"expect format of 'i/N' with 1 <= i <= N, got {value!r}",
+            param_hint="--shard",
+        )
+    return shard
+
+
+class DurationDB:
+    """Durations of each test recorded from the junit xml reports of pytest.
+
+    They are saved to `.fast_cache/test_durations.json` and used to balance
+    the shards of next run. Every CI job of `--shard i/N` must read the same
+    file to get the same split, so restore it from the cache of CI, or commit
+    one and point `FASTDEVCLI_TEST_DURATIONS` to it.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        cache_dir = ResultCache.default_dir(root).parent
+        self.path = Path(
+            os.getenv("FASTDEVCLI_TEST_DURATIONS") or cache_dir / "test_durations.json"
+        )
+        self.junit_dir = cache_dir / "junit"
+        self.durations = self.load()
+
+    def load(self) -> dict[str, float]:
+        with contextlib.suppress(OSError, ValueError):
+            if isinstance(data := json.loads(self.path.read_text()), dict):
+                return data
+        return {}
+
+    def save(self) -> None:
+        # Forget the tests of removed files
+        durations = {
+            k: v
+            for k, v in self.durations.items()
+            if self.root.joinpath(k.split("::")[0]).exists()
+        }
+        with contextlib.suppress(OSError):
+            make_ignored_dir(self.junit_dir.parent)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(durations, indent=1, sort_keys=True))
+
+    def file_durations(self) -> dict[str, float]:
+        totals: dict[str, float] = defaultdict(float)
+        for node_id, seconds in self.durations.items():
+            totals[node_id.split("::")[0]] += seconds
+        return totals
+
+    def estimate(self, files: list[str]) -> dict[str, float] | None:
+        """Predicted seconds of each file, None if there is no record at all
+
+        Files without records are estimated by their sizes.
+        """
+        if not (known := self.file_durations()):
+            return None
+        sizes = {f: self.root.joinpath(f).stat().st_size for f in files}
+        known_size = sum(sizes[f] for f in files if f in known)
+        known_time = sum(known[f] for f in files if f in known)
+        rate = known_time / known_size if known_size else 0.001
+        return {f: known[f] if f in known else sizes[f] * rate for f in files}
+
+    def junit_file(self, index: int) -> Path:
+        return self.junit_dir / f"shard-{index}.xml"
+
+    def junit_args(self, index: int) -> str:
+        path = self.junit_file(index)
+        with contextlib.suppress(ValueError):
+            path = path.relative_to(self.root)
+        return _join_shell_args([f"--junitxml={path}", "-o", "junit_family=xunit1"])
+
+    def clear_reports(self, count: int) -> None:
+        """Remove reports of last run, in case a shard crashes before writing"""
+        for index in range(count):
+            self.junit_file(index).unlink(missing_ok=True)
+
+    def record(self, count: int) -> list[float | None]:
+        """Update durations from the reports, return total seconds of each"""
+        costs: list[float | None] = []
+        for index in range(count):
+            try:
+                tree = ElementTree.parse(self.junit_file(index))
+            except (OSError, ElementTree.ParseError):
+                costs.append(None)
+                continue
+            root = tree.getroot()
+            suites = [root] if root.tag == "testsuite" else root.iter("testsuite")
+            costs.append(sum(float(i.get("time") or 0) for i in suites))
+            for case in root.iter("testcase"):
+                if file := case.get("file"):
+                    # classname is like 'tests.test_a.TestA' for test methods
+                    module = file.removesuffix(".py").replace("/", ".")
+                    scope = (case.get("classname") or "").removeprefix(module)
+                    names = [file, *scope.split(".")[1:], case.get("name") or ""]
+                    self.durations["::".join(names)] = float(case.get("time") or 0)
+        self.save()
+        return costs
+
+
+def shard_tests(
+    files: list[str], workers: int, weights: Mapping[str, float]
+) -> list[list[str]]:
+    """Split test files into at most `workers` shards of similar weights
+
+    The longest files are placed first, each one into the lightest shard.
+    """
+    shards: list[list[str]] = [[] for _ in range(min(workers, len(files)))]
+    if not shards:
+        return []
+    loads = [0.0] * len(shards)
+    for file in sorted(files, key=lambda f: (-weights[f], f)):
+        i = min(range(len(shards)), key=lambda j: (loads[j], len(shards[j])))
+        shards[i].append(file)
+        loads[i] += weights[file]
+    return shards
+
+
+def echo_shard_report(
+    shards: list[list[str]],
+    predicted: list[float] | None,
+    actual: list[float | None],
+    offset: str = "",
+) -> None:
+    echo(f"{'Shard':<10}{'Files':>6}{'Predicted':>12}{'Actual':>10}")
+    for i, (files, cost) in enumerate(zip(shards, actual, strict=True)):
+        expect = "-" if predicted is None else f"{predicted[i]:.2f}s"
+        real = "-" if cost is None else f"{cost:.2f}s"
+        name = offset or f"{i + 1}/{len(shards)}"
+        echo(f"{name:<10}{len(files):>6}{expect:>12}{real:>10}")
+
+
+def sharded_test(
+    workers: int,
+    dry: bool = False,
+    paths: list[str] | None = None,
+    shard: tuple[int, int] | None = None,
+) -> None:
+    root = Project.get_work_dir(allow_cwd=True)
+    if root != Path.cwd():
+        os.chdir(root)
+    prefix = _coverage_prefix()
+    report = f'{prefix}coverage report --omit="tests/*" -m'
+    db = DurationDB(root)
+    if shard is None and _has_xdist():
+        args = " " + _join_shell_args(paths) if paths else ""
+        pytest = f"pytest -n {workers} --cov --cov-report= {db.junit_args(0)}{args}"
+        if not dry:
+            db.clear_reports(1)
+        try:
+            exit_if_run_failed(f"{prefix}{pytest} && {report}", dry=dry)
+        finally:
+            if not dry:
+                db.record(1)
+        return
+    files = collect_test_files(root, paths)
+    sizes: dict[str, float] = {f: root.joinpath(f).stat().st_size for f in files}
+    weights = db.estimate(files)
+    name = ""
+    if shard is not None:
+        index, total = shard
+        name = f"{index}/{total}"
+        selected = shard_tests(files, total, weights or sizes)
+        files = selected[index - 1] if index <= len(selected) else []
+        if not files:
+            echo(f"No test files in shard {name}.")
+            return
+    shards = shard_tests(files, max(workers, 1), weights or sizes)
+    exit_if_run_failed(f"{prefix}coverage erase", dry=dry)
+    commands = [
+        f"{prefix}coverage run --parallel-mode -m pytest -s {db.junit_args(i)} "
+        + _join_shell_args(files)
+        for i, files in enumerate(shards)
+    ]
+    if not dry:
+        db.clear_reports(len(shards))
+    codes = run_parallel(commands, dry=dry)
+    exit_if_run_failed(f"{prefix}coverage combine && {report}", dry=dry)
+    if not dry:
+        predicted = (
+            None if weights is None else [sum(weights[f] for f in i) for i in shards]
+        )
+        echo_shard_report(shards, predicted, db.record(len(shards)), name)
+    if any(codes):
+        raise Exit(1)
+
+
+def affected_test(dry: bool = False) -> None:
+    """Only run the tests that executed the lines changed since last full run"""
+    root = Project.get_work_dir(allow_cwd=True)
+    if root != Path.cwd():
+        os.chdir(root)
+    impact = ImpactMap(root)
+    test_files = collect_test_files(root)
+    data = impact.load()
+    if commit := data.get("commit", ""):
+        try:
+            changed = get_changed_lines(commit)
+        except ShellCommandError:
+            selected = None  # Commit not exists any more, e.g.: rebased
+        else:
+            selected = impact.select(data, changed, test_files)
+        if selected is not None:
+            tip = f"tests affected by the changes since {commit[:8]}"
+            if not selected:
+                echo(f"No {tip}.")
+                return
+            echo(f"Run {len(selected)} {tip}:")
+            return test(dry, paths=selected)
+    if not (head := impact.head_commit()):
+        secho("ERROR: `--affected` requires the project to be a git repo", fg="red")
+        raise Exit(1)
+    echo("Run all tests to record which lines each test executes.")
+    if not dry:
+        impact.write_rc_file()
+    exit_if_run_failed(impact.record_command(_coverage_prefix()), dry=dry)
+    if not dry:
+        impact.build(test_files, head)
+        echo(f"Saved test impact map to {impact.path}")
+
+
+def test(
+    dry: bool,
+    ignore_script: bool = False,
+    paths: list[str] | None = None,
+    workers: int = 0,
+    shard: tuple[int, int] | None = None,
+    affected: bool = False,
+) -> None:
+    if affected:
+        return affected_test(dry)
+    if workers or shard:
+        return sharded_test(workers, dry=dry, paths=paths, shard=shard)
+    cwd = Path.cwd()
+    root = Project.get_work_dir(cwd=cwd, allow_cwd=True)
+    script_dir = root / "scripts"
+    if (
+        not paths
+        and not _ensure_bool(ignore_script)
+        and (test_script := _should_run_test_script(script_dir))
+    ):
+        cmd = _quote_shell_arg(test_script.relative_to(root).as_posix())
+        if test_script.suffix == ".py":
+            cmd = "python " + cmd
+        if cwd != root:
+            cmd = f"cd {_quote_shell_arg(root)} && " + cmd
+    else:
+        pytest = "pytest -s"
+        if paths:
+            pytest += " " + _join_shell_args(paths)
+        cmd = f'coverage run -m {pytest} && coverage report --omit="tests/*" -m'
+        if prefix := _coverage_prefix():
+            sep = " && "
+            cmd = sep.join(prefix + i for i in cmd.split(sep))
+    exit_if_run_failed(cmd, dry=dry)
+
+
+@cli.command(name="test")
+def coverage_test(
+    dry: bool = DryOption,
+    ignore_script: bool = Option(False, "--ignore-script", "-i"),
+    workers: str = Option(
+        "",
+        "--numprocesses",
+        "-n",
+        help="Shard tests across <workers> processes, or 'auto' to use all cores",
+    ),
+    shard: str = Option(
+        "", help="Only run the i-th of N shards(balanced by durations), e.g.: 1/4"
+    ),
+    affected: bool = Option(
+        False, help="Only run the tests affected by the changes since last full run"
+    ),
+) -> None:
+    """Run unittest by pytest and report coverage"""
+    return test(
+        dry,
+        ignore_script,
+        workers=parse_workers(_ensure_str(workers)),
+        shard=parse_shard(_ensure_str(shard)),
+        affected=_ensure_bool(affected),
+    )
@@ -0,0 +1,642 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from collections.abc import Container
+from typing import TYPE_CHECKING, Any, NamedTuple, cast, get_args
+
+import typer
+from typer import Exit, Option, echo, secho
+
+from ..index import PackageIndex, normalize, version_key
+from ..project import Project, ProjectContext
+from ..utils import (
+    DryOption,
+    DryRun,
+    EnvError,
+    ParseError,
+    StrEnum,
+    ToolName,
+    ToolOption,
+    _ensure_bool,
+    _ensure_str,
+    tomllib,
+)
+
+if TYPE_CHECKING:
+    if sys.version_info >= (3, 11):
+        from typing import Self
+    else:
+        from typing_extensions import Self
+
+cli = typer.Typer()
+# Headings of tables, e.g.: `[tool.poetry.group."dev".dependencies]`
+HEADING = re.compile(r"^[ \t]*\[\[?([^\[\]\n]+)\]\]?[ \t]*(?:#.*)?$", re.MULTILINE)
+# Requirement of PEP 508, e.g.: `typer[all] (>=0.12.3,<0.13.0); python_version>'3.8'`
+REQUIREMENT = re.compile(
+    r"\s*(?P<name>[A-Za-z0-9][\w.-]*)\s*(?:\[(?P<extras>[^\]]*)\])?"
+    r"\s*(?P<spec>[^;]*?)\s*(?:;\s*(?P<markers>.*?))?\s*"
+)
+# Line that starts with a key, e.g.: `"typer" = `
+KEY_LINE = re.compile(r"^[ \t]*[\"']?[\w.-]+[\"']?[ \t]*=", re.MULTILINE)
+POETRY_CONSTRAINT = re.compile(r"(?P<op>[\^~]=?)(?P<version>\S+)")
+PEP508_CONSTRAINT = re.compile(r"(?P<op>>=|~=|==)\s*(?P<version>[\w.]+)")
+PEP508_RANGE = re.compile(r">=\s*(?P<version>[\w.]+)\s*,\s*<\s*(?P<upper>[\w.]+)")
+PYTHON_LOWER = re.compile(r"(?:\^|~=?|>=|==)\s*(\d+(?:\.\d+)*)")
+
+
+def caret_upper(version: str) -> str:
+    """Upper bound of caret constraint, e.g.: 0.12.3 -> 0.13.0, 1.2.3 -> 2.0.0"""
+    parts = [int(i) for i in version.split(".post")[0].split(".")]
+    index = next((i for i, p in enumerate(parts) if p), len(parts) - 1)
+    parts[index] += 1
+    parts[index + 1 :] = [0] * (len(parts) - index - 1)
+    return ".".join(map(str, parts))
+
+
+def python_lower_bound(doc: dict[str, Any]) -> tuple[int, ...] | None:
+    """Lowest python version that the project supports, e.g.: ^3.10 -> (3, 10)"""
+    spec = doc.get("project", {}).get("requires-python")
+    if spec is None:
+        poetry = doc.get("tool", {}).get("poetry", {})
+        spec = poetry.get("dependencies", {}).get("python")
+    if not isinstance(spec, str) or not (m := PYTHON_LOWER.search(spec)):
+        return None
+    return tuple(int(i) for i in m.group(1).split("."))
+
+
+def dump_value(value: Any) -> str:
+    """Value of toml in one line, to show where a dependency is declared"""
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, list):
+        return "[" + ", ".join(map(dump_value, value)) + "]"
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{k} = {dump_value(v)}" for k, v in value.items()) + "}"
+    return json.dumps(value, ensure_ascii=False)
+
+
+class Dependency(NamedTuple):
+    name: str
+    # `^0.9.0` of poetry or `>=0.9.0` of PEP 508, empty for poetry dependency
+    # that is declared by a list of constraints for different conditions
+    constraint: str
+    group: str = "main"
+    extras: tuple[str, ...] = ()
+    markers: str = ""
+    source: str = ""
+    platform: str = ""
+    optional: bool = False
+    # url/git/path of the dependency that is not installed from package index
+    url: str = ""
+    # Table that the dependency is declared in, e.g.: tool.poetry.dependencies
+    table: str = ""
+    # `typer = "^0.9.0"` of poetry, or the requirement string of PEP 508
+    text: str = ""
+
+    @classmethod
+    def from_poetry(
+        cls: type[Self], name: str, value: Any, group: str = "main", table: str = ""
+    ) -> Self:
+        text = f"{name} = {dump_value(value)}"
+        if isinstance(value, str):
+            return cls(name, value.strip(), group, table=table, text=text)
+        if not isinstance(value, dict):
+            return cls(name, "", group, table=table, text=text)
+        url = next((str(value[k]) for k in ("url", "git", "path") if k in value), "")
+        return cls(
+            name,
+            str(value.get("version", "" if url else "*")).strip(),
+            group,
+            extras=tuple(value.get("extras", ())),
+            markers=str(value.get("markers", "")),
+            source=str(value.get("source", "")),
+            platform=str(value.get("platform", "")),
+            optional=bool(value.get("optional", False)),
+            url=url,
+            table=table,
+            text=text,
+        )
+
+    @classmethod
+    def from_requirement(
+        cls: type[Self],
+        requirement: str,
+        group: str = "main",
+        table: str = "project",
+        optional: bool = False,
+    ) -> Self:
+        if (m := REQUIREMENT.fullmatch(requirement)) is None:
+            raise ParseError(f"Invalid requirement: {requirement!r}")
+        spec, url = m.group("spec"), ""
+        if spec.startswith("@"):
+            spec, url = "", spec[1:].strip()
+        extras = tuple(e.strip() for e in (m.group("extras") or "").split(","))
+        return cls(
+            m.group("name"),
+            spec.strip("()").replace(" ", ""),
+            group,
+            extras=tuple(e for e in extras if e),
+            markers=m.group("markers") or "",
+            optional=optional,
+            url=url,
+            table=table,
+            text=requirement,
+        )
+
+    def __str__(self) -> str:
+        return self.text
+
+    @property
+    def is_pep508(self) -> bool:
+        return not self.table.startswith("tool.poetry")
+
+    @property
+    def upgradable(self) -> bool:
+        """Whether the constraint can be raised by version from package index"""
+        if self.url or self.source:
+            return False
+        if not self.is_pep508:
+            return POETRY_CONSTRAINT.fullmatch(self.constraint) is not None
+        return bool(PEP508_CONSTRAINT.fullmatch(self.constraint) or self.caret_range())
+
+    def caret_range(self) -> str | None:
+        """Lower bound of `>=x,<y` that is written by poetry for `^x`"""
+        if (m := PEP508_RANGE.fullmatch(self.constraint)) is None:
+            return None
+        version = m.group("version")
+        if version_key(version) is None or caret_upper(version) != m.group("upper"):
+            return None
+        return version
+
+    def raised(self, latest: str) -> str | None:
+        """New constraint allows the latest version, None if no need to raise"""
+        if not self.upgradable or (new_key := version_key(latest)) is None:
+            return None
+        if (current := self.caret_range()) is not None:
+            new = f">={latest},<{caret_upper(latest)}"
+        else:
+            pattern = PEP508_CONSTRAINT if self.is_pep508 else POETRY_CONSTRAINT
+            m = cast(re.Match, pattern.fullmatch(self.constraint))
+            current, new = m.group("version"), m.group("op") + latest
+        if (old_key := version_key(current)) is None or new_key <= old_key:
+            return None
+        return new
+
+    def requirement(self, constraint: str) -> str:
+        """Requirement string of PEP 508 with the constraint replaced"""
+        m = cast(re.Match, REQUIREMENT.fullmatch(self.text))
+        spec = f"({constraint})" if m.group("spec").startswith("(") else constraint
+        start, end = m.span("spec")
+        return self.text[:start] + spec + self.text[end:]
+
+
+def load_dependencies(doc: dict[str, Any]) -> list[Dependency]:
+    """Dependencies declared in poetry tables, PEP 621 and PEP 735"""
+    deps: list[Dependency] = []
+    poetry = doc.get("tool", {}).get("poetry", {})
+    tables = [
+        ("main", "dependencies", poetry.get("dependencies")),
+        ("dev", "dev-dependencies", poetry.get("dev-dependencies")),
+    ]
+    for name, group in poetry.get("group", {}).items():
+        table = f"group.{name}.dependencies"
+        tables.append((name, table, group.get("dependencies")))
+    for group, table, items in tables:
+        for name, value in (items or {}).items():
+            if name.lower() != "python":
+                deps.append(
+                    Dependency.from_poetry(name, value, group, f"tool.poetry.{table}")
+                )
+    project = doc.get("project", {})
+    requirements = [("main", "project", False, project.get("dependencies"))]
+    for extra, items in project.get("optional-dependencies", {}).items():
+        requirements.append((extra, "project.optional-dependencies", True, items))
+    for group, items in doc.get("dependency-groups", {}).items():
+        requirements.append((group, "dependency-groups", False, items))
+    pdm = doc.get("tool", {}).get("pdm", {})
+    for group, items in pdm.get("dev-dependencies", {}).items():
+        requirements.append((group, "tool.pdm.dev-dependencies", False, items))
+    sources = doc.get("tool", {}).get("uv", {}).get("sources", {})
+    for group, table, optional, items in requirements:
+        for item in items or []:
+            # Skip `{include-group = "lint"}` of PEP 735
+            if isinstance(item, str):
+                dep = Dependency.from_requirement(item, group, table, optional)
+                if isinstance(source := sources.get(dep.name), dict):
+                    keys = ("url", "git", "path")
+                    url = next((str(source[k]) for k in keys if k in source), "")
+                    dep = dep._replace(url=url, source=str(source.get("index", "")))
+                deps.append(dep)
+    return deps
+
+
+def table_spans(text: str) -> list[tuple[str, int, int]]:
+    """Name, start and end of each table in the toml text"""
+    spans: list[tuple[str, int, int]] = []
+    name, start = "", 0
+    for m in HEADING.finditer(text):
+        spans.append((name, start, m.start()))
+        name, start = re.sub(r"[\s\"']", "", m.group(1)), m.end()
+    spans.append((name, start, len(text)))
+    return spans
+
+
+def locate_constraint(
+    text: str,
+    spans: list[tuple[str, int, int]],
+    dep: Dependency,
+    taken: Container[int] = (),
+) -> tuple[int, int] | None:
+    """Position of the constraint string of the dependency in toml text
+
+    :param taken: start positions that were located for other dependencies,
+        the same requirement string may be declared in several groups
+    """
+    if dep.is_pep508:
+        literal = re.compile("([\"'])" + re.escape(dep.text) + r"\1")
+        for name, start, end in spans:
+            # Top level, the table itself or its parent, e.g.: `[project]`
+            inside = not name or dep.table == name or dep.table.startswith(name + ".")
+            if not inside:
+                continue
+            for m in literal.finditer(text, start, end):
+                if m.start() + 1 not in taken:
+                    return m.start() + 1, m.end() - 1
+        return None
+    key = re.compile(
+        r"^[ \t]*([\"']?)" + re.escape(dep.name) + r"\1[ \t]*=", re.MULTILINE
+    )
+    value = re.compile(
+        r"(?:\A[ \t]*|\bversion[ \t]*=[ \t]*)([\"'])"
+        + re.escape(dep.constraint)
+        + r"\1"
+    )
+    for name, start, end in spans:
+        if name == dep.table and (k := key.search(text, start, end)):
+            # An entry ends at the line of next key, so that the inline table
+            # of which arrays span multiple lines can be located as well
+            n = KEY_LINE.search(text, k.end(), end)
+            entry = text[k.end() : n.start() if n else end]
+            if v := value.search(entry):
+                offset = k.end() + v.end() - len(dep.constraint) - 1
+                return offset, offset + len(dep.constraint)
+    return None
+
+
+class Change(NamedTuple):
+    group: str
+    name: str
+    old: str
+    new: str
+    latest: str
+
+
+class UpgradeDependencies(Project, DryRun):
+    def __init__(
+        self,
+        _exit: bool = False,
+        dry: bool = False,
+        tool: ToolName = "poetry",
+        rewrite: bool = False,
+        show_plan: bool = False,
+        offline: bool | None = None,
+    ) -> None:
+        super().__init__(_exit, dry)
+        self._tool = tool
+        self._rewrite = rewrite
+        self._show_plan = show_plan
+        self._offline = offline
+        self.constraints: dict[str, str] = {}
+        self._new_text: str | None = None
+
+    class DevFlag(StrEnum):
+        new = "[tool.poetry.group.dev.dependencies]"
+        old = "[tool.poetry.dev-dependencies]"
+
+    @staticmethod
+    def parse_value(version_info: str, key: str) -> str:
+        """Pick out the value for key in version info.
+
+        Example::
+            >>> s= 'typer = {extras = ["all"], version = "^0.9.0", optional = true}'
+            >>> UpgradeDependencies.parse_value(s, 'extras')
+            'all'
+            >>> UpgradeDependencies.parse_value(s, 'optional')
+            'true'
+            >>> UpgradeDependencies.parse_value(s, 'version')
+            '^0.9.0'
+        """
+        if not version_info.lstrip().startswith("{"):
+            version_info = version_info.split("=", 1)[-1]
+        try:
+            table = tomllib.loads(f"_ = {version_info.strip()}")["_"]
+        except tomllib.TOMLDecodeError as e:
+            raise ParseError(f"Invalid inline table: {version_info}") from e
+        if (value := table.get(key)) is None:
+            return ""
+        if isinstance(value, list):
+            return ",".join(map(str, value))
+        return dump_value(value).strip('"')
+
+    @staticmethod
+    def no_need_upgrade(version_info: str | Dependency, line: str) -> bool:
+        if isinstance(version_info, Dependency):
+            dep = version_info
+        else:
+            value: Any = version_info.strip()
+            if value.startswith(("{", "[")):
+                try:
+                    value = tomllib.loads(f"_ = {value}")["_"]
+                except tomllib.TOMLDecodeError as e:
+                    raise ParseError(f"Invalid dependency: {line}") from e
+            dep = Dependency.from_poetry("_", value)
+        if dep.url:
+            echo(f"No need to upgrade for: {line}")
+            return True
+        if (v := dep.constraint) == "*":
+            echo(f"Skip wildcard line: {line}")
+            return True
+        elif not v:
+            echo(f"Skip complex dependence: {line}")
+            return True
+        elif v.startswith((">", "<")) or v[0].isdigit():
+            echo(f"Ignore bigger/smaller/equal: {line}")
+            return True
+        return False
+
+    @classmethod
+    def build_args(
+        cls: type[Self], dependencies: list[Dependency] | list[str]
+    ) -> tuple[list[str], dict[str, list[str]]]:
+        """Arguments of `poetry add` for the dependencies(or lines of them)"""
+        args: list[str] = []  # ['typer[all]', 'fastapi']
+        specials: dict[str, list[str]] = {}  # {'--platform linux': ['gunicorn']}
+        deps = cast(list[Dependency], dependencies)
+        if dependencies and isinstance(dependencies[0], str):
+            try:
+                table = tomllib.loads("\n".join(cast(list[str], dependencies)))
+            except tomllib.TOMLDecodeError as e:
+                raise ParseError(f"Failed to parse dependencies: {e}") from e
+            deps = load_dependencies({"tool": {"poetry": {"dependencies": table}}})
+        for dep in deps:
+            if dep.name.lower() == "python" or cls.no_need_upgrade(dep, str(dep)):
+                continue
+            package = dep.name
+            if dep.extras:
+                package += "[" + ",".join(dep.extras) + "]"
+            item = f'"{package}@latest"'
+            options = []
+            if dep.platform:
+                options.append(f"--platform={dep.platform}")
+            if dep.source:
+                options.append(f"--source={dep.source}")
+            if dep.optional:
+                options.append("--optional")
+            if options:
+                specials.setdefault(" ".join(options), []).append(item)
+            else:
+                args.append(item)
+        return args, specials
+
+    @classmethod
+    def should_with_dev(cls: type[Self]) -> bool:
+        text = cls.load_toml_text()
+        return cls.DevFlag.new in text or cls.DevFlag.old in text
+
+    @classmethod
+    def get_args(
+        cls: type[Self], toml_text: str | None = None
+    ) -> tuple[list[str], list[str], list[list[str]], str]:
+        if toml_text is None:
+            toml_text = cls.load_toml_text()
+            doc = cls.load_toml()
+        else:
+            try:
+                doc = tomllib.loads(toml_text)
+            except tomllib.TOMLDecodeError as e:
+                raise ParseError(f"Failed to parse toml: {e}") from e
+        poetry = doc.get("tool", {}).get("poetry", {})
+        if "dependencies" not in poetry and not cls.is_poetry_v2(toml_text):
+            title = "[tool.poetry.dependencies]"
+            raise EnvError(f"{title} not found! Make sure this is a poetry project.")
+        dev_table, dev_flag = "tool.poetry.group.dev.dependencies", "--group dev"
+        if "dependencies" not in poetry.get("group", {}).get("dev", {}):
+            dev_table, dev_flag = "tool.poetry.dev-dependencies", "--dev"  # poetry<=1.2
+        deps = load_dependencies({"tool": {"poetry": poetry}})
+        others: list[list[str]] = []
+        prod_packs, specials = cls.build_args(
+            [d for d in deps if d.table == "tool.poetry.dependencies"]
+        )
+        if specials:
+            others.extend([[k] + v for k, v in specials.items()])
+        dev_packs, specials = cls.build_args([d for d in deps if d.table == dev_table])
+        if specials:
+            others.extend([[k] + v + [dev_flag] for k, v in specials.items()])
+        return prod_packs, dev_packs, others, dev_flag
+
+    @classmethod
+    def gen_cmd(cls: type[Self]) -> str:
+        main_args, dev_args, others, dev_flags = cls.get_args()
+        return cls.to_cmd(main_args, dev_args, others, dev_flags)
+
+    @staticmethod
+    def to_cmd(
+        main_args: list[str],
+        dev_args: list[str],
+        others: list[list[str]],
+        dev_flags: str,
+    ) -> str:
+        command = "poetry add "
+        _upgrade = ""
+        if main_args:
+            _upgrade = command + " ".join(main_args)
+        if dev_args:
+            if _upgrade:
+                _upgrade += " && "
+            _upgrade += command + dev_flags + " " + " ".join(dev_args)
+        for single in others:
+            _upgrade += f" && poetry add {' '.join(single)}"
+        return _upgrade
+
+    @staticmethod
+    def package_name(item: str) -> str:
+        """Example: '"typer[all]@latest"' -> 'typer'"""
+        return item.strip('"').split("@")[0].split("[")[0]
+
+    @staticmethod
+    def raise_constraints(
+        text: str, versions: dict[str, str]
+    ) -> tuple[str, list[Change]]:
+        """Raise constraints of dependencies to allow the new versions
+
+        `^`/`~` constraints of poetry, `>=`/`~=`/`==` and the `>=x,<y` written
+        by poetry for `^x` of PEP 508 are raised, others are kept as is.
+
+        :param versions: {normalized name: latest version}
+        :return: new text and the changed constraints
+        """
+        try:
+            deps = load_dependencies(tomllib.loads(text))
+        except tomllib.TOMLDecodeError as e:
+            raise ParseError(f"Failed to parse toml: {e}") from e
+        spans = table_spans(text)
+        edits: dict[int, tuple[int, str]] = {}
+        changes: list[Change] = []
+        for dep in deps:
+            if (latest := versions.get(normalize(dep.name))) is None:
+                continue
+            if (new := dep.raised(latest)) is None:
+                continue
+            if (position := locate_constraint(text, spans, dep, edits)) is None:
+                continue
+            start, end = position
+            edits[start] = (end, dep.requirement(new) if dep.is_pep508 else new)
+            changes.append(Change(dep.group, dep.name, dep.constraint, new, latest))
+        for start in sorted(edits, reverse=True):
+            end, value = edits[start]
+            text = text[:start] + value + text[end:]
+        return text, changes
+
+    def collect_changes(self) -> tuple[str, list[Change], list[str]]:
+        """Raise constraints by latest versions from package index
+
+        :return: new text of pyproject.toml, the changed constraints and
+            `poetry add` commands for packages of private source
+        """
+        commands: list[str] = []
+        if self._tool == "poetry":
+            *_, others, _ = self.get_args()
+            commands = [
+                f"poetry add {' '.join(single)}"
+                for single in others
+                if "--source=" in single[0]
+            ]
+        doc = self.load_toml()
+        names = [d.name for d in load_dependencies(doc) if d.upgradable]
+        # Releases that drop the python versions of project can not be resolved
+        versions = PackageIndex(offline=self._offline).latest_versions(
+            names, python_lower_bound(doc)
+        )
+        # Keep line endings of the file
+        text = ProjectContext.current().toml_file.read_bytes().decode("utf-8")
+        new_text, changes = self.raise_constraints(
+            text, {normalize(k): v for k, v in versions.items()}
+        )
+        return new_text, changes, commands
+
+    def gen_rewrite(self, then: str = "poetry update") -> str:
+        """Raise constraints in one pass, then resolve and install only once
+        by `then`. Packages of private source are still upgraded by
+        `poetry add`.
+        """
+        new_text, changes, commands = self.collect_changes()
+        for c in changes:
+            echo(f"{c.name}: {c.old} \u2192 {c.new}")
+        if not changes:
+            echo("All constraints are up to date.")
+        self.constraints = {c.name: c.new for c in changes}
+        self._new_text = new_text if changes else None
+        return " && ".join([*commands, then])
+
+    def show_plan(self) -> None:
+        """Print the outdated packages and the proposed constraints"""
+        start = time.perf_counter()
+        _, changes, commands = self.collect_changes()
+        if changes:
+            width = max(12, *(len(c.name) + 2 for c in changes))
+            group_width = max(8, *(len(c.group) + 2 for c in changes))
+            old_width = max(14, *(len(c.old) + 2 for c in changes))
+            secho(
+                f"{'Package':<{width}}{'Group':<{group_width}}"
+                f"{'Current':<{old_width}}{'Latest':<14}Proposed",
+                bold=True,
+            )
+            for c in changes:
+                echo(
+                    f"{c.name:<{width}}{c.group:<{group_width}}"
+                    f"{c.old:<{old_width}}{c.latest:<14}{c.new}"
+                )
+        for cmd in commands:
+            echo(f"Packages of private source will be upgraded by: {cmd}")
+        cost = time.perf_counter() - start
+        echo(f"{len(changes)} constraints to raise, planned in {cost:.2f}s")
+
+    def rewrite(self) -> None:
+        """Save the constraints raised by `gen_rewrite` to pyproject.toml"""
+        if self.dry or (text := self._new_text) is None:
+            return
+        path = ProjectContext.current().toml_file
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_bytes(text.encode("utf-8"))
+            shutil.copymode(path, tmp)
+            os.replace(tmp, path)
+        except OSError as e:
+            tmp.unlink(missing_ok=True)
+            secho(f"Failed to update {path}: {e}", fg="red")
+            raise Exit(1) from e
+        ProjectContext.clear()
+        echo(f"Updated {len(self.constraints)} constraints in {path}")
+
+    def run(self) -> None:
+        if self._show_plan:
+            self.show_plan()
+            return
+        if not self._rewrite:
+            super().run()
+            return
+        plan = self.plan()
+        self.rewrite()
+        plan.finish(_exit=self._exit, dry=self.dry)
+
+    def gen(self) -> str:
+        if self._tool == "uv":
+            up = "uv lock --upgrade --verbose"
+            deps = "uv sync --inexact --frozen --all-groups --all-extras"
+            command = f"{up} && {deps}"
+        elif self._tool == "pdm":
+            command = "pdm update --verbose && pdm install -G :all --frozen"
+        elif self._rewrite:
+            return self.gen_rewrite()
+        else:
+            return self.gen_cmd() + " && poetry lock && poetry update"
+        return self.gen_rewrite(command) if self._rewrite else command
+
+
+@cli.command()
+def upgrade(
+    tool: str = ToolOption,
+    rewrite: bool = Option(
+        False,
+        "--rewrite",
+        help="Raise constraints in pyproject.toml in one pass, then lock only once",
+    ),
+    plan: bool = Option(
+        False, "--plan", help="Only print outdated packages and proposed constraints"
+    ),
+    offline: bool = Option(
+        False,
+        "--offline",
+        help="Read versions from local cache of package index, never fetch them",
+    ),
+    dry: bool = DryOption,
+) -> None:
+    """Upgrade dependencies in pyproject.toml to latest versions"""
+    if not (tool := _ensure_str(tool) or "") or tool == ToolOption.default:
+        tool = Project.get_manage_tool() or "uv"
+    if tool in get_args(ToolName):
+        UpgradeDependencies(
+            dry=dry,
+            tool=cast(ToolName, tool),
+            rewrite=_ensure_bool(rewrite),
+            show_plan=_ensure_bool(plan),
+            offline=_ensure_bool(offline) or None,
+        ).run()
+    else:
+        secho(f"Unknown tool {tool!r}", fg=typer.colors.YELLOW)
+        raise typer.Exit(1)
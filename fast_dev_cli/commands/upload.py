@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import contextlib
+import os
+
+import typer
+
+from ..project import Project
+from ..utils import (
+    DryOption,
+    EnvError,
+    StrEnum,
+    ToolOption,
+    _ensure_str,
+    exit_if_run_failed,
+    yellow_warn,
+)
+
+cli = typer.Typer()
+
+
+def _not_a_distribution() -> bool:
+    with contextlib.suppress(FileNotFoundError, KeyError, EnvError):
+        doc = Project.load_toml()
+        match doc["build-system"]["build-backend"]:
+            case "pdm.backend":
+                return doc.get("tool", {}).get("pdm", {}).get("distribution") is False
+    return True
+
+
+class Publish:
+    class CommandEnum(StrEnum):
+        poetry = "poetry publish --build"
+        pdm = "pdm publish"
+        uv = "uv build && uv publish"
+        twine = "python -m build && twine upload"
+
+    @classmethod
+    def gen(cls, tool: str | None, verbose: bool) -> str:
+        if tool == "auto":
+            tool = Project.get_manage_tool() or ""
+        if tool:
+            if tool == "uv":
+                envs = ["UV_PUBLISH_INDEX", "UV_PUBLISH_URL", "UV_PUBLISH_TOKEN"]
+                if not any(os.getenv(i) for i in envs):
+                    if _not_a_distribution():
+                        if verbose:
+                            yellow_warn(
+                                "Skip uv publish as project is not distribution"
+                            )
+                        return "fast version"
+                    if verbose:
+                        yellow_warn(f"Skip uv publish as envs ({envs}) not set")
+                    return "uv build"
+            elif tool == "pdm":
+                env = "PDM_PUBLISH_REPO"
+                if not os.getenv(env):
+                    if verbose:
+                        yellow_warn(f"Skip pdm publish as env ({env}) not set")
+                    return "pdm build"
+            return cls.CommandEnum[tool]
+        return cls.CommandEnum.twine
+
+
+@cli.command()
+def upload(
+    verbose: bool = False,
+    tool: str = ToolOption,
+    dry: bool = DryOption,
+) -> None:
+    """Shortcut for package publish"""
+    cmd = Publish.gen(_ensure_str(tool), verbose)
+    exit_if_run_failed(cmd, dry=dry)
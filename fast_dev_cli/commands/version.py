@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import contextlib
+from typing import Any
+
+import typer
+from typer import echo
+
+from .. import __version__
+from ..project import Project
+from ..utils import TOML_FILE, EnvError
+from .bump import _get_frontend_version
+
+cli = typer.Typer()
+
+
+def _echo_version(version_file: Any, value: str) -> None:
+    styled = typer.style(value, bold=True)
+    echo(f"Version value in {version_file}: " + styled)
+
+
+@cli.command()
+def version() -> None:
+    """Show the version of this tool"""
+    echo("Fast Dev Cli Version: " + typer.style(__version__, fg=typer.colors.BLUE))
+    with contextlib.suppress(FileNotFoundError, KeyError):
+        try:
+            doc = Project.load_toml()
+        except EnvError:
+            if (res := _get_frontend_version()) is not None:
+                _echo_version(*res)
+                return
+            raise
+        if value := doc.get("project", {}).get("version", ""):
+            styled = typer.style(value, bold=True, fg=typer.colors.CYAN)
+            if project_name := doc["project"].get("name", ""):
+                echo(f"{project_name} version: " + styled)
+            else:
+                echo(f"Got Version from {TOML_FILE}: " + styled)
+            return
+        version_file = doc["tool"]["pdm"]["version"]["path"]
+        text = Project.get_work_dir().joinpath(version_file).read_text(encoding="utf-8")
+        varname = "__version__"
+        for line in text.splitlines():
+            if line.strip().startswith(varname):
+                value = line.split("=", 1)[-1].strip().strip('"').strip("'")
+                _echo_version(version_file, value)
+                break
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import fnmatch
+import os
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import typer
+from typer import Exit, Option, echo, secho
+
+from ..project import Project, ProjectContext
+from ..utils import EnvError
+from .lint import LINT_CONFIG_FILES, SKIP_DIRS, LintCode
+from .test import test
+
+cli = typer.Typer()
+
+WATCH_TARGETS = ("lint", "check", "test")
+
+
+class FileWatcher:
+    """Poll the mtime of files under root dir to find out the changed ones
+
+    Files ignored by `.gitignore` or `[tool.pdm.build] excludes` are skipped.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        interval: float = 0.5,
+        debounce: float = 0.3,
+        keep: tuple[str, ...] = (),
+    ) -> None:
+        self.root = root
+        self.interval = interval
+        self.debounce = debounce
+        self.patterns = [i for i in self.load_ignores(root) if i not in keep]
+        self._files = self.snapshot()
+
+    @staticmethod
+    def load_ignores(root: Path) -> list[str]:
+        patterns: list[str] = []
+        if (gitignore := root / ".gitignore").exists():
+            for line in gitignore.read_text("utf8").splitlines():
+                if (line := line.strip()) and not line.startswith(("#", "!")):
+                    patterns.append(line)
+        try:
+            doc = ProjectContext.current(root).doc
+        except (EnvError, ValueError):
+            doc = {}
+        excludes = doc.get("tool", {}).get("pdm", {}).get("build", {}).get("excludes")
+        if isinstance(excludes, list):
+            patterns.extend(i for i in excludes if isinstance(i, str))
+        return [p for i in patterns if (p := i.removeprefix("./").rstrip("/"))]
+
+    def is_ignored(self, relpath: str) -> bool:
+        name = relpath.rsplit("/", 1)[-1]
+        for pattern in self.patterns:
+            if "/" not in pattern:
+                if fnmatch.fnmatch(name, pattern):
+                    return True
+                continue
+            pattern = pattern.lstrip("/")
+            if fnmatch.fnmatch(relpath, pattern) or (
+                pattern.startswith("**/") and fnmatch.fnmatch(relpath, pattern[3:])
+            ):
+                return True
+        return False
+
+    def snapshot(self) -> dict[str, tuple[int, int]]:
+        files: dict[str, tuple[int, int]] = {}
+        for dirpath, dirs, names in os.walk(self.root):
+            parent = Path(dirpath).relative_to(self.root).as_posix()
+            prefix = "" if parent == "." else parent + "/"
+            # Hidden dirs(.git, .venv, .mypy_cache, ...) are never watched
+            dirs[:] = [
+                d
+                for d in dirs
+                if not d.startswith(".")
+                and d not in SKIP_DIRS
+                and not self.is_ignored(prefix + d)
+            ]
+            for name in names:
+                if self.is_ignored(relpath := prefix + name):
+                    continue
+                try:
+                    st = os.stat(os.path.join(dirpath, name))
+                except OSError:
+                    continue
+                files[relpath] = (st.st_mtime_ns, st.st_size)
+        return files
+
+    def poll(self) -> list[str]:
+        """Paths that created, modified or deleted since last poll"""
+        files = self.snapshot()
+        old = self._files
+        changed = [k for k, v in files.items() if old.get(k) != v]
+        changed.extend(k for k in old if k not in files)
+        self._files = files
+        return changed
+
+    def wait(self, sleep: Callable[[float], None] = time.sleep) -> list[str]:
+        """Block until some files changed, and the burst of changes settled down"""
+        changed: dict[str, None] = {}
+        while not changed:
+            sleep(self.interval)
+            changed.update(dict.fromkeys(self.poll()))
+        while True:
+            sleep(self.debounce)
+            if not (more := self.poll()):
+                break
+            changed.update(dict.fromkeys(more))
+        return sorted(changed)
+
+    def __iter__(self) -> Iterator[list[str]]:
+        while True:
+            yield self.wait()
+
+
+def rerun(target: str, changed: list[str] | None = None) -> int:
+    """Run the tools of target, only for the changed files if possible"""
+    if changed is not None:
+        if any(Path(i).name in LINT_CONFIG_FILES for i in changed):
+            changed = None  # Config changed, run all
+        elif not (changed := [i for i in changed if Path(i).exists()]):
+            return 0
+    check_only = target == "check"
+    try:
+        if target == "test":
+            tests = [i for i in changed or [] if Path(i).name.startswith("test_")]
+            if changed and tests == changed:
+                test(dry=False, paths=tests)
+            else:
+                test(dry=False)
+        elif changed is None:
+            LintCode(".", check_only=check_only).run()
+        else:
+            pys = [i for i in changed if i.endswith((".py", ".pyi"))]
+            htmls = [i for i in changed if i.endswith(".html")]
+            for files in (pys, htmls):
+                if files:
+                    LintCode(files, check_only=check_only).run()
+    except Exit as e:
+        return e.exit_code
+    except SystemExit as e:
+        return int(e.code or 0)
+    return 0
+
+
+@cli.command(name="watch")
+def watch(
+    target: str = typer.Argument("lint", help="One of: " + ", ".join(WATCH_TARGETS)),
+    interval: float = Option(0.5, help="Seconds between two polls"),
+    debounce: float = Option(0.3, help="Seconds to wait for a burst of changes"),
+) -> None:
+    """Rerun lint/check/test when files of current project changed"""
+    if target not in WATCH_TARGETS:
+        echo(f"Invalid target: {target!r}, expected one of {WATCH_TARGETS}")
+        raise Exit(1)
+    root = Project.get_work_dir(allow_cwd=True)
+    keep = ("tests",) if target == "test" else ()
+    watcher = FileWatcher(root, interval=interval, debounce=debounce, keep=keep)
+    os.chdir(root)
+    rerun(target)
+    watcher.poll()
+    echo(f"Watching {root} ... (Press Ctrl+C to stop)")
+    try:
+        for changed in watcher:
+            secho(f"Changed: {' '.join(changed)}", fg="cyan")
+            rc = rerun(target, changed)
+            secho(f"Done with exit code {rc}.", fg="red" if rc else "green")
+            # Forget the changes made by the tools themselves, e.g.: ruff format
+            watcher.poll()
+    except KeyboardInterrupt:
+        echo("Bye!")
@@ -0,0 +1,152 @@
+"""Lifecycle of the dmypy daemon used by `fast lint --dmypy`."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import shlex
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from typer import echo
+
+from .cache import ResultCache, file_signature
+from .project import Project
+from .tools import ToolRegistry
+from .utils import Shell, _join_shell_args, run_and_echo
+
+# Same as the config files that mypy will read
+MYPY_CONFIG_FILES = ("mypy.ini", ".mypy.ini", "pyproject.toml", "setup.cfg")
+
+
+class DmypyDaemon:
+    """Manage the dmypy daemon of current project.
+
+    The daemon is restarted when the mypy options, mypy config files, the
+    executable, or the python and mypy version of its venv changed, and it
+    will shutdown by itself after being idle for `FASTDEVCLI_DMYPY_TIMEOUT`
+    seconds(default to 3600).
+    """
+
+    STATUS_FILE = ".dmypy.json"
+
+    def __init__(
+        self,
+        executable: list[str] | None = None,
+        flags: list[str] | None = None,
+        paths: list[str] | None = None,
+    ) -> None:
+        self.executable = executable or ["dmypy"]
+        self.flags = flags or []
+        self.paths = paths or ["."]
+        self.root = Project.get_work_dir(allow_cwd=True)
+        self.status_file = self.root / self.STATUS_FILE
+        self.state_file = ResultCache.default_dir(self.root).with_name("dmypy.json")
+
+    @classmethod
+    def from_command(cls, command: str) -> DmypyDaemon | None:
+        """Parse command like: `<prefix>dmypy run -- <mypy flags> <paths>`"""
+        args = shlex.split(command)
+        names = [Path(arg).stem for arg in args]
+        if "dmypy" not in names:
+            return None
+        i = names.index("dmypy")
+        rest = args[i + 1 :]
+        if rest[:1] == ["run"]:
+            rest = rest[1:]
+        if rest[:1] == ["--"]:
+            rest = rest[1:]
+        flags = [a for a in rest if a.startswith("-")]
+        paths = [a for a in rest if not a.startswith("-")]
+        return cls(args[: i + 1], flags, paths)
+
+    def command(self, *args: str) -> str:
+        status_file = str(self.status_file)
+        with contextlib.suppress(ValueError):  # On different drives of Windows
+            status_file = os.path.relpath(status_file)
+        return _join_shell_args([*self.executable, "--status-file", status_file, *args])
+
+    def interpreter(self) -> Path | None:
+        """Python of the environment that dmypy runs in
+
+        It is next to dmypy if dmypy is run directly, otherwise a prefix like
+        `pdm run`/`uv run` runs dmypy of the project venv.
+        """
+        python = "Scripts/python.exe" if sys.platform == "win32" else "bin/python"
+        envs = [self.root / ".venv"]
+        if len(self.executable) == 1 and (exe := shutil.which(self.executable[0])):
+            envs.insert(0, Path(exe).parent.parent)
+        if venv := os.getenv("VIRTUAL_ENV"):
+            envs.append(Path(venv))
+        return next((p for env in envs if (p := env / python).exists()), None)
+
+    def config_hash(self) -> str:
+        executable = shutil.which(self.executable[0]) or self.executable[0]
+        configs = ResultCache.hash_files(
+            p for name in MYPY_CONFIG_FILES if (p := self.root / name).exists()
+        )
+        signature = file_signature(Path(executable))
+        # Another python or mypy version of the venv needs a new daemon
+        environment: list[Any] = []
+        if (python := self.interpreter()) is not None:
+            real = os.path.realpath(python)
+            mypy_version = ToolRegistry.metadata_version("mypy", str(python))
+            environment = [str(python), real, file_signature(Path(real)), mypy_version]
+        return ResultCache.make_key(
+            self.executable, self.flags, signature, configs, environment
+        )
+
+    def load_state(self) -> dict[str, Any]:
+        with contextlib.suppress(OSError, ValueError):
+            if isinstance(data := json.loads(self.state_file.read_text()), dict):
+                return data
+        return {}
+
+    def is_running(self) -> bool:
+        return Shell(self.command("status")).check_call()
+
+    def start(self, config: str | None = None) -> int:
+        timeout = os.getenv("FASTDEVCLI_DMYPY_TIMEOUT", "3600")
+        args = ["start", "--timeout", timeout]
+        if self.flags:
+            args += ["--", *self.flags]
+        if rc := run_and_echo(self.command(*args)):
+            return rc
+        with contextlib.suppress(OSError):
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            data = {"config": config or self.config_hash(), "flags": self.flags}
+            self.state_file.write_text(json.dumps(data))
+        return 0
+
+    def stop(self) -> int:
+        self.state_file.unlink(missing_ok=True)
+        return run_and_echo(self.command("stop"))
+
+    def ensure(self) -> bool:
+        """Make sure the daemon is running with current config
+
+        :return: whether the daemon was already running(warm)
+        """
+        config = self.config_hash()
+        if self.is_running():
+            if self.load_state().get("config") == config:
+                return True
+            echo("Config of mypy changed, restart dmypy daemon.")
+            self.stop()
+        self.start(config)
+        return False
+
+    def check_command(self) -> str:
+        return self.command("check", *self.paths)
+
+    def run(self) -> int:
+        warm = self.ensure()
+        start = time.perf_counter()
+        rc = run_and_echo(self.check_command())
+        cost = time.perf_counter() - start
+        echo(f"dmypy check: {cost:.2f}s ({'warm' if warm else 'cold'} daemon)")
+        return rc
@@ -0,0 +1,86 @@
+"""Machine readable git queries used by `fast tag` and `fast bump --commit`.
+
+Only the targeted plumbing commands are run, e.g.: instead of listing all tags
+to find out whether there is one startswith `v`, `for-each-ref --count=1` with
+the pattern stops at the first match. Results are cached by the instance, so
+each command of one invocation is run at most once, and the independent ones
+can be fetched concurrently by `prefetch`.
+"""
+
+from __future__ import annotations
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .utils import ShellCommandError, capture_cmd_output
+
+Query = tuple[str, ...]
+
+
+class GitQuery:
+    STATUS: Query = ("status", "--porcelain=v2", "--branch")
+    V_TAG: Query = (
+        "for-each-ref",
+        "--count=1",
+        "--format=%(refname:short)",
+        "refs/tags/v[0-9]*",
+    )
+    LAST_SUBJECT: Query = ("log", "-1", "--format=%s")
+    HEAD: Query = ("rev-parse", "HEAD")
+
+    def __init__(self, cwd: Path | None = None) -> None:
+        self.cwd = cwd
+        self._results: dict[Query, str | ShellCommandError] = {}
+
+    def _fetch(self, query: Query) -> str | ShellCommandError:
+        if (result := self._results.get(query)) is None:
+            try:
+                result = capture_cmd_output(["git", *query], raises=True, cwd=self.cwd)
+            except ShellCommandError as e:
+                result = e
+            self._results[query] = result
+        return result
+
+    def run(self, query: Query) -> str:
+        """Output of `git <query>`, raise ShellCommandError if it failed"""
+        if isinstance(result := self._fetch(query), ShellCommandError):
+            raise result
+        return result
+
+    def prefetch(self, *queries: Query) -> None:
+        """Run the queries concurrently, their results are used later"""
+        if len(todo := [q for q in queries if q not in self._results]) > 1:
+            with ThreadPoolExecutor(max_workers=len(todo)) as pool:
+                list(pool.map(self._fetch, todo))
+        elif todo:
+            self._fetch(todo[0])
+
+    def clear(self) -> None:
+        self._results.clear()
+
+    def changes(self, untracked: bool = True) -> list[str]:
+        """Entries of `git status --porcelain=v2`, empty means working tree clean"""
+        lines = self.run(self.STATUS).splitlines()
+        return [
+            line
+            for line in lines
+            if not line.startswith("#") and (untracked or not line.startswith("?"))
+        ]
+
+    def ahead(self) -> int:
+        """Count of local commits that not pushed to upstream"""
+        for line in self.run(self.STATUS).splitlines():
+            if m := re.match(r"# branch\.ab \+(\d+) ", line):
+                return int(m.group(1))
+        return 0
+
+    def has_v_prefix(self) -> bool:
+        """Whether versions were tagged like `v1.2.3`"""
+        return bool(self.run(self.V_TAG))
+
+    def last_commit_subject(self) -> str:
+        return self.run(self.LAST_SUBJECT)
+
+    def head(self) -> str:
+        return self.run(self.HEAD)
@@ -0,0 +1,222 @@
+"""Map of which test executed which source lines, used by `fast test --affected`.
+
+A full run records the lines executed by each test with the `test_function`
+dynamic context of coverage. The map is saved together with the git commit it
+was recorded at, so the tests to rerun are the ones whose lines intersect the
+diff against that commit.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import re
+import sqlite3
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+from .cache import ResultCache, make_ignored_dir
+from .project import ProjectContext
+from .utils import (
+    TOML_FILE,
+    EnvError,
+    ShellCommandError,
+    _join_shell_args,
+    capture_cmd_output,
+)
+
+# Changes of these files may affect any test
+GLOBAL_FILES = ("conftest.py", TOML_FILE, "setup.cfg", "pytest.ini", "tox.ini")
+CONTEXT = "test_function"
+HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? ")
+
+
+def decode_numbits(numbits: bytes) -> list[int]:
+    """Line numbers of the bitmap stored by coverage in `line_bits` table"""
+    return [
+        i * 8 + j for i, byte in enumerate(numbits) for j in range(8) if byte >> j & 1
+    ]
+
+
+def get_changed_lines(base: str) -> dict[str, set[int] | None]:
+    """Lines(of the base version) that changed since base commit
+
+    New files(including untracked ones) are marked with None.
+    """
+    diff = capture_cmd_output(
+        ["git", "diff", "-U0", "--no-color", "--no-renames", "--relative", base],
+        raises=True,
+    )
+    untracked = capture_cmd_output(
+        ["git", "ls-files", "--others", "--exclude-standard"], raises=True
+    )
+    changed: dict[str, set[int] | None] = {}
+    lines: set[int] = set()
+    for line in diff.splitlines():
+        if line.startswith("diff --git "):
+            name = line.split(" b/", 1)[-1]
+            changed[name] = lines = set()
+        elif line.startswith("new file mode"):
+            changed[name] = None
+        elif m := HUNK.match(line):
+            start, count = int(m.group(1)), int(m.group(2) or 1)
+            # Pure insertion is after line `start`, count neighbours as changed
+            lines.update(range(start, start + count) if count else (start, start + 1))
+    for name in untracked.splitlines():
+        changed[name] = None
+    return changed
+
+
+class ImpactMap:
+    STATE_FILE = "test_map.json"
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        cache_dir = ResultCache.default_dir(root).parent
+        self.path = cache_dir / self.STATE_FILE
+        self.data_file = cache_dir / "impact.coverage"
+        self.rc_file = cache_dir / "impact_coverage.toml"
+
+    def load(self) -> dict[str, Any]:
+        with contextlib.suppress(OSError, ValueError):
+            if isinstance(data := json.loads(self.path.read_text()), dict):
+                return data
+        return {}
+
+    def _relative(self, path: Path) -> str:
+        with contextlib.suppress(ValueError):
+            path = path.relative_to(self.root)
+        return path.as_posix()
+
+    def write_rc_file(self) -> None:
+        """Coverage config of the project, with dynamic context enabled"""
+        try:
+            text = ProjectContext.current(self.root).text
+            run = ProjectContext.current(self.root).doc
+        except (EnvError, ValueError):
+            text, run = "", {}
+        run = run.get("tool", {}).get("coverage", {}).get("run", {})
+        option = f'dynamic_context = "{CONTEXT}"'
+        if "dynamic_context" in run:
+            text = re.sub(r"^dynamic_context\s*=.*$", option, text, flags=re.MULTILINE)
+        elif "[tool.coverage.run]" in text:
+            text = text.replace("[tool.coverage.run]", f"[tool.coverage.run]\n{option}")
+        else:
+            text += f"\n[tool.coverage.run]\n{option}\n"
+        make_ignored_dir(self.rc_file.parent)
+        self.rc_file.write_text(text, encoding="utf-8")
+
+    def record_command(self, prefix: str = "", paths: list[str] | None = None) -> str:
+        """Shell command to run all tests and save lines executed by each one"""
+        options = _join_shell_args(
+            [f"--rcfile={self._relative(self.rc_file)}"]
+            + [f"--data-file={self._relative(self.data_file)}"]
+        )
+        args = " " + _join_shell_args(paths) if paths else ""
+        return (
+            f"{prefix}coverage erase {options} && "
+            f"{prefix}coverage run {options} --parallel-mode -m pytest -s{args} && "
+            f"{prefix}coverage combine {options} && "
+            f'{prefix}coverage report {options} --omit="tests/*" -m'
+        )
+
+    def build(self, test_files: list[str], commit: str) -> dict[str, Any]:
+        """Read the coverage data file and save the map of test -> lines"""
+        tests: dict[str, dict[str, set[int]]] = defaultdict(lambda: defaultdict(set))
+        with contextlib.closing(sqlite3.connect(self.data_file)) as conn:
+            files = {
+                i: self._relative(Path(p))
+                for i, p in conn.execute("SELECT id, path FROM file")
+            }
+            contexts = {
+                i: self.resolve(name.rsplit("|", 1)[-1], test_files)
+                for i, name in conn.execute("SELECT id, context FROM context")
+            }
+            rows = [
+                (file_id, context_id, decode_numbits(numbits))
+                for file_id, context_id, numbits in conn.execute(
+                    "SELECT file_id, context_id, numbits FROM line_bits"
+                )
+            ]
+            # Data recorded with `branch = true` saves arcs instead of lines
+            arcs: dict[tuple[int, int], list[int]] = defaultdict(list)
+            for file_id, context_id, fromno, tono in conn.execute(
+                "SELECT file_id, context_id, fromno, tono FROM arc"
+            ):
+                arcs[file_id, context_id].extend(n for n in (fromno, tono) if n > 0)
+            rows.extend((f, c, lines) for (f, c), lines in arcs.items())
+        for file_id, context_id, lines in rows:
+            for node_id in contexts[context_id]:
+                tests[node_id][files[file_id]].update(lines)
+        data = {
+            "commit": commit,
+            "tests": {
+                node_id: {f: sorted(lines) for f, lines in sources.items()}
+                for node_id, sources in tests.items()
+            },
+        }
+        self.path.write_text(json.dumps(data, sort_keys=True))
+        return data
+
+    @staticmethod
+    def resolve(context: str, test_files: list[str]) -> list[str]:
+        """Convert dynamic context like `test_a.TestX.test_m` to node ids
+
+        `[""]` means the lines were executed outside of tests, e.g.: import
+        """
+        if not context:
+            return [""]
+        parts = context.split(".")
+        modules = {f: f.removesuffix(".py").replace("/", ".") for f in test_files}
+        for k in range(len(parts) - 1, 0, -1):
+            name = ".".join(parts[:k])
+            if found := [
+                f for f, m in modules.items() if m == name or m.endswith("." + name)
+            ]:
+                return [f"{f}::{'::'.join(parts[k:])}" for f in found]
+        return [""]
+
+    @staticmethod
+    def select(
+        data: dict[str, Any],
+        changed: dict[str, set[int] | None],
+        test_files: list[str],
+    ) -> list[str] | None:
+        """Test files or node ids to rerun, None if all of them are affected"""
+        tests: dict[str, dict[str, list[int]]] = data.get("tests", {})
+        measured = {f for sources in tests.values() for f in sources}
+        test_dirs = {Path(f).parent for f in test_files}
+        selected = [f for f in changed if f in test_files]
+        for name, lines in changed.items():
+            path = Path(name)
+            if path.name in GLOBAL_FILES:
+                return None
+            if name in test_files:
+                continue
+            if name not in measured:
+                # Helpers of tests(e.g.: tests/utils.py) are not measured
+                if path.suffix == ".py" and path.parent in test_dirs and lines:
+                    return None
+                continue
+            if lines is None or not lines.isdisjoint(tests.get("", {}).get(name, ())):
+                # Module level code changed, rerun all tests that touched it
+                selected.extend(k for k, v in tests.items() if k and name in v)
+            else:
+                selected.extend(
+                    k
+                    for k, v in tests.items()
+                    if k and not lines.isdisjoint(v.get(name, ()))
+                )
+        # Skip node ids of the test files that are selected as a whole
+        files = set(selected) & set(test_files)
+        return [
+            i
+            for i in dict.fromkeys(selected)
+            if i.split("::")[0] not in files or i in files
+        ]
+
+    def head_commit(self) -> str | None:
+        with contextlib.suppress(ShellCommandError):
+            return capture_cmd_output(["git", "rev-parse", "HEAD"], raises=True)
+        return None
@@ -0,0 +1,325 @@
+"""Versions of packages read from the simple API of package index.
+
+The JSON form of the simple API(PEP 691) is requested, and the HTML form
+returned by some mirrors is parsed as well. Packages are fetched concurrently
+through keep-alive connections, so finding out the latest versions of all
+dependencies costs about one round trip, instead of one resolution for each
+`poetry add`. Results are cached by `IndexCache`, which can be read offline.
+
+Besides URL, the index can be a local directory of the simple API layout
+(`<name>/index.json` or `<name>/index.html`), or a json file that maps names of
+packages to their versions, e.g.: `{"typer": ["0.12.3", "0.12.5"]}`.
+"""
+
+from __future__ import annotations
+
+import html
+import http.client
+import json
+import os
+import re
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+from urllib.parse import urljoin, urlsplit
+
+from .cache import IndexCache
+from .profiling import profiled
+from .utils import load_bool, yellow_warn
+
+INDEX_URL = "https://pypi.org/simple/"
+SIMPLE_JSON = "application/vnd.pypi.simple.v1+json"
+ACCEPT = f"{SIMPLE_JSON}, text/html;q=0.1"
+# Final releases, e.g.: 1.2.3 or 1.2.3.post1, prereleases are ignored
+STABLE = re.compile(r"(\d+(?:\.\d+)*)(?:\.post(\d+))?")
+ANCHOR = re.compile(r"<a\s([^>]*)>([^<]+)</a>", re.IGNORECASE)
+ARCHIVES = (".tar.gz", ".zip", ".tar.bz2", ".tgz")
+REQUIRES_PYTHON = re.compile(r'data-requires-python="([^"]*)"', re.IGNORECASE)
+SPECIFIER = re.compile(r"\s*(===|==|!=|~=|<=|>=|<|>)\s*(\d+(?:\.\d+)*)(\.\*)?\s*")
+
+
+def normalize(name: str) -> str:
+    """Normalized name of distribution(PEP 503)"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def version_key(version: str) -> tuple[int, ...] | None:
+    """Key to compare stable versions, None for prerelease or invalid one"""
+    if not (m := STABLE.fullmatch(version.strip().lstrip("vV"))):
+        return None
+    return (*map(int, m.group(1).split(".")), -1, int(m.group(2) or 0))
+
+
+def file_version(filename: str) -> str | None:
+    """Version in the name of wheel or sdist file"""
+    if filename.endswith(".whl"):
+        parts = filename.split("-")
+        return parts[1] if len(parts) >= 5 else None
+    for suffix in ARCHIVES:
+        if filename.endswith(suffix):
+            name_version = filename.removesuffix(suffix)
+            return name_version.rsplit("-", 1)[-1] if "-" in name_version else None
+    return None
+
+
+def _pad(version: tuple[int, ...], width: int) -> tuple[int, ...]:
+    return (*version, *[0] * (width - len(version)))
+
+
+def allows_python(spec: str, python: tuple[int, ...]) -> bool:
+    """Whether `requires-python` of a file allows the python version
+
+    Only the release segments are compared, unknown clauses are ignored.
+    """
+    for clause in spec.split(","):
+        if not (m := SPECIFIER.fullmatch(clause)):
+            continue
+        op, text, wildcard = m.groups()
+        version = tuple(int(i) for i in text.split("."))
+        if wildcard:  # e.g.: ==3.* or !=3.0.*
+            matched = _pad(python, len(version))[: len(version)] == version
+            ok = matched if op == "==" else not matched if op == "!=" else True
+        else:
+            width = max(len(python), len(version))
+            a, b = _pad(python, width), _pad(version, width)
+            ok = {
+                # ~=3.8 means >=3.8,==3.*
+                "~=": a >= b and a[: len(version) - 1] == version[:-1],
+                ">=": a >= b,
+                ">": a > b,
+                "<=": a <= b,
+                "<": a < b,
+                "==": a == b,
+                "===": a == b,
+                "!=": a != b,
+            }[op]
+        if not ok:
+            return False
+    return True
+
+
+def parse_html(text: str) -> dict[str, Any]:
+    """Convert HTML page of simple API to the same structure as the JSON one"""
+    files = []
+    for attrs, filename in ANCHOR.findall(text):
+        item = {
+            "filename": html.unescape(filename).strip(),
+            "yanked": "data-yanked" in attrs,
+        }
+        if m := REQUIRES_PYTHON.search(attrs):
+            item["requires-python"] = html.unescape(m.group(1))
+        files.append(item)
+    return {"files": files}
+
+
+class ConnectionPool:
+    """Keep-alive connections, one for each host in every thread"""
+
+    MAX_REDIRECTS = 3
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._opened: list[http.client.HTTPConnection] = []
+
+    def _connection(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        if not hasattr(self._local, "conns"):
+            self._local.conns = {}
+        conns: dict[tuple[str, str], http.client.HTTPConnection] = self._local.conns
+        if (conn := conns.get((scheme, netloc))) is None:
+            if scheme == "https":
+                conn = http.client.HTTPSConnection(netloc, timeout=self.timeout)
+            else:
+                conn = http.client.HTTPConnection(netloc, timeout=self.timeout)
+            conns[scheme, netloc] = conn
+            with self._lock:
+                self._opened.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Close connections of all threads, they reconnect if used again"""
+        with self._lock:
+            opened, self._opened = self._opened, []
+        for conn in opened:
+            conn.close()
+
+    def _request(
+        self, url: str, headers: dict[str, str]
+    ) -> tuple[http.client.HTTPResponse, bytes]:
+        parts = urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        conn = self._connection(parts.scheme, parts.netloc)
+        try:
+            conn.request("GET", path, headers=headers)
+            r = conn.getresponse()
+            return r, r.read()
+        except (http.client.HTTPException, ConnectionError):
+            # The kept alive connection may be closed by server or left in a
+            # bad state, rebuild it and retry once
+            conn.close()
+            conn.request("GET", path, headers=headers)
+            r = conn.getresponse()
+            return r, r.read()
+
+    def get(self, url: str, headers: dict[str, str]) -> tuple[str, str]:
+        """Content type and text of the response, raise OSError if failed"""
+        for _ in range(self.MAX_REDIRECTS + 1):
+            r, body = self._request(url, headers)
+            if r.status in (301, 302, 303, 307, 308):
+                url = urljoin(url, r.getheader("Location", ""))
+                continue
+            if r.status != 200:
+                raise OSError(f"HTTP {r.status} {r.reason}: {url}")
+            return r.getheader("Content-Type", ""), body.decode("utf-8")
+        raise OSError(f"Too many redirects: {url}")
+
+
+class PackageIndex:
+    def __init__(
+        self, url: str | None = None, timeout: float = 10, offline: bool | None = None
+    ) -> None:
+        url = url or os.getenv("FASTDEVCLI_INDEX_URL") or os.getenv("PIP_INDEX_URL")
+        self.url = (url or INDEX_URL).rstrip("/") + "/"
+        self.timeout = timeout
+        if offline is None:
+            offline = load_bool("FASTDEVCLI_OFFLINE")
+        self.offline = offline
+        self.local: Path | None = None
+        if "://" not in self.url or self.url.startswith("file://"):
+            self.local = Path(self.url.removeprefix("file://").rstrip("/"))
+        # Environment of proxy is only supported by urllib
+        self._pool = None if urllib.request.getproxies() else ConnectionPool(timeout)
+        self._stand_in: dict[str, Any] | None = None
+        self.cache = IndexCache(self.url)
+        self.fetched = 0
+
+    def _read_local(self, name: str) -> dict[str, Any]:
+        assert self.local is not None
+        if self.local.is_file():
+            if self._stand_in is None:
+                data = json.loads(self.local.read_bytes())
+                self._stand_in = {normalize(k): v for k, v in data.items()}
+            if (item := self._stand_in.get(name)) is None:
+                raise FileNotFoundError(f"{name} not found in {self.local}")
+            return {"versions": item} if isinstance(item, list) else item
+        project = self.local / name
+        if (f := project / "index.json").exists():
+            return json.loads(f.read_bytes())
+        if (f := project / "index.html").exists():
+            return parse_html(f.read_text("utf-8"))
+        raise FileNotFoundError(f"{name} not found in {self.local}")
+
+    @profiled("index")
+    def fetch(self, name: str) -> dict[str, Any]:
+        """Project detail of simple API, raise OSError/ValueError if failed"""
+        name = normalize(name)
+        if self.local is not None:
+            return self._read_local(name)
+        url, headers = f"{self.url}{name}/", {"Accept": ACCEPT}
+        if self._pool is not None:
+            content_type, text = self._pool.get(url, headers)
+        else:
+            request = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(request, timeout=self.timeout) as r:  # nosec:B310
+                content_type = r.headers.get("Content-Type", "")
+                text = r.read().decode("utf-8")
+        if content_type.startswith(SIMPLE_JSON) or text.lstrip().startswith("{"):
+            return json.loads(text)
+        return parse_html(text)
+
+    @staticmethod
+    def stable_versions(detail: dict[str, Any]) -> list[str]:
+        """Versions that are neither prerelease nor yanked, from old to new"""
+        versions: dict[str, bool] = {}
+        for f in detail.get("files", []):
+            if (v := file_version(f.get("filename", ""))) is not None:
+                # A version is yanked only if all of its files are yanked
+                versions[v] = versions.get(v, True) and bool(f.get("yanked"))
+        for v in detail.get("versions", []):
+            versions.setdefault(v, False)
+        keys = {
+            v: key
+            for v, yanked in versions.items()
+            if not yanked and (key := version_key(v))
+        }
+        return sorted(keys, key=keys.__getitem__)
+
+    @staticmethod
+    def requires_python(detail: dict[str, Any]) -> dict[str, list[str]]:
+        """`requires-python` of the files of each version that declares it,
+        an empty one means that some files of the version do not declare it
+        """
+        specs: dict[str, set[str]] = {}
+        for f in detail.get("files", []):
+            if not f.get("yanked") and (v := file_version(f.get("filename", ""))):
+                specs.setdefault(v, set()).add(f.get("requires-python") or "")
+        return {v: sorted(s) for v, s in specs.items() if s != {""}}
+
+    def releases(self, name: str) -> tuple[list[str], dict[str, list[str]]]:
+        """Stable versions and their `requires-python`, cached if not expired"""
+        name = normalize(name)
+        if self.local is None and (entry := self.cache.get(name, self.offline)):
+            return entry
+        if self.offline and self.local is None:
+            raise FileNotFoundError(f"{name} not cached, try again without offline")
+        detail = self.fetch(name)
+        versions = self.stable_versions(detail)
+        requires = self.requires_python(detail)
+        if self.local is None:
+            self.cache.set(name, versions, requires)
+            self.fetched += 1
+        return versions, requires
+
+    def versions(self, name: str) -> list[str]:
+        """Stable versions of the package, read from cache if not expired"""
+        return self.releases(name)[0]
+
+    def latest_version(
+        self, name: str, python: tuple[int, ...] | None = None
+    ) -> str | None:
+        """Latest stable version, which supports the python version if given"""
+        versions, requires = self.releases(name)
+        for version in reversed(versions):
+            specs = requires.get(version, [""]) if python is not None else [""]
+            if any(allows_python(spec, python or ()) for spec in specs):
+                return version
+        return None
+
+    def latest_versions(
+        self, names: list[str], python: tuple[int, ...] | None = None
+    ) -> dict[str, str]:
+        """Latest stable version of each package, fetched concurrently
+
+        Packages that failed to fetch are skipped with a warning.
+
+        :param python: the lowest python version that the project supports
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+        result: dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=min(16, len(names))) as pool:
+            futures = {
+                name: pool.submit(self.latest_version, name, python) for name in names
+            }
+            for name, future in futures.items():
+                try:
+                    version = future.result()
+                except (OSError, ValueError, http.client.HTTPException) as e:
+                    yellow_warn(
+                        f"Failed to get versions of {name} from {self.url}: {e}"
+                    )
+                    continue
+                if version is None:
+                    yellow_warn(f"No stable version of {name} found in {self.url}")
+                else:
+                    result[name] = version
+        # Threads of the executor are finished, so are their connections
+        if self._pool is not None:
+            self._pool.close()
+        if self.fetched:
+            self.cache.evict()
+        return result
@@ -0,0 +1,181 @@
+"""Commands generated by `DryRun.gen` as a graph, to run them without a shell.
+
+`a && b && c` is parsed to steps of argv, each one depends on the previous
+step, so a failed step stops the rest as `&&` does. Steps that are added
+with the same dependencies run concurrently. Commands that need a shell to
+expand(pipes, redirects, variables, globs, ...) are kept as one step and run
+by the shell as before, so the legacy string is still the source of truth.
+"""
+
+from __future__ import annotations
+
+import os
+import shlex
+import sys
+from collections.abc import Iterable
+from typing import Any, NamedTuple
+
+from typer import Exit, echo, secho
+
+from .utils import Shell, is_windows, run_concurrently
+
+# Characters that have special meaning for shell when not quoted
+SHELL_CHARS = frozenset("|&;<>()$`*?[{#\n")
+SHELL_BUILTINS = frozenset({"cd", "export", "set", "source", ".", "exit", "eval"})
+
+
+class Step(NamedTuple):
+    text: str
+    # None means that the step needs to be run by shell
+    argv: list[str] | None
+    needs: tuple[int, ...]
+
+
+def split_and(command: str) -> list[str] | None:
+    """Split command by ` && `, None if it uses any other shell syntax"""
+    parts: list[str] = []
+    quote = ""
+    start = i = 0
+    while i < len(command):
+        c = command[i]
+        if quote == "'":
+            if c == "'":
+                quote = ""
+        elif c == "\\":
+            i += 1
+        elif quote == '"':
+            if c == '"':
+                quote = ""
+            elif c in "$`":
+                return None
+        elif c in "'\"":
+            quote = c
+        elif command.startswith(" && ", i):
+            parts.append(command[start:i])
+            start = i + 4
+            i += 3
+        elif c in SHELL_CHARS:
+            return None
+        i += 1
+    if quote:
+        return None
+    parts.append(command[start:])
+    return parts
+
+
+def parse_argv(text: str) -> list[str] | None:
+    try:
+        argv = shlex.split(text)
+    except ValueError:
+        return None
+    if not argv or "=" in argv[0] or argv[0] in SHELL_BUILTINS:
+        return None
+    return argv
+
+
+class Plan:
+    def __init__(self, steps: Iterable[Step] = ()) -> None:
+        self.steps = list(steps)
+
+    def add(self, text: str, needs: Iterable[int] | None = None) -> int:
+        """Append a step, which depends on the previous one by default
+
+        :return: index of the step, to be used as dependency of other steps
+        """
+        if needs is None:
+            needs = [len(self.steps) - 1] if self.steps else []
+        argv = None if is_windows() else parse_argv(text)
+        self.steps.append(Step(text, argv, tuple(needs)))
+        return len(self.steps) - 1
+
+    @classmethod
+    def parse(cls, command: str) -> Plan:
+        """Convert the `&&` chained command to steps"""
+        plan = cls()
+        if not command:
+            return plan
+        # The quoting of Windows can not be parsed by shlex
+        parts = None if is_windows() else split_and(command)
+        if parts is None or any(parse_argv(p) is None for p in parts):
+            plan.steps.append(Step(command, None, ()))
+            return plan
+        for text in parts:
+            plan.add(text)
+        return plan
+
+    def __str__(self) -> str:
+        """The legacy form, which can be run by shell"""
+        return " && ".join(step.text for step in self.steps)
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def waves(self) -> list[list[int]]:
+        """Indexes of steps grouped by depth, steps in one wave run concurrently"""
+        depths: list[int] = []
+        for step in self.steps:
+            depths.append(max((depths[i] + 1 for i in step.needs), default=0))
+        waves: list[list[int]] = [[] for _ in range(max(depths, default=-1) + 1)]
+        for index, depth in enumerate(depths):
+            waves[depth].append(index)
+        return waves
+
+    def describe(self) -> list[str]:
+        width = len(str(len(self.steps)))
+        lines = []
+        for index, step in enumerate(self.steps, 1):
+            line = f"  [{index:>{width}}] {step.text}"
+            if step.needs:
+                line += f"  (after {', '.join(str(i + 1) for i in step.needs)})"
+            if step.argv is None:
+                line += "  (by shell)"
+            lines.append(line)
+        return lines
+
+    def is_linear(self) -> bool:
+        return all(len(wave) == 1 for wave in self.waves())
+
+    def echo(self, dry: bool = False) -> None:
+        echo(f"--> {self}")
+        # The legacy string is enough to show steps that run one by one
+        if dry and not self.is_linear():
+            echo("Plan:\n" + "\n".join(self.describe()))
+
+    def execute(self, env: dict[str, str] | None = None) -> int:
+        """Run the steps wave by wave, stop at the first failed one
+
+        :return: returncode of the failed step, or 0 if all of them succeed
+        """
+        kw: dict[str, Any] = {}
+        if env is not None:
+            kw["env"] = {**os.environ, **env}
+        commands = [s.text if s.argv is None else s.argv for s in self.steps]
+        for wave in self.waves():
+            if len(wave) > 1:
+                codes = run_concurrently([commands[i] for i in wave], env)
+            else:
+                cmd = commands[wave[0]]
+                try:
+                    r = Shell(cmd, shell=isinstance(cmd, str), **kw)._run()
+                except FileNotFoundError as e:
+                    secho(str(e), fg="red")
+                    return 127
+                codes = [r.returncode]
+            if rc := next((c for c in codes if c), 0):
+                return rc
+        return 0
+
+    def finish(
+        self, env: dict[str, str] | None = None, _exit: bool = False, dry: bool = False
+    ) -> int:
+        """Same as `exit_if_run_failed` but run the steps without shell"""
+        if not self.steps:
+            return 0
+        self.echo(dry)
+        if dry:
+            return 0
+        if rc := self.execute(env):
+            if _exit:
+                sys.exit(rc)
+            raise Exit(rc)
+        return 0
@@ -0,0 +1,208 @@
+"""Wall time of the phases and subprocesses of one invocation, for `--profile`.
+
+Enabled by `fast --profile <command>` or `FASTDEVCLI_PROFILE=1`, a table of
+the time spent in each phase(project detection, toml parsing, ...) and by each
+child process is printed to stderr at exit. Phases may be nested, e.g.: the
+`ruff --version` probe is counted by both `detect` and `subprocess`.
+
+With `--trace-file=path.json` the records are saved as a timeline in Chrome
+Trace Event format instead, which can be opened by https://ui.perfetto.dev
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, ClassVar, NamedTuple, TypeVar, cast
+
+from typer import echo
+
+F = TypeVar("F", bound=Callable[..., Any])
+# Time of importing this package, as the start of the `startup` phase
+IMPORTED = time.perf_counter()
+
+
+class Record(NamedTuple):
+    phase: str
+    label: str
+    start: float
+    seconds: float
+    thread: int | None
+    args: dict[str, Any]
+
+
+class Profiler:
+    enabled: ClassVar[bool] = False
+    started: ClassVar[float] = 0.0
+    records: ClassVar[list[Record]] = []
+    trace_file: ClassVar[Path | None] = None
+    _report: ClassVar[bool] = False
+
+    @classmethod
+    def enable(cls, report: bool = True, trace_file: Path | None = None) -> None:
+        cls._report = cls._report or report
+        if trace_file is not None:
+            cls.trace_file = trace_file
+        if not cls.enabled:
+            cls.enabled = True
+            cls.started = time.perf_counter()
+            cls.records.append(
+                Record(
+                    "startup",
+                    "import and parse arguments",
+                    IMPORTED,
+                    cls.started - IMPORTED,
+                    threading.main_thread().ident,
+                    {},
+                )
+            )
+            atexit.register(cls.finish)
+
+    @classmethod
+    def disable(cls) -> None:
+        cls.enabled = cls._report = False
+        cls.trace_file = None
+        cls.records.clear()
+        atexit.unregister(cls.finish)
+
+    @classmethod
+    def finish(cls) -> None:
+        if cls._report:
+            cls.report()
+        if cls.trace_file is not None:
+            cls.write_trace(cls.trace_file)
+
+    @classmethod
+    @contextmanager
+    def timer(cls, phase: str, label: str = "") -> Iterator[dict[str, Any]]:
+        """Record the time of the block, extra info can be set to the yielded dict"""
+        args: dict[str, Any] = {}
+        if not cls.enabled:
+            yield args
+            return
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            # list.append is atomic, so it is safe for run_parallel
+            cls.records.append(
+                Record(
+                    phase,
+                    label,
+                    start,
+                    time.perf_counter() - start,
+                    threading.get_ident(),
+                    args,
+                )
+            )
+
+    @classmethod
+    def summary(cls) -> list[tuple[str, str, int, float]]:
+        """(phase, label, calls, seconds) sorted by seconds"""
+        groups: dict[tuple[str, str], list[float]] = defaultdict(list)
+        for r in cls.records:
+            if r.phase != "startup":
+                groups[r.phase, r.label].append(r.seconds)
+        rows = [(p, k, len(v), sum(v)) for (p, k), v in groups.items()]
+        return sorted(rows, key=lambda r: r[-1], reverse=True)
+
+    @classmethod
+    def report(cls, limit: int = 30, width: int = 60) -> None:
+        total = time.perf_counter() - cls.started
+        rows = cls.summary()
+        phases: dict[str, float] = defaultdict(float)
+        for phase, _, _, seconds in rows:
+            phases[phase] += seconds
+        echo(f"\n{'Phase':<12}{'Name':<{width}}{'Calls':>7}{'Seconds':>10}", err=True)
+        for phase, label, calls, seconds in rows[:limit]:
+            if len(label) > width - 2:
+                label = label[: width - 5] + "..."
+            echo(f"{phase:<12}{label:<{width}}{calls:>7}{seconds:>10.3f}", err=True)
+        if len(rows) > limit:
+            echo(f"... {len(rows) - limit} more", err=True)
+        for phase, seconds in sorted(phases.items(), key=lambda i: -i[1]):
+            echo(f"{phase:<12}{'(total)':<{width}}{'':>7}{seconds:>10.3f}", err=True)
+        echo(f"{'all':<12}{'(wall time)':<{width}}{'':>7}{total:>10.3f}", err=True)
+
+    @classmethod
+    def trace_events(cls) -> dict[str, Any]:
+        """Records as complete events of Chrome Trace Event format
+
+        Each thread is a lane, so the concurrent subprocesses are shown in
+        parallel, and the whole command is a span of the main thread.
+        """
+        pid = os.getpid()
+        main = threading.main_thread().ident
+        records = list(cls.records)
+        if cls.started:
+            command = " ".join(["fast", *sys.argv[1:]])
+            seconds = time.perf_counter() - cls.started
+            records.append(Record("command", command, cls.started, seconds, main, {}))
+        records.sort(key=lambda r: r.start)
+        base = records[0].start if records else 0.0
+        lanes: dict[int | None, int] = {main: 0}
+        events: list[dict[str, Any]] = []
+        for r in records:
+            tid = lanes.setdefault(r.thread, len(lanes))
+            events.append(
+                {
+                    "name": r.label or r.phase,
+                    "cat": r.phase,
+                    "ph": "X",
+                    "ts": round((r.start - base) * 1e6, 3),
+                    "dur": round(r.seconds * 1e6, 3),
+                    "pid": pid,
+                    "tid": tid,
+                    "args": r.args,
+                }
+            )
+        meta: list[dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "fast"}}
+        ]
+        for tid in lanes.values():
+            name = f"worker-{tid}" if tid else "main"
+            meta.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+            )
+        return {"traceEvents": meta + events, "displayTimeUnit": "ms"}
+
+    @classmethod
+    def write_trace(cls, path: Path) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(cls.trace_events()), encoding="utf-8")
+        except OSError as e:
+            echo(f"Failed to write trace file {path}: {e}", err=True)
+
+
+def profiled(phase: str) -> Callable[[F], F]:
+    """Decorator to record the time of each call of the function as `phase`"""
+
+    def decorator(func: F) -> F:
+        label = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kw: Any) -> Any:
+            if not Profiler.enabled:
+                return func(*args, **kw)
+            with Profiler.timer(phase, label):
+                return func(*args, **kw)
+
+        return cast(F, wrapper)
+
+    return decorator
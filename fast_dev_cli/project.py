@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import atexit
+import contextlib
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ClassVar, cast
+
+from typer import echo
+
+from .cache import DetectionCache
+from .profiling import Profiler, profiled
+from .utils import (
+    TOML_FILE,
+    EnvError,
+    ToolName,
+    load_bool,
+    run_and_echo,
+    tomllib,
+)
+
+if TYPE_CHECKING:
+    if sys.version_info >= (3, 11):
+        from typing import Self
+    else:
+        from typing_extensions import Self
+
+
+class Project:
+    path_depth = 5
+    _tool: ToolName | None = None
+
+    @staticmethod
+    def is_poetry_v2(text: str) -> bool:
+        return 'build-backend = "poetry' in text
+
+    @staticmethod
+    def get_poetry_version(command: str = "poetry") -> str:
+        pattern = r"(\d+\.\d+\.\d+)"
+        text = DetectionCache.get_tool_version(command)
+        for expr in (
+            rf"Poetry \(version {pattern}\)",
+            rf"Poetry.*version.*{pattern}.*\)",
+            rf"{pattern}",
+        ):
+            if m := re.search(expr, text):
+                return m.group(1)
+        return ""
+
+    @staticmethod
+    def work_dir(
+        name: str, parent: Path, depth: int, be_file: bool = False
+    ) -> Path | None:
+        for _ in range(depth):
+            if (f := parent.joinpath(name)).exists():
+                if be_file:
+                    return f
+                return parent
+            parent = parent.parent
+        return None
+
+    @classmethod
+    @profiled("detect")
+    def get_work_dir(
+        cls: type[Self],
+        name: str = TOML_FILE,
+        cwd: Path | None = None,
+        allow_cwd: bool = False,
+        be_file: bool = False,
+    ) -> Path:
+        cwd = cwd or Path.cwd()
+        if d := cls.work_dir(name, cwd, cls.path_depth, be_file):
+            return d
+        if allow_cwd:
+            return cls.get_root_dir(cwd)
+        raise EnvError(f"{name} not found! Make sure this is a python project.")
+
+    @classmethod
+    def load_toml_text(cls: type[Self], name: str = TOML_FILE) -> str:
+        if name == TOML_FILE:
+            return ProjectContext.current().text
+        toml_file = cls.get_work_dir(name, be_file=True)
+        return toml_file.read_text("utf8")
+
+    @classmethod
+    def load_toml(cls: type[Self], toml_text: str | None = None) -> dict[str, Any]:
+        """Parse toml text, default to the pyproject.toml of current project"""
+        return ProjectContext.current().loads(toml_text)
+
+    @classmethod
+    def manage_by_poetry(cls: type[Self], cache: bool = False) -> bool:
+        return cls.get_manage_tool(cache=cache) == "poetry"
+
+    @classmethod
+    def get_manage_tool(cls: type[Self], cache: bool = False) -> ToolName | None:
+        if cache and cls._tool:
+            return cls._tool
+        try:
+            context = ProjectContext.current()
+        except EnvError:
+            return None
+        if tool := context.manage_tool:
+            cls._tool = tool
+        return tool
+
+    @classmethod
+    @profiled("detect")
+    def detect_manage_tool(cls: type[Self], context: ProjectContext) -> ToolName | None:
+        text = context.text
+        backend = ""
+        skip_uv = load_bool("FASTDEVCLI_SKIP_UV")
+        with contextlib.suppress(KeyError, tomllib.TOMLDecodeError):
+            doc = context.doc
+            backend = doc["build-system"]["build-backend"]
+            if skip_uv:
+                for t in ("pdm", "poetry"):
+                    if t in backend:
+                        cls._tool = t
+                        return cls._tool
+        return cls._get_manage_tool(text, backend, skip_uv)
+
+    @classmethod
+    def _get_manage_tool(
+        cls: type[Self], text: str, backend: str, skip_uv: bool
+    ) -> ToolName | None:
+        lock_files = ProjectContext.current().lock_files
+        if skip_uv:
+            for name in ("pdm", "poetry"):
+                if f"[tool.{name}]" in text:
+                    cls._tool = name
+                    return cls._tool
+            for name in ("pdm", "poetry"):
+                if f"{name}.lock" in lock_files:
+                    cls._tool = cast(ToolName, name)
+                    return cls._tool
+            if "uv.lock" in lock_files:
+                # Use pdm when uv is not available for uv managed project
+                cls._tool = "pdm"
+                return cls._tool
+            return None
+        if "uv.lock" in lock_files:
+            cls._tool = "uv"
+            return cls._tool
+        return cls._parse_manage_tool(lock_files, text, backend)
+
+    @classmethod
+    def _parse_manage_tool(
+        cls: type[Self], lock_files: frozenset[str], text: str, backend: str
+    ) -> ToolName | None:
+        pdm_lock_exists = "pdm.lock" in lock_files
+        poetry_lock_exists = "poetry.lock" in lock_files
+        match pdm_lock_exists + poetry_lock_exists:
+            case 1:
+                cls._tool = "pdm" if pdm_lock_exists else "poetry"
+                return cls._tool
+            case _ as x:
+                if backend:
+                    for t in ("pdm", "poetry"):
+                        if t in backend:
+                            cls._tool = t
+                            return cls._tool
+                for name in ("pdm", "poetry"):
+                    if f"[tool.{name}]" in text:
+                        cls._tool = name
+                        return cls._tool
+                if x == 2:
+                    cls._tool = (
+                        "poetry" if load_bool("FASTDEVCLI_PREFER_POETRY") else "pdm"
+                    )
+                    return cls._tool
+        if "[tool.uv]" in text or load_bool("FASTDEVCLI_PREFER_uv"):
+            cls._tool = "uv"
+            return cls._tool
+        # Poetry 2.0 default to not include the '[tool.poetry]' section
+        if cls.is_poetry_v2(text):
+            cls._tool = "poetry"
+            return cls._tool
+        return None
+
+    @staticmethod
+    def python_exec_dir() -> Path:
+        return Path(sys.executable).parent
+
+    @classmethod
+    def get_root_dir(cls: type[Self], cwd: Path | None = None) -> Path:
+        root = cwd or Path.cwd()
+        venv_parent = cls.python_exec_dir().parent.parent
+        if root.is_relative_to(venv_parent):
+            root = venv_parent
+        return root
+
+    @classmethod
+    def is_pdm_project(cls, strict: bool = True, cache: bool = False) -> bool:
+        if cls.get_manage_tool(cache=cache) != "pdm":
+            return False
+        if strict:
+            return "pdm.lock" in ProjectContext.current().lock_files
+        return True
+
+    @classmethod
+    def get_sync_command(
+        cls, prod: bool = True, doc: dict[str, Any] | None = None, only_me: bool = False
+    ) -> str:
+        pdm_i = "pdm install --frozen" + " --prod" * prod
+        if cls.is_pdm_project():
+            return pdm_i
+        elif cls.manage_by_poetry(cache=True):
+            cmd = "poetry install"
+            if prod:
+                if doc is None:
+                    doc = cls.load_toml()
+                if doc.get("project", {}).get("dependencies") or any(
+                    i != "python"
+                    for i in doc.get("tool", {})
+                    .get("poetry", {})
+                    .get("dependencies", [])
+                ):
+                    cmd += " --only=main"
+            return cmd
+        elif cls.get_manage_tool(cache=True) == "uv":
+            install_me = "uv pip install -e ."
+            if doc is None:
+                doc = cls.load_toml()
+            is_distribution = (
+                doc.get("tool", {}).get("pdm", {}).get("distribution") is not False
+            )
+            if only_me:
+                return install_me if is_distribution else pdm_i
+            cmd = "uv sync --inexact" + " --no-dev" * prod
+            if is_distribution:
+                cmd += f" && {install_me}"
+        return ""
+
+    @classmethod
+    def sync_dependencies(cls, prod: bool = True) -> None:
+        if cmd := cls.get_sync_command():
+            run_and_echo(cmd)
+
+
+def _file_signature(path: Path) -> tuple[int, int, int]:
+    st = path.stat()
+    # Inode changes when file is replaced atomically, even if mtime/size not
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class ProjectContext:
+    """Project info that is read and parsed only once in one invocation.
+
+    Instances are shared by working directory, the cached text/doc are reloaded
+    only when pyproject.toml was changed (e.g.: rewrote by bumpversion).
+    Set `FASTDEVCLI_DEBUG=1` to print how many times each file was read/parsed.
+    """
+
+    LOCK_FILES = ("uv.lock", "pdm.lock", "poetry.lock")
+    stats: ClassVar[Counter[str]] = Counter()
+    _instances: ClassVar[dict[Path, ProjectContext]] = {}
+
+    def __init__(self, toml_file: Path) -> None:
+        self.toml_file = toml_file
+        self.root_dir = toml_file.parent
+        self._texts: dict[Path, tuple[tuple[int, int, int], str]] = {}
+        self._doc: tuple[str, dict[str, Any]] | None = None
+        self._lock_files: tuple[tuple[int, int, int], frozenset[str]] | None = None
+        self._version_file: tuple[str, str] | None = None
+
+    @classmethod
+    @profiled("detect")
+    def current(cls, cwd: Path | None = None) -> ProjectContext:
+        cwd = cwd or Path.cwd()
+        context = cls._instances.get(cwd)
+        if context is None or not context.is_valid(cwd):
+            toml_file = Project.get_work_dir(cwd=cwd, be_file=True)
+            if not cls._instances and load_bool("FASTDEVCLI_DEBUG"):
+                atexit.register(cls.echo_stats)
+            context = cls._instances[cwd] = cls(toml_file)
+        return context
+
+    @classmethod
+    def clear(cls) -> None:
+        cls._instances.clear()
+
+    @classmethod
+    def echo_stats(cls) -> None:
+        for key, count in sorted(cls.stats.items()):
+            echo(f"[fast-dev-cli] {key}: {count}", err=True)
+
+    def is_valid(self, cwd: Path) -> bool:
+        if not self.toml_file.exists():
+            return False
+        # A nearer pyproject.toml may be created after this context was built
+        return cwd == self.root_dir or not cwd.joinpath(TOML_FILE).exists()
+
+    def read_text(self, path: Path | None = None) -> str:
+        """Read file content, only read again when the file was changed"""
+        if path is None:
+            path = self.toml_file
+        signature = _file_signature(path)
+        if (cached := self._texts.get(path)) is not None and cached[0] == signature:
+            return cached[1]
+        self.stats[f"read {path}"] += 1
+        text = path.read_text("utf8")
+        self._texts[path] = (signature, text)
+        return text
+
+    @property
+    def text(self) -> str:
+        return self.read_text()
+
+    @property
+    def doc(self) -> dict[str, Any]:
+        text = self.text
+        if self._doc is None or self._doc[0] is not text:
+            self.stats[f"parse {self.toml_file}"] += 1
+            with Profiler.timer("toml", str(self.toml_file)):
+                self._doc = (text, tomllib.loads(text))
+        return self._doc[1]
+
+    def loads(self, toml_text: str | None = None) -> dict[str, Any]:
+        if toml_text is None or toml_text == self.text:
+            return self.doc
+        self.stats["parse <string>"] += 1
+        with Profiler.timer("toml", "<string>"):
+            return tomllib.loads(toml_text)
+
+    @property
+    def lock_files(self) -> frozenset[str]:
+        # Lock file created or removed will change the mtime of the directory
+        signature = _file_signature(self.root_dir)
+        if self._lock_files is None or self._lock_files[0] != signature:
+            names = frozenset(
+                name
+                for name in self.LOCK_FILES
+                if self.root_dir.joinpath(name).exists()
+            )
+            self._lock_files = (signature, names)
+        return self._lock_files[1]
+
+    def _load_cached(self) -> tuple[list[Any], dict[str, Any]]:
+        key = DetectionCache.project_key(self.root_dir, self.toml_file)
+        item = DetectionCache.get("projects", str(self.root_dir), key)
+        return key, item or {}
+
+    @property
+    def manage_tool(self) -> ToolName | None:
+        key, cached = self._load_cached()
+        if "tool" in cached:
+            return cast("ToolName | None", cached["tool"])
+        tool = Project.detect_manage_tool(self)
+        DetectionCache.set("projects", str(self.root_dir), key, tool=tool)
+        return tool
+
+    @property
+    def package_name(self) -> str:
+        project_name = self.doc.get("project", {}).get("name", self.root_dir.name)
+        return re.sub(r"[- ]", "_", project_name)
+
+    @property
+    def version_file(self) -> str:
+        text = self.text
+        if self._version_file is None or self._version_file[0] is not text:
+            # The result of parse_filename is relative to current directory
+            cwd = str(Path.cwd())
+            key, cached = self._load_cached()
+            filenames = cached.get("version_files", {})
+            filename = filenames.get(cwd)
+            if filename is None or not Path(filename).exists():
+                from .commands.bump import BumpUp
+
+                filename = BumpUp.parse_filename(text, self.root_dir, context=self.doc)
+                DetectionCache.set(
+                    "projects",
+                    str(self.root_dir),
+                    key,
+                    version_files={**filenames, cwd: filename},
+                )
+            self._version_file = (text, filename)
+        return self._version_file[1]
@@ -0,0 +1,166 @@
+"""Registry of the external tools, to answer "is it installed" without spawning.
+
+Executables are resolved by `shutil.which`, and their versions are read from
+the `*.dist-info` metadata of the environment they are installed in. Only
+the tools not installed by pip/uv/pipx fallback to run `<tool> --version`.
+
+Resolved paths are saved in the detection cache, keyed by a fingerprint of
+PATH/virtual environment and the mtime of the PATH directories, so installing
+or removing a tool makes the cache outdated.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import os
+import re
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Any, ClassVar, NamedTuple
+
+from .cache import DetectionCache, file_signature
+from .profiling import profiled
+from .utils import _quote_shell_arg, check_call
+
+# Executables that are provided by distributions with another name
+DISTRIBUTIONS: dict[str, tuple[str, ...]] = {
+    "bumpversion": ("bump-my-version", "bump2version", "bumpversion"),
+}
+
+
+class Tool(NamedTuple):
+    name: str
+    path: str | None
+    version: str
+    # Where the version comes from: metadata, --version or cache
+    source: str
+    seconds: float
+
+
+class ToolRegistry:
+    _fingerprint: ClassVar[str | None] = None
+    _paths: ClassVar[dict[str, str | None]] = {}
+
+    @classmethod
+    def fingerprint(cls) -> str:
+        if cls._fingerprint is None:
+            path = os.getenv("PATH", "")
+            parts: list[Any] = [path, os.getenv("VIRTUAL_ENV", ""), sys.prefix]
+            parts.extend(file_signature(Path(d)) for d in path.split(os.pathsep) if d)
+            text = repr(parts).encode()
+            cls._fingerprint = hashlib.sha256(text).hexdigest()[:16]
+        return cls._fingerprint
+
+    @classmethod
+    def clear(cls) -> None:
+        cls._fingerprint = None
+        cls._paths.clear()
+
+    @classmethod
+    @profiled("detect")
+    def which(cls, name: str) -> str | None:
+        """Path of the executable, cached by the fingerprint of PATH"""
+        if name in cls._paths:
+            return cls._paths[name]
+        key = [cls.fingerprint()]
+        item = DetectionCache.get("which", "paths", key) or {}
+        if name in item:
+            path = item[name]
+        else:
+            path = shutil.which(name)
+            DetectionCache.set("which", "paths", key, **{name: path})
+        cls._paths[name] = path
+        return path
+
+    @classmethod
+    def is_installed(cls, name: str) -> bool:
+        return cls.which(name) is not None
+
+    @staticmethod
+    def site_packages(executable: str) -> list[Path]:
+        """site-packages of the environment that the executable belongs to
+
+        Symlinks are followed only if it is not in a virtual environment, e.g.:
+        `~/.local/bin/ruff` -> `~/.local/share/uv/tools/ruff/bin/ruff`
+        """
+        exe = Path(executable)
+        for bin_dir in dict.fromkeys([exe.parent, exe.resolve().parent]):
+            prefix = bin_dir.parent
+            dirs = [
+                *prefix.glob("lib/python3*/site-packages"),
+                *prefix.glob("Lib/site-packages"),
+            ]
+            if dirs:
+                return dirs
+        return []
+
+    @staticmethod
+    def find_dist_info(site: Path, name: str) -> str | None:
+        """Version in name of the `<name>-<version>.dist-info` directory"""
+        dist = re.sub(r"[-_.]+", "_", name).lower()
+        for info in site.glob("*.dist-info"):
+            dist_name, _, version = info.name.removesuffix(".dist-info").partition("-")
+            if dist_name.lower() == dist and version:
+                return version
+        return None
+
+    @classmethod
+    def metadata_version(cls, name: str, executable: str) -> str:
+        for site in cls.site_packages(executable):
+            for dist in DISTRIBUTIONS.get(name, (name,)):
+                if version := cls.find_dist_info(site, dist):
+                    return version
+        return ""
+
+    @classmethod
+    @profiled("detect")
+    def resolve(cls, name: str) -> Tool:
+        """Executable and version of tool, spawn it only if there is no metadata"""
+        start = time.perf_counter()
+        version = source = ""
+        if (path := cls.which(name)) is not None:
+            key = DetectionCache.executable_key(path)
+            if (
+                key is not None
+                and (item := DetectionCache.get("tools", name, key))
+                and "metadata" in item
+            ):
+                version, source = item["metadata"], "cache"
+            elif version := cls.metadata_version(name, path):
+                source = "metadata"
+                if key is not None:
+                    DetectionCache.set("tools", name, key, metadata=version)
+            else:
+                cached = DetectionCache.tool_version(name) is not None
+                try:
+                    output = DetectionCache.get_tool_version(name)
+                except OSError:
+                    output = ""
+                if m := re.search(r"\d+(?:\.\d+)+[\w.+-]*", output):
+                    version = m.group()
+                    source = "cache" if cached else "--version"
+        return Tool(name, path, version, source, time.perf_counter() - start)
+
+    @classmethod
+    def version(cls, name: str) -> str:
+        return cls.resolve(name).version
+
+    @classmethod
+    def has_module(cls, module: str, python: str = "python") -> bool:
+        """Whether module can be imported by the python(on PATH by default)"""
+        if not (path := python if os.sep in python else cls.which(python)):
+            return False
+        if Path(path).absolute().parent.parent == Path(sys.prefix):
+            return importlib.util.find_spec(module) is not None
+        if sites := cls.site_packages(path):
+            return any(
+                site.joinpath(module).is_dir()
+                or site.joinpath(f"{module}.py").exists()
+                # Installed in editable mode
+                or cls.find_dist_info(site, module) is not None
+                for site in sites
+            )
+        return check_call(f'{_quote_shell_arg(path)} -c "import {module}"')
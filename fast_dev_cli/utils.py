@@ -0,0 +1,378 @@
+from __future__ import annotations
+
+import functools
+import os
+import platform
+import re
+import shlex
+import shutil
+import subprocess  # nosec:B404
+import sys
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal
+
+from typer import Exit, Option, echo, secho
+from typer.models import OptionInfo
+
+from .profiling import Profiler
+
+if TYPE_CHECKING:
+    from .plan import Plan
+
+if sys.version_info >= (3, 11):  # pragma: no cover
+    from enum import StrEnum
+
+    import tomllib
+else:  # pragma: no cover
+    from enum import Enum
+
+    import tomli as tomllib  # noqa:F401
+
+    class StrEnum(str, Enum):
+        __str__ = str.__str__
+
+
+DryOption = Option(False, "--dry", help="Only print, not really run shell command")
+TOML_FILE = "pyproject.toml"
+ToolName = Literal["uv", "pdm", "poetry"]
+ToolOption = Option(
+    "auto", "--tool", help="Explicit declare manage tool (default to auto detect)"
+)
+
+
+class FastDevCliError(Exception):
+    """Basic exception of this library, all custom exceptions inherit from it"""
+
+
+class ShellCommandError(FastDevCliError):
+    """Raise if cmd command returncode is not zero"""
+
+
+class ParseError(FastDevCliError):
+    """Raise this if parse dependence line error"""
+
+
+class EnvError(FastDevCliError):
+    """Raise when expected to be managed by poetry, but toml file not found."""
+
+
+def poetry_module_name(name: str) -> str:
+    """Get module name that generated by `poetry new`"""
+    try:
+        from packaging.utils import canonicalize_name
+    except ImportError:
+        module_name = re.sub(r"[-_.]+", "-", name)
+    else:
+        module_name = canonicalize_name(name)
+    return module_name.replace("-", "_").replace(" ", "_")
+
+
+def is_emoji(char: str) -> bool:
+    try:
+        import emoji
+    except ImportError:
+        pass
+    else:
+        return emoji.is_emoji(char)
+    if re.match(r"[\w\d\s]", char):
+        return False
+    return not "\u4e00" <= char <= "\u9fff"  # Chinese character
+
+
+@functools.cache
+def is_windows() -> bool:
+    return platform.system() == "Windows"
+
+
+@functools.cache
+def prefer_uv_tool() -> bool:
+    if shutil.which("uv") is None:
+        return False
+    cmd = "uv tool list"
+    return Shell(cmd).capture_output() != "No tools installed"
+
+
+def yellow_warn(msg: str) -> None:
+    if is_windows() and (encoding := sys.stdout.encoding) != "utf-8":
+        msg = msg.encode(encoding, errors="ignore").decode(encoding)
+    secho(msg, fg="yellow")
+
+
+def load_bool(name: str, default: bool = False, *, verbose: bool = True) -> bool:
+    if not (v := os.getenv(name)):
+        return default
+    if (b := _convert_bool(v)) is not None:
+        return b
+    if verbose:
+        secho(f"WARNING: can not convert value({v!r}) of {name} to bool!")
+    return default
+
+
+def _convert_bool(v: str) -> bool | None:
+    if (lower := v.lower()) in ("0", "false", "f", "off", "no", "n"):
+        return False
+    elif lower in ("1", "true", "t", "on", "yes", "y"):
+        return True
+    return None
+
+
+def is_venv() -> bool:
+    """Whether in a virtual environment(also work for poetry)"""
+    return hasattr(sys, "real_prefix") or (
+        hasattr(sys, "base_prefix") and sys.base_prefix != sys.prefix
+    )
+
+
+class Shell:
+    def __init__(self, cmd: list[str] | str, **kw: Any) -> None:
+        self._cmd = cmd
+        self._kw = kw
+
+    @staticmethod
+    def run_by_subprocess(
+        cmd: list[str] | str, **kw: Any
+    ) -> subprocess.CompletedProcess[str]:
+        if isinstance(cmd, str):
+            kw.setdefault("shell", True)
+        check = kw.pop("check", False)
+        return subprocess.run(cmd, check=check, **kw)  # nosec:B603
+
+    @property
+    def command(self) -> list[str] | str:
+        command: list[str] | str = self._cmd
+        if isinstance(command, str):
+            cs = shlex.split(command)
+            if "shell" not in self._kw and not (set(self._cmd) & {"|", ">", "&"}):
+                command = self.expand_user(cs)
+            elif any(i.startswith("~") for i in cs):
+                command = re.sub(r" ~", " " + os.path.expanduser("~"), command)
+        else:
+            command = self.expand_user(command)
+        return command
+
+    @staticmethod
+    def expand_user(cs: list[str]) -> list[str]:
+        if cs[0] == "echo":
+            return cs
+        for i, c in enumerate(cs):
+            if c.startswith("~"):
+                cs[i] = os.path.expanduser(c)
+        return cs
+
+    @staticmethod
+    def run_with_pid(
+        cmd: list[str] | str, **kw: Any
+    ) -> tuple[subprocess.CompletedProcess[str], int]:
+        """Same as `run_by_subprocess`, but also return pid of the child process"""
+        if isinstance(cmd, str):
+            kw.setdefault("shell", True)
+        check = kw.pop("check", False)
+        stdin_input = kw.pop("input", None)
+        timeout = kw.pop("timeout", None)
+        if kw.pop("capture_output", False):
+            kw["stdout"] = kw["stderr"] = subprocess.PIPE
+        with subprocess.Popen(cmd, **kw) as p:  # nosec:B603
+            try:
+                stdout, stderr = p.communicate(stdin_input, timeout=timeout)
+            except BaseException:
+                p.kill()
+                raise
+            r = subprocess.CompletedProcess(p.args, p.wait(), stdout, stderr)
+        if check:
+            r.check_returncode()
+        return r, p.pid
+
+    def _run(self) -> subprocess.CompletedProcess[str]:
+        if not Profiler.enabled:
+            return self.run_by_subprocess(self.command, **self._kw)
+        cmd = self._cmd if isinstance(self._cmd, str) else shlex.join(self._cmd)
+        with Profiler.timer("subprocess", cmd) as info:
+            r, info["pid"] = self.run_with_pid(self.command, **self._kw)
+            info["returncode"] = r.returncode
+            info["output_bytes"] = sum(
+                len(i.encode() if isinstance(i, str) else i)
+                for i in (r.stdout, r.stderr)
+                if i
+            )
+            return r
+
+    def run(self, verbose: bool = False, dry: bool = False) -> int:
+        if verbose:
+            echo(f"--> {self._cmd}")
+        if dry:
+            return 0
+        return self._run().returncode
+
+    def check_call(self) -> bool:
+        self._kw.update(stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            return self.run() == 0
+        except FileNotFoundError:
+            return False
+
+    def capture_output(self, raises: bool = False) -> str:
+        self._kw.update(capture_output=True, encoding="utf-8")
+        r = self._run()
+        if raises and r.returncode != 0:
+            raise ShellCommandError(r.stderr)
+        return (r.stdout or r.stderr or "").strip()
+
+    def finish(
+        self, env: dict[str, str] | None = None, _exit: bool = False, dry: bool = False
+    ) -> subprocess.CompletedProcess[str]:
+        self.run(verbose=True, dry=True)
+        if _ensure_bool(dry):
+            return subprocess.CompletedProcess("", 0)
+        if env is not None:
+            self._kw["env"] = {**os.environ, **env}
+        r = self._run()
+        if rc := r.returncode:
+            if _exit:
+                sys.exit(rc)
+            raise Exit(rc)
+        return r
+
+
+def run_and_echo(
+    cmd: str, *, dry: bool = False, verbose: bool = True, **kw: Any
+) -> int:
+    """Run shell command with subprocess and print it"""
+    return Shell(cmd, **kw).run(verbose=verbose, dry=dry)
+
+
+def check_call(cmd: str) -> bool:
+    return Shell(cmd).check_call()
+
+
+def capture_cmd_output(
+    command: list[str] | str, *, raises: bool = False, **kw: Any
+) -> str:
+    return Shell(command, **kw).capture_output(raises=raises)
+
+
+def exit_if_run_failed(
+    cmd: str,
+    env: dict[str, str] | None = None,
+    _exit: bool = False,
+    dry: bool = False,
+    **kw: Any,
+) -> subprocess.CompletedProcess[str]:
+    return Shell(cmd, **kw).finish(env=env, _exit=_exit, dry=dry)
+
+
+def run_parallel(commands: Sequence[str], dry: bool = False) -> list[int]:
+    """Run shell commands concurrently and print their output one by one
+
+    :return: returncode of each command
+    """
+    for cmd in commands:
+        echo(f"--> {cmd}")
+    if dry or not commands:
+        return [0] * len(commands)
+    return run_concurrently(commands)
+
+
+def run_concurrently(
+    commands: Sequence[list[str] | str], env: dict[str, str] | None = None
+) -> list[int]:
+    """Run commands in threads with output captured, then print them in order
+
+    Commands of str type are run by shell, while argv lists are run directly.
+    """
+    if env is not None:
+        env = {**os.environ, **env}
+    if sys.stdout.isatty() and not os.getenv("NO_COLOR"):
+        # Keep colorful output of ruff/mypy even though it is captured
+        env = {**(env or os.environ), "FORCE_COLOR": "1", "MYPY_FORCE_COLOR": "1"}
+    kw: dict[str, Any] = {
+        "stdout": subprocess.PIPE,
+        "stderr": subprocess.STDOUT,
+        "encoding": "utf-8",
+        "errors": "replace",
+        "env": env,
+    }
+    with ThreadPoolExecutor(max_workers=len(commands)) as pool:
+        start = time.perf_counter()
+        futures = [
+            pool.submit(Shell(cmd, shell=isinstance(cmd, str), **kw)._run)
+            for cmd in commands
+        ]
+        codes: list[int] = []
+        for cmd, future in zip(commands, futures, strict=True):
+            try:
+                r = future.result()
+            except FileNotFoundError as e:
+                # Same returncode as shell when the executable not found
+                r = subprocess.CompletedProcess(cmd, 127, f"{e}\n")
+            cost = time.perf_counter() - start
+            color = "red" if r.returncode else "green"
+            tip = f"exit code: {r.returncode}, {cost:.2f}s"
+            label = cmd if isinstance(cmd, str) else _join_shell_args(cmd)
+            secho(f"==> {label} ({tip})", fg=color, bold=True)
+            if r.stdout:
+                echo(r.stdout, nl=not r.stdout.endswith("\n"))
+            codes.append(r.returncode)
+    return codes
+
+
+def _ensure_bool(value: bool | OptionInfo) -> bool:
+    if isinstance(value, bool):
+        return value
+    return bool(getattr(value, "default", False))
+
+
+def _ensure_str(value: str | OptionInfo | None) -> str | None:
+    if isinstance(value, str) or value is None:
+        return value
+    return getattr(value, "default", "")
+
+
+def _quote_shell_arg(value: str | Path) -> str:
+    text = str(value)
+    if not is_windows():
+        return shlex.quote(text)
+    if text and not re.search(r'[\s"&|<>^()%!]', text):
+        return text
+
+    # Quote for the Windows C runtime while keeping cmd.exe metacharacters inert.
+    result = ['"']
+    backslashes = 0
+    for char in text:
+        if char == "\\":
+            backslashes += 1
+        elif char == '"':
+            result.append("\\" * (backslashes * 2 + 1))
+            result.append(char)
+            backslashes = 0
+        else:
+            result.append("\\" * backslashes)
+            result.append(char)
+            backslashes = 0
+    result.append("\\" * (backslashes * 2))
+    result.append('"')
+    return "".join(result)
+
+
+def _join_shell_args(args: list[str]) -> str:
+    return " ".join(_quote_shell_arg(arg) for arg in args)
+
+
+class DryRun:
+    def __init__(self, _exit: bool = False, dry: bool = False) -> None:
+        self.dry = _ensure_bool(dry)
+        self._exit = _exit
+
+    def gen(self) -> str:
+        raise NotImplementedError
+
+    def plan(self) -> Plan:
+        """Steps of the command generated by `gen`"""
+        from .plan import Plan
+
+        return Plan.parse(self.gen())
+
+    def run(self) -> None:
+        self.plan().finish(_exit=self._exit, dry=self.dry)
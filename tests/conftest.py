@@ -1,3 +1,4 @@
+import os
 from collections.abc import Generator
 from pathlib import Path
 
@@ -53,6 +54,19 @@ build-backend = "poetry.core.masonry.api"
 tmp_work_dir = chdir_tmp_fixture()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def isolated_cache_dir(tmp_path_factory: pytest.TempPathFactory) -> Generator[Path]:
+    # Do not pollute the detection cache of current user
+    cache_dir = tmp_path_factory.mktemp("fast_cache")
+    origin = os.environ.get("FASTDEVCLI_CACHE_DIR")
+    os.environ["FASTDEVCLI_CACHE_DIR"] = str(cache_dir)
+    yield cache_dir
+    if origin is None:
+        os.environ.pop("FASTDEVCLI_CACHE_DIR", None)
+    else:
+        os.environ["FASTDEVCLI_CACHE_DIR"] = origin
+
+
 @pytest.fixture
 def tmp_poetry_project(tmp_work_dir: Path) -> Generator[Path]:
     Path(TOML_FILE).write_text(TOML_CONTENT)
@@ -16,13 +16,19 @@ from fast_dev_cli.cli import (
     BumpUp,
     EnvError,
     Exit,
+    ParseError,
     Project,
+    ProjectContext,
     ShellCommandError,
     StrEnum,
+    WorkspaceBump,
     bump,
     bump_version,
     capture_cmd_output,
+    find_version_span,
+    find_workspace_members,
     get_current_version,
+    replace_version,
     run_and_echo,
 )
 
@@ -57,7 +63,8 @@ def _bump_commands(
     return patch_without_commit, patch_with_commit, minor_with_commit
 
 
-def test_bump_dry(mocker):
+def test_bump_dry(mocker, monkeypatch):
+    monkeypatch.setenv("FASTDEVCLI_BUMPVERSION", "1")
     mocker.patch("fast_dev_cli.cli.Project.manage_by_poetry", return_value=True)
     with pytest.raises(ShellCommandError):
         get_current_version()
@@ -71,9 +78,12 @@ def test_bump_dry(mocker):
     assert BumpUp(part="minor", commit=True, dry=True).gen() == minor_with_commit
 
 
-def test_bump_quotes_version_filename(mocker):
+def test_bump_quotes_version_filename(mocker, monkeypatch):
+    monkeypatch.setenv("FASTDEVCLI_BUMPVERSION", "1")
     filename = "version files/v; echo injected.py"
-    mocker.patch("fast_dev_cli.cli.get_current_version", return_value=(False, "0.1.0"))
+    mocker.patch(
+        "fast_dev_cli.commands.bump.get_current_version", return_value=(False, "0.1.0")
+    )
     command = BumpUp(part="patch", commit=False, filename=filename, dry=True).gen()
     assert shlex.split(command)[-2:] == [filename, "--allow-dirty"]
 
@@ -85,7 +95,9 @@ def test_bump(
     # Use tmp_path fixture, so we no need to teardown files after test
     # https://docs.pytest.org/en/latest/how-to/tmp_path.html
     tmp_path: Path,
+    monkeypatch,
 ):
+    monkeypatch.setenv("FASTDEVCLI_BUMPVERSION", "1")
     version = get_current_version()
     patch_without_commit, patch_with_commit, minor_with_commit = _bump_commands(
         version, "fast_dev_cli/__init__.py"
@@ -109,7 +121,8 @@ def test_bump(
     assert patch_without_commit in stream.getvalue()
 
 
-def test_bump_with_poetry(mocker, tmp_poetry_project, tmp_path):
+def test_bump_with_poetry(mocker, tmp_poetry_project, tmp_path, monkeypatch):
+    monkeypatch.setenv("FASTDEVCLI_BUMPVERSION", "1")
     mocker.patch("builtins.input", return_value=" ")
     version = get_current_version(check_version=False)
     patch_without_commit, patch_with_commit, minor_with_commit = _bump_commands(
@@ -164,6 +177,7 @@ def test_bump_with_poetry(mocker, tmp_poetry_project, tmp_path):
 
 
 def test_bump_with_emoji(mocker, tmp_path, monkeypatch):
+    monkeypatch.setenv("FASTDEVCLI_BUMPVERSION", "1")
     mocker.patch("fast_dev_cli.cli.Project.manage_by_poetry", return_value=True)
     with pytest.raises(ShellCommandError):
         get_current_version()
@@ -194,11 +208,13 @@ def test_bump_with_emoji_in_poetry_project(mocker, tmp_path, monkeypatch):
         assert BumpUp.should_add_emoji() is False
         subprocess.run(["git", "commit", "-m", last_commit])
         monkeypatch.setenv("DONT_GIT_PUSH", "1")
-        command = BumpUp(part="patch", commit=True, no_sync=True).gen()
+        command = BumpUp(
+            part="patch", commit=True, no_sync=True, bumpversion=True
+        ).gen()
         expected = patch_with_commit.split("&&")[0].strip().replace('""', '"0.1.0"')
         assert expected == command
         subprocess.run(["poetry", "run", "pip", "install", "bumpversion2"])
-        subprocess.run(["fast", "bump", "patch", "--commit"])
+        subprocess.run(["fast", "bump", "patch", "--commit", "--bumpversion"])
         out = capture_cmd_output(["git", "log"])
         assert BumpUp.should_add_emoji()
         Path("a.txt").touch()
@@ -214,11 +230,31 @@ def test_bump_with_uv(tmp_path):
     project_dir.mkdir()
     with chdir(project_dir):
         subprocess.run(["uv", "init"])
-        command = BumpUp(part="patch", commit=False).gen()
+        command = BumpUp(part="patch", commit=False, bumpversion=True).gen()
         assert "pyproject.toml" in command
         Path(TOML_FILE).write_text("[project]" + os.linesep + 'version = "0.1.0"')
         command = BumpUp(part="patch", commit=True).gen()
-        assert TOML_FILE in command
+        assert f"git add --update {TOML_FILE}" in command
+
+
+def test_project_context_parse_once(tmp_work_dir):
+    toml_file = tmp_work_dir / TOML_FILE
+    toml_file.write_text('[project]\nname = "hello-world"\nversion = "0.1.0"\n')
+    Path("uv.lock").touch()
+    ProjectContext.stats.clear()
+    assert get_current_version() == "0.1.0"
+    bump_up = BumpUp(part="patch", commit=False)
+    bump_up.gen()
+    assert bump_up.filename == TOML_FILE
+    assert Project.get_manage_tool() == "uv"
+    assert ProjectContext.current().package_name == "hello_world"
+    assert ProjectContext.stats[f"read {toml_file}"] == 1
+    assert ProjectContext.stats[f"parse {toml_file}"] == 1
+    # Reload after the file was changed
+    toml_file.write_text('[project]\nname = "hello-world"\nversion = "0.1.10"\n')
+    assert get_current_version() == "0.1.10"
+    assert ProjectContext.stats[f"read {toml_file}"] == 2
+    assert ProjectContext.stats[f"parse {toml_file}"] == 2
 
 
 def test_parse_filename(tmp_path):
@@ -418,11 +454,14 @@ def test_package_dot_json(tmp_work_dir):
     out = capture_cmd_output("fast bump patch")
     assert p.name in out
     assert "0.1.1" in p.read_text()
-    out = capture_cmd_output("fast bump patch --commit --dry")
+    out = capture_cmd_output("fast bump patch --commit --dry --bumpversion")
     assert (
         'bumpversion --parse "(?P<major>\\d+)\\.(?P<minor>\\d+)\\.(?P<patch>\\d+)" --current-version="0.1.1" patch package.json --commit'
         in out
     )
+    out = capture_cmd_output("fast bump patch --commit --dry")
+    assert "Bump version(@package.json): 0.1.1 \u2192 0.1.2" in out
+    assert "git add --update package.json && git commit -m" in out
     run_and_echo("git init")
     run_and_echo("git add .")
     run_and_echo("git config user.name xxx")
@@ -430,3 +469,121 @@ def test_package_dot_json(tmp_work_dir):
     run_and_echo('git commit -m "xxx"')
     out = capture_cmd_output("fast tag --dry")
     assert "git tag -a 0.1.1 -m '' && git push --tags" in out
+
+
+def test_replace_version(tmp_work_dir):
+    text = (
+        '[project]\r\nname = "a"\r\nversion = "0.1.0"\r\n'
+        '[tool.foo]\r\nversion = "0.1.0"\r\n'
+    )
+    assert find_version_span("pyproject.toml", text[40:], "0.1.0") is None
+    p = Path(TOML_FILE)
+    p.write_bytes(text.encode())
+    replace_version(p, "0.1.0", "0.2.0")
+    assert p.read_bytes().decode() == text.replace("0.1.0", "0.2.0", 1)
+    with pytest.raises(ParseError):
+        replace_version(p, "0.1.0", "0.2.0")
+    init_file = Path("__init__.py")
+    init_file.write_text(
+        '"""0.1.0"""\nVERSION = "0.1.0"\n__version__: str = \'0.1.0\'\n'
+    )
+    replace_version(init_file, "0.1.0", "0.1.1")
+    assert init_file.read_text().endswith("__version__: str = '0.1.1'\n")
+    assert 'VERSION = "0.1.0"' in init_file.read_text()
+    package = Path("package.json")
+    package.write_text('{"deps": {}, "version": "1.0.0", "x": {"version": "1.0.0"}}')
+    replace_version(package, "1.0.0", "1.0.1")
+    assert package.read_text().count("1.0.0") == 1
+
+
+def test_bump_in_process(tmp_work_dir, mocker, monkeypatch, capsys):
+    monkeypatch.delenv("FASTDEVCLI_BUMPVERSION", raising=False)
+    monkeypatch.setenv("DONT_GIT_PUSH", "1")
+    Path(TOML_FILE).write_text('[project]\nname = "foo"\nversion = "1.2.3"\n')
+    run_and_echo("git init")
+    run_and_echo("git config user.name xxx")
+    run_and_echo("git config user.email xxx@a.com")
+    run_and_echo('git add . && git commit -m "init"')
+    mock_run = mocker.patch("fast_dev_cli.commands.bump.DryRun.run")
+    BumpUp(part="minor", commit=True, emoji=False, no_sync=True).run()
+    mock_run.assert_not_called()
+    assert 'version = "1.3.0"' in Path(TOML_FILE).read_text()
+    assert BumpUp.get_last_commit_message() == "Bump version: 1.2.3 \u2192 1.3.0"
+    assert capture_cmd_output("git tag") == "v1.3.0"
+    out = capsys.readouterr().out
+    assert "Bump version(@pyproject.toml): 1.2.3 \u2192 1.3.0" in out
+    BumpUp(part="major", commit=False, dry=True).run()
+    assert 'version = "1.3.0"' in Path(TOML_FILE).read_text()
+    assert "1.3.0 \u2192 2.0.0" in capsys.readouterr().out
+    Path(TOML_FILE).write_text('[project]\nname = "foo"\nversion = "1.3.0"\n\n')
+    with pytest.raises(Exit):
+        BumpUp(part="patch", commit=True, no_sync=True).run()
+    assert "Git working directory is not clean" in capsys.readouterr().out
+    assert BumpUp(part="patch", commit=False).next_version("patch", "1.3.9") == "1.3.10"
+
+
+def test_bump_workspace(tmp_work_dir, monkeypatch, capsys):
+    monkeypatch.setenv("DONT_GIT_PUSH", "1")
+    Path(TOML_FILE).write_text(
+        '[project]\nname = "ws"\nversion = "1.0.0"\n'
+        '[tool.uv.workspace]\nmembers = ["packages/*"]\nexclude = ["packages/c"]\n'
+    )
+    a = Path("packages/a")
+    a.joinpath("a").mkdir(parents=True)
+    a.joinpath(TOML_FILE).write_text(
+        '[project]\nname = "pkg-a"\ndynamic = ["version"]\n'
+        '[tool.pdm.version]\nsource = "file"\npath = "a/__init__.py"\n'
+    )
+    a.joinpath("a/__init__.py").write_text('__version__ = "0.1.0"\n')
+    for name in ("b", "c"):
+        Path("packages", name).mkdir()
+        Path("packages", name, TOML_FILE).write_text(
+            f'[tool.poetry]\nname = "pkg-{name}"\nversion = "2.3.4"\n'
+        )
+    # Version managed by poetry-plugin-version
+    d = Path("packages/d")
+    d.joinpath("d").mkdir(parents=True)
+    d.joinpath(TOML_FILE).write_text('[tool.poetry]\nname = "pkg-d"\nversion = "0"\n')
+    d.joinpath("d/__init__.py").write_text('__version__ = "3.0.1"\n')
+    assert find_workspace_members(tmp_work_dir) == [
+        tmp_work_dir,
+        tmp_work_dir / "packages/a",
+        tmp_work_dir / "packages/b",
+        tmp_work_dir / "packages/d",
+    ]
+    assert find_workspace_members(tmp_work_dir, ["packages/c"])[1:] == [
+        tmp_work_dir / "packages/c"
+    ]
+    # Bad config is not ignored silently
+    for pattern in ("packages/x*", "packages/a/a"):
+        with pytest.raises(ParseError, match=re.escape(f"matches member '{pattern}'")):
+            find_workspace_members(tmp_work_dir, [pattern])
+    with pytest.raises(Exit):
+        WorkspaceBump("patch", commit=False, members=["packages/x*"]).run()
+    assert "No project with pyproject.toml" in capsys.readouterr().out
+    run_and_echo("git init")
+    run_and_echo("git config user.name xxx")
+    run_and_echo("git config user.email xxx@a.com")
+    run_and_echo('git add . && git commit -m "init"')
+    capsys.readouterr()
+    # Members are resolved by their paths, without changing directory
+    with monkeypatch.context() as m:
+        m.setattr(os, "chdir", None)
+        WorkspaceBump("minor", commit=True, emoji=False, dry=True).run()
+    out = capsys.readouterr().out
+    assert "pkg-a(@packages/a/a/__init__.py): 0.1.0 \u2192 0.2.0" in out
+    assert "pkg-d(@packages/d/d/__init__.py): 3.0.1 \u2192 3.1.0" in out
+    assert "git tag -a pkg-b-v2.4.0" in out
+    assert capture_cmd_output("git status --porcelain") == ""
+    with chdir(a):
+        WorkspaceBump("minor", commit=True, emoji=False).run()
+    assert a.joinpath("a/__init__.py").read_text() == '__version__ = "0.2.0"\n'
+    assert 'version = "1.1.0"' in Path(TOML_FILE).read_text()
+    assert 'version = "2.3.4"' in Path("packages/c", TOML_FILE).read_text()
+    assert BumpUp.get_last_commit_message() == "Bump version: minor of 4 packages"
+    tags = capture_cmd_output("git tag").split()
+    assert tags == ["pkg-a-v0.2.0", "pkg-b-v2.4.0", "pkg-d-v3.1.0", "ws-v1.1.0"]
+    Path(TOML_FILE).write_text('[project]\nname = "ws"\nversion = "x"\n')
+    with pytest.raises(Exit):
+        WorkspaceBump("patch", commit=False).run()
+    assert "Unsupported version format" in capsys.readouterr().out
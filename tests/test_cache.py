@@ -0,0 +1,102 @@
+import os
+from pathlib import Path
+
+from fast_dev_cli.cli import (
+    TOML_FILE,
+    DetectionCache,
+    Project,
+    ProjectContext,
+    ShellCommandError,
+)
+from fast_dev_cli.commands.cache import cache_clear, cache_info
+
+
+def test_detection_cache(tmp_work_dir, mocker):
+    Path(TOML_FILE).write_text('[project]\nname = "foo"\nversion = "0.1.0"\n')
+    Path("uv.lock").touch()
+    assert Project.get_manage_tool() == "uv"
+    item = DetectionCache.load()["projects"][str(tmp_work_dir)]
+    assert item["tool"] == "uv"
+    assert ProjectContext.current().version_file == TOML_FILE
+    # Cache hit, no need to detect again
+    detect = mocker.spy(Project, "detect_manage_tool")
+    ProjectContext.clear()
+    assert Project.get_manage_tool() == "uv"
+    detect.assert_not_called()
+    # Invalidated by lock file changes
+    Path("uv.lock").unlink()
+    Path("pdm.lock").touch()
+    assert Project.get_manage_tool() == "pdm"
+    detect.assert_called_once()
+
+
+def test_tool_version_cache(tmp_work_dir, mocker):
+    capture = mocker.patch(
+        "fast_dev_cli.cache.capture_cmd_output", return_value="Poetry (version 2.1.3)"
+    )
+    mocker.patch("fast_dev_cli.cache.shutil.which", return_value=__file__)
+    assert Project.get_poetry_version() == "2.1.3"
+    assert Project.get_poetry_version() == "2.1.3"
+    capture.assert_called_once()
+    # Not cache the command that may resolve to another version
+    assert Project.get_poetry_version("uvx poetry") == "2.1.3"
+    assert Project.get_poetry_version("uvx poetry") == "2.1.3"
+    assert capture.call_count == 3
+
+
+def test_tool_version_not_cached(tmp_work_dir, mocker):
+    capture = mocker.patch(
+        "fast_dev_cli.cache.capture_cmd_output", return_value="ruff 0.9.1"
+    )
+    which = mocker.patch("fast_dev_cli.cache.shutil.which")
+    # Shims of pyenv/asdf stay the same when the tool behind them is upgraded
+    Path("shims").mkdir()
+    Path("shims/ruff").touch()
+    which.return_value = str(Path("shims/ruff").resolve())
+    assert DetectionCache.get_tool_version("ruff") == "ruff 0.9.1"
+    assert DetectionCache.get_tool_version("ruff") == "ruff 0.9.1"
+    assert capture.call_count == 2
+    # Symlinks are keyed by the file they point to
+    Path("bin").mkdir()
+    for name in ("ruff-0.9", "ruff-0.10"):
+        Path("bin", name).write_text(name)
+    Path("bin/ruff").symlink_to("ruff-0.9")
+    which.return_value = str(Path("bin/ruff").resolve().with_name("ruff"))
+    assert DetectionCache.get_tool_version("ruff") == "ruff 0.9.1"
+    assert DetectionCache.get_tool_version("ruff") == "ruff 0.9.1"
+    assert capture.call_count == 3
+    Path("bin/ruff").unlink()
+    Path("bin/ruff").symlink_to("ruff-0.10")
+    capture.return_value = "ruff 0.10.0"
+    assert DetectionCache.get_tool_version("ruff") == "ruff 0.10.0"
+    assert capture.call_count == 4
+    # Error of `--version` is not cached
+    Path("bin/ruff-0.10").write_text("broken")
+    capture.side_effect = ShellCommandError("error: broken\n")
+    assert DetectionCache.get_tool_version("ruff") == "error: broken"
+    capture.side_effect = None
+    assert DetectionCache.get_tool_version("ruff") == "ruff 0.10.0"
+    assert capture.call_count == 6
+
+
+def test_disable_cache(tmp_work_dir, monkeypatch):
+    monkeypatch.setenv("FASTDEVCLI_NO_CACHE", "1")
+    Path(TOML_FILE).write_text("[tool.pdm]")
+    assert Project.get_manage_tool() == "pdm"
+    assert str(tmp_work_dir) not in DetectionCache.load()["projects"]
+
+
+def test_cache_command(tmp_work_dir, capsys):
+    Path(TOML_FILE).write_text("[tool.poetry]")
+    assert Project.get_manage_tool() == "poetry"
+    cache_info()
+    out = capsys.readouterr().out
+    assert f"Cache file: {DetectionCache.path()}" in out
+    assert f"Current project: {tmp_work_dir}" in out
+    assert '"tool": "poetry"' in out
+    cache_clear()
+    assert "Removed" in capsys.readouterr().out
+    assert not DetectionCache.path().exists()
+    cache_clear()
+    assert capsys.readouterr().out.strip() == "Cache is empty."
+    assert os.environ["FASTDEVCLI_CACHE_DIR"] in str(DetectionCache.path())
@@ -209,3 +209,54 @@ def test_smart_fast_deps(tmp_work_dir, monkeypatch):
     pdm_lock.unlink()
     out = capture_cmd_output("fast deps --dry")
     assert out == "--> pdm install --frozen -G :all"
+
+
+def test_deps_stamp(tmp_work_dir, mocker, capsys):
+    mock_run = mocker.patch("fast_dev_cli.commands.deps.exit_if_run_failed")
+    Path("pyproject.toml").write_text('[project]\nname = "foo"\ndependencies = []\n')
+    Path("uv.lock").write_text("version = 1\n")
+    deps = MakeDeps("uv")
+    assert deps.get_venv() is None
+    deps.run()
+    deps.run()
+    assert mock_run.call_count == 2  # No venv to save stamp
+    venv = Path(".venv")
+    venv.mkdir()
+    venv.joinpath("pyvenv.cfg").write_text("home = /usr/bin\n")
+    deps.run()
+    assert venv.joinpath(MakeDeps.STAMP_FILE).exists()
+    mock_run.reset_mock()
+    deps.run()
+    mock_run.assert_not_called()
+    assert "Dependencies are up to date" in capsys.readouterr().out
+    MakeDeps("uv", dry=True).run()
+    MakeDeps("uv", force=True).run()
+    assert mock_run.call_count == 2
+    # Different groups/extras, lock file, dependencies or venv
+    mock_run.reset_mock()
+    MakeDeps("uv", prod=True).run()
+    assert mock_run.call_count == 1
+    deps.run()
+    assert mock_run.call_count == 2
+    for path, text in (
+        ("uv.lock", "version = 2\n"),
+        ("pyproject.toml", '[project]\nname = "foo"\ndependencies = ["a"]\n'),
+        (".venv/pyvenv.cfg", "home = /usr/local/bin\n"),
+    ):
+        Path(path).write_text(text)
+        deps.run()
+        deps.run()
+    assert mock_run.call_count == 5
+
+
+def test_deps_active_venv(tmp_work_dir, monkeypatch):
+    Path("pyproject.toml").write_text('[project]\nname = "foo"\n')
+    Path(".venv").mkdir()
+    monkeypatch.delenv("VIRTUAL_ENV", raising=False)
+    # The environment of fast itself is not the one to install into
+    monkeypatch.setattr("sys.prefix", str(tmp_work_dir / "tool-env"))
+    assert MakeDeps("pip").get_venv() is None
+    assert MakeDeps("uv", active=True).get_venv() is None
+    assert MakeDeps("uv").get_venv() == tmp_work_dir / ".venv"
+    monkeypatch.setenv("VIRTUAL_ENV", str(tmp_work_dir / "env"))
+    assert MakeDeps("pip").get_venv() == tmp_work_dir / "env"
@@ -1,16 +1,25 @@
+import json
 import os
 import pathlib
 from collections.abc import Generator
 
 import pytest
+import typer
 from pytest_mock import MockerFixture
 
 from fast_dev_cli.cli import (
+    DurationDB,
     Project,
+    ToolRegistry,
     _quote_shell_arg,
     _should_run_test_script,
     capture_cmd_output,
+    collect_test_files,
     coverage_test,
+    parse_shard,
+    parse_workers,
+    shard_tests,
+    sharded_test,
 )
 from fast_dev_cli.cli import test as unitcase
 
@@ -31,8 +40,10 @@ def test_cli_test(mocker, capsys):
         and 'coverage report --omit="tests/*" -m' in output
     )
 
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
-    mocker.patch("fast_dev_cli.cli._should_run_test_script", return_value=None)
+    mocker.patch("fast_dev_cli.commands.test.is_venv", return_value=True)
+    mocker.patch(
+        "fast_dev_cli.commands.test._should_run_test_script", return_value=None
+    )
     unitcase(dry=True)
     assert (
         'coverage run -m pytest -s && coverage report --omit="tests/*" -m'
@@ -41,8 +52,10 @@ def test_cli_test(mocker, capsys):
 
 
 def test_test_with_pdm_run(mocker: MockerFixture, capsys):
-    mocker.patch("fast_dev_cli.cli.check_call", return_value=False)
-    mocker.patch("fast_dev_cli.cli._should_run_test_script", return_value=None)
+    mocker.patch.object(ToolRegistry, "is_installed", return_value=False)
+    mocker.patch(
+        "fast_dev_cli.commands.test._should_run_test_script", return_value=None
+    )
     mocker.patch("fast_dev_cli.cli.Project.get_manage_tool", return_value="pdm")
     unitcase(dry=True)
     assert (
@@ -52,8 +65,10 @@ def test_test_with_pdm_run(mocker: MockerFixture, capsys):
 
 
 def test_test_with_poetry_or_pdm_run(mocker: MockerFixture, capsys):
-    mocker.patch("fast_dev_cli.cli.check_call", return_value=False)
-    mocker.patch("fast_dev_cli.cli._should_run_test_script", return_value=None)
+    mocker.patch.object(ToolRegistry, "is_installed", return_value=False)
+    mocker.patch(
+        "fast_dev_cli.commands.test._should_run_test_script", return_value=None
+    )
     mocker.patch("fast_dev_cli.cli.Project.manage_by_poetry", return_value=True)
     unitcase(dry=True)
     command = "coverage"
@@ -66,8 +81,10 @@ def test_test_with_poetry_or_pdm_run(mocker: MockerFixture, capsys):
 
 
 def test_test_not_in_venv(mocker: MockerFixture, capsys):
-    mocker.patch("fast_dev_cli.cli._should_run_test_script", return_value=None)
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=False)
+    mocker.patch(
+        "fast_dev_cli.commands.test._should_run_test_script", return_value=None
+    )
+    mocker.patch("fast_dev_cli.commands.test.is_venv", return_value=False)
     unitcase(dry=True)
     command = "coverage"
     if tool := Project.get_manage_tool():
@@ -80,20 +97,26 @@ def test_test_not_in_venv(mocker: MockerFixture, capsys):
 
 def test_run_script(mocker: MockerFixture, capsys, script_path):
     assert _should_run_test_script()
-    mocker.patch("fast_dev_cli.cli._should_run_test_script", return_value=script_path)
+    mocker.patch(
+        "fast_dev_cli.commands.test._should_run_test_script", return_value=script_path
+    )
     unitcase(dry=True)
     assert TEST_SCRIPT in capsys.readouterr().out
     assert _should_run_test_script(pathlib.Path("not-exist")) is None
 
 
 def test_ignore_script(mocker: MockerFixture, capsys, script_path):
-    mocker.patch("fast_dev_cli.cli._should_run_test_script", return_value=script_path)
+    mocker.patch(
+        "fast_dev_cli.commands.test._should_run_test_script", return_value=script_path
+    )
     unitcase(dry=True, ignore_script=True)
     assert TEST_SCRIPT not in capsys.readouterr().out
 
 
 def test_run_script_in_sub_directory(mocker: MockerFixture, capsys, script_path):
-    mocker.patch("fast_dev_cli.cli._should_run_test_script", return_value=script_path)
+    mocker.patch(
+        "fast_dev_cli.commands.test._should_run_test_script", return_value=script_path
+    )
     mocker.patch("pathlib.Path.cwd", return_value=script_path.parent)
     unitcase(dry=True)
     out = capsys.readouterr().out
@@ -104,7 +127,9 @@ def test_run_script_quotes_project_root(mocker: MockerFixture, capsys, tmp_path)
     root = tmp_path / "project with spaces"
     script = root / TEST_SCRIPT
     mocker.patch("fast_dev_cli.cli.Project.get_work_dir", return_value=root)
-    mocker.patch("fast_dev_cli.cli._should_run_test_script", return_value=script)
+    mocker.patch(
+        "fast_dev_cli.commands.test._should_run_test_script", return_value=script
+    )
     mocker.patch("pathlib.Path.cwd", return_value=root / "subdir")
     unitcase(dry=True)
     expected = f"cd {_quote_shell_arg(root)} && python {TEST_SCRIPT}"
@@ -118,10 +143,171 @@ def test_fast_test(mocker, capsys):
         and 'coverage report --omit="tests/*" -m' in output
     )
 
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
-    mocker.patch("fast_dev_cli.cli._should_run_test_script", return_value=None)
+    mocker.patch("fast_dev_cli.commands.test.is_venv", return_value=True)
+    mocker.patch(
+        "fast_dev_cli.commands.test._should_run_test_script", return_value=None
+    )
     coverage_test(dry=True)
     assert (
         'coverage run -m pytest -s && coverage report --omit="tests/*" -m'
         in capsys.readouterr().out
     )
+
+
+def test_parse_workers(mocker):
+    mocker.patch("os.cpu_count", return_value=8)
+    assert parse_workers(None) == parse_workers("") == 0
+    assert parse_workers("auto") == 8
+    assert parse_workers("3") == 3
+    for value in ("x", "-1"):
+        with pytest.raises(typer.BadParameter):
+            parse_workers(value)
+
+
+def test_shard_tests(tmp_work_dir: pathlib.Path):
+    tests = tmp_work_dir / "tests"
+    (tests / "sub").mkdir(parents=True)
+    (tests / ".venv").mkdir()
+    for name, size in (("test_a.py", 30), ("test_b.py", 20), ("sub/c_test.py", 10)):
+        tests.joinpath(name).write_text("#" * size)
+    tests.joinpath("utils.py").touch()
+    tests.joinpath(".venv", "test_x.py").touch()
+    files = collect_test_files(tmp_work_dir)
+    assert files == ["tests/sub/c_test.py", "tests/test_a.py", "tests/test_b.py"]
+    assert collect_test_files(tmp_work_dir, ["tests/test_b.py"]) == ["tests/test_b.py"]
+    pathlib.Path("pyproject.toml").write_text(
+        '[tool.pytest.ini_options]\ntestpaths = ["tests/sub"]\n'
+    )
+    assert collect_test_files(tmp_work_dir) == ["tests/sub/c_test.py"]
+    sizes = {"tests/test_a.py": 30, "tests/test_b.py": 20, "tests/sub/c_test.py": 10}
+    assert shard_tests(files, 2, sizes) == [
+        ["tests/test_a.py"],
+        ["tests/test_b.py", "tests/sub/c_test.py"],
+    ]
+    assert len(shard_tests(files, 8, sizes)) == 3
+    assert shard_tests([], 2, sizes) == []
+    # Longest processing time first
+    weights = {"tests/test_a.py": 1, "tests/test_b.py": 5, "tests/sub/c_test.py": 3}
+    assert shard_tests(files, 2, weights) == [
+        ["tests/test_b.py"],
+        ["tests/sub/c_test.py", "tests/test_a.py"],
+    ]
+
+
+def test_parse_shard():
+    assert parse_shard(None) is None
+    assert parse_shard("2/4") == (2, 4)
+    for value in ("0/4", "5/4", "x", "1/x"):
+        with pytest.raises(typer.BadParameter):
+            parse_shard(value)
+
+
+JUNIT_XML = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" tests="3" time="3.5">
+<testcase classname="tests.test_a" name="test_x" file="tests/test_a.py" time="3.0"/>
+<testcase classname="tests.test_a" name="test_y" file="tests/test_a.py" time="0.4"/>
+<testcase classname="tests.test_a.TestA" name="test_x" file="tests/test_a.py" time="0.1"/>
+</testsuite></testsuites>
+"""
+
+
+def test_duration_db(tmp_work_dir: pathlib.Path, monkeypatch):
+    monkeypatch.delenv("FASTDEVCLI_CHECK_CACHE_DIR", raising=False)
+    pathlib.Path("tests").mkdir()
+    pathlib.Path("tests/test_a.py").write_text("#" * 10)
+    pathlib.Path("tests/test_b.py").write_text("#" * 20)
+    db = DurationDB(tmp_work_dir)
+    files = ["tests/test_a.py", "tests/test_b.py"]
+    assert db.estimate(files) is None
+    assert db.junit_args(1) == (
+        "--junitxml=.fast_cache/junit/shard-1.xml -o junit_family=xunit1"
+    )
+    db.junit_dir.mkdir(parents=True)
+    db.junit_file(0).write_text(JUNIT_XML)
+    db.durations["tests/gone.py::test_z"] = 1
+    assert db.record(2) == [3.5, None]
+    assert DurationDB(tmp_work_dir).durations == {
+        "tests/test_a.py::test_x": 3.0,
+        "tests/test_a.py::test_y": 0.4,
+        "tests/test_a.py::TestA::test_x": 0.1,
+    }
+    assert pathlib.Path(".fast_cache/.gitignore").read_text() == "*\n"
+    # File without record is estimated by size
+    assert db.estimate(files) == pytest.approx(
+        {"tests/test_a.py": 3.5, "tests/test_b.py": 7.0}
+    )
+    # Report of last run is not read again
+    db.clear_reports(2)
+    assert db.record(2) == [None, None]
+    # Durations shared by all jobs of CI
+    monkeypatch.setenv("FASTDEVCLI_TEST_DURATIONS", "tests/durations.json")
+    db = DurationDB(tmp_work_dir)
+    assert db.durations == {} and db.junit_dir == tmp_work_dir / ".fast_cache/junit"
+    db.durations = {"tests/test_b.py::test_z": 1.0}
+    db.save()
+    assert json.loads(pathlib.Path("tests/durations.json").read_text()) == {
+        "tests/test_b.py::test_z": 1.0
+    }
+    assert not pathlib.Path("tests/.gitignore").exists()
+
+
+def test_sharded_test(tmp_work_dir: pathlib.Path, mocker: MockerFixture, capsys):
+    pathlib.Path("pyproject.toml").write_text('[project]\nname = "foo"\n')
+    pathlib.Path("tests").mkdir()
+    for name in ("test_a.py", "test_b.py"):
+        pathlib.Path("tests", name).touch()
+    mocker.patch("fast_dev_cli.commands.test._coverage_prefix", return_value="")
+    mocker.patch("fast_dev_cli.commands.test._has_xdist", return_value=False)
+    sharded_test(2, dry=True)
+    out = capsys.readouterr().out
+    assert "--> coverage erase" in out
+    junit = "--junitxml=.fast_cache/junit/shard-{} -o junit_family=xunit1"
+    run = "--> coverage run --parallel-mode -m pytest -s " + junit
+    assert run.format("0.xml") + " tests/test_a.py\n" in out
+    assert run.format("1.xml") + " tests/test_b.py\n" in out
+    assert '--> coverage combine && coverage report --omit="tests/*" -m' in out
+    unitcase(dry=True, shard=(2, 2))
+    out = capsys.readouterr().out
+    assert run.format("0.xml") + " tests/test_b.py\n" in out
+    assert "tests/test_a.py" not in out
+    unitcase(dry=True, shard=(3, 3))
+    assert "No test files in shard 3/3." in capsys.readouterr().out
+    mocker.patch("fast_dev_cli.commands.test._has_xdist", return_value=True)
+    unitcase(dry=True, workers=4)
+    assert (
+        "--> pytest -n 4 --cov --cov-report= "
+        + junit.format("0.xml")
+        + ' && coverage report --omit="tests/*" -m'
+    ) in capsys.readouterr().out
+
+
+def test_shard_by_shared_durations(
+    tmp_work_dir: pathlib.Path, mocker: MockerFixture, capsys
+):
+    pathlib.Path("pyproject.toml").write_text('[project]\nname = "foo"\n')
+    pathlib.Path("tests").mkdir()
+    files = [f"tests/test_{i}.py" for i in "abcdef"]
+    for i, name in enumerate(files):
+        pathlib.Path(name).write_text("#" * (i + 1) * 10)
+    mocker.patch("fast_dev_cli.commands.test._coverage_prefix", return_value="")
+    mocker.patch("fast_dev_cli.commands.test._has_xdist", return_value=False)
+    db = DurationDB(tmp_work_dir)
+    # The same durations file restored for every CI job
+    db.durations = {f"{f}::test_x": 1.0 for f in files}
+    db.durations["tests/test_a.py::test_x"] = 9.0
+    db.save()
+    runs: list[list[str]] = []
+    for index in (1, 2):
+        unitcase(dry=True, shard=(index, 2))
+        runs.append(
+            [
+                i
+                for line in capsys.readouterr().out.splitlines()
+                if line.startswith("--> coverage run ")
+                for i in line.split()
+                if i.startswith("tests/")
+            ]
+        )
+    # Balanced by durations instead of file sizes
+    assert runs[0] == ["tests/test_a.py"]
+    assert sorted(runs[0] + runs[1]) == files
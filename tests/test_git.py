@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from fast_dev_cli.cli import (
+    GitQuery,
+    ShellCommandError,
+    capture_cmd_output,
+    run_and_echo,
+)
+
+
+def test_git_query(tmp_work_dir: Path, mocker) -> None:
+    git = GitQuery()
+    with pytest.raises(ShellCommandError):
+        git.last_commit_subject()
+    run_and_echo("git init")
+    run_and_echo("git config user.name xxx")
+    run_and_echo("git config user.email xxx@a.com")
+    # Failure is cached as well
+    with pytest.raises(ShellCommandError):
+        git.last_commit_subject()
+    git.clear()
+    Path("a.txt").write_text("a")
+    run_and_echo('git add . && git commit -m "📝 init"')
+    run_and_echo("git tag 0.1.0 && git tag dev")
+    spy = mocker.patch("fast_dev_cli.git.capture_cmd_output", wraps=capture_cmd_output)
+    git.prefetch(GitQuery.STATUS, GitQuery.V_TAG, GitQuery.LAST_SUBJECT)
+    assert spy.call_count == 3
+    assert git.changes() == []
+    assert git.ahead() == 0
+    assert git.has_v_prefix() is False
+    assert git.last_commit_subject() == "📝 init"
+    git.prefetch(GitQuery.STATUS, GitQuery.V_TAG)
+    assert spy.call_count == 3
+    Path("a.txt").write_text("b")
+    Path("b.txt").touch()
+    run_and_echo("git tag v0.2.0")
+    assert git.changes() == []  # Cached
+    git.clear()
+    assert [i.split()[-1] for i in git.changes()] == ["a.txt", "b.txt"]
+    assert [i.split()[-1] for i in git.changes(untracked=False)] == ["a.txt"]
+    assert git.has_v_prefix() is True
@@ -1,3 +1,6 @@
+import ast
+from pathlib import Path
+
 from asynctor import Shell
 
 
@@ -5,3 +8,46 @@ def test_help():
     out = Shell("fast").capture_output()
     out_help = Shell("fast --help").capture_output()
     assert out.strip() == out_help.strip()
+
+
+def test_version_without_typer():
+    code = (
+        "import sys;sys.argv=['fast', '-V'];"
+        "from fast_dev_cli.cli import main;main();"
+        "print('typer' in sys.modules)"
+    )
+    out = Shell(["python", "-c", code]).capture_output()
+    assert out.splitlines()[-1] == "False"
+
+
+def test_lazy_load_command():
+    code = (
+        "import sys;sys.argv=['fast', 'exec', 'echo 1'];"
+        "from fast_dev_cli.cli import main\n"
+        "try:\n main()\nexcept SystemExit: pass\n"
+        "print(sorted(i for i in sys.modules if i.startswith('fast_dev_cli.')))"
+    )
+    out = Shell(["python", "-c", code]).capture_output()
+    loaded = out.splitlines()[-1]
+    assert "fast_dev_cli.commands.exec" in loaded
+    assert "fast_dev_cli.commands.lint" not in loaded
+    assert "fast_dev_cli.project" not in loaded
+
+
+def test_type_checking_exports():
+    from fast_dev_cli import cli
+
+    tree = ast.parse(Path(cli.__file__).read_text("utf-8"))
+    block = next(
+        i
+        for i in tree.body
+        if isinstance(i, ast.If) and ast.unparse(i.test) == "TYPE_CHECKING"
+    )
+    exported = {
+        (node.module, alias.name)
+        for node in block.body
+        if isinstance(node, ast.ImportFrom)
+        for alias in node.names
+    }
+    expected = {(m, i) for m, names in cli._MODULE_ATTRS.items() for i in names}
+    assert exported == expected
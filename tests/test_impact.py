@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from fast_dev_cli.cli import TOML_FILE, ImpactMap, get_changed_lines, run_and_echo
+from fast_dev_cli.cli import test as unitcase
+
+SOURCE = "X = 1\n\n\ndef f(x):\n    return x + X\n\n\ndef g(x):\n    return x * 2\n"
+
+
+@pytest.fixture
+def git_project(tmp_work_dir: Path) -> Path:
+    Path(TOML_FILE).write_text('[project]\nname = "pkg"\n')
+    Path("pkg").mkdir()
+    Path("pkg/__init__.py").write_text(SOURCE)
+    Path("tests").mkdir()
+    Path("tests/test_f.py").write_text("def test_f(): ...\n")
+    run_and_echo("git init")
+    run_and_echo("git config user.name xxx")
+    run_and_echo("git config user.email xxx@a.com")
+    run_and_echo("git add . && git commit -m init")
+    return tmp_work_dir
+
+
+def test_changed_lines(git_project: Path) -> None:
+    assert get_changed_lines("HEAD") == {}
+    Path("pkg/__init__.py").write_text(SOURCE.replace("x * 2", "x + x") + "Y = 2\n")
+    Path("tests/test_f.py").unlink()
+    Path("tests/test_g.py").touch()
+    assert get_changed_lines("HEAD") == {
+        "pkg/__init__.py": {9},
+        "tests/test_f.py": {1},
+        "tests/test_g.py": None,
+    }
+    run_and_echo("git add . && git commit -m 2")
+    assert get_changed_lines("HEAD~1")["tests/test_g.py"] is None
+
+
+def _write_coverage_data(path: Path, root: Path) -> None:
+    with sqlite3.connect(path) as conn:
+        conn.executescript(
+            "CREATE TABLE file (id INTEGER PRIMARY KEY, path TEXT);"
+            "CREATE TABLE context (id INTEGER PRIMARY KEY, context TEXT);"
+            "CREATE TABLE line_bits (file_id INTEGER, context_id INTEGER, numbits);"
+            "CREATE TABLE arc (file_id, context_id, fromno, tono);"
+        )
+        conn.execute("INSERT INTO file VALUES (1, ?)", (str(root / "pkg/__init__.py"),))
+        conn.executemany(
+            "INSERT INTO context VALUES (?, ?)",
+            [(1, ""), (2, "ci|test_f.test_f"), (3, "tests.test_g.TestG.test_g")],
+        )
+        conn.executemany(
+            "INSERT INTO line_bits VALUES (1, ?, ?)",
+            [(1, bytes([0b10010, 0b1])), (2, bytes([0b100000]))],
+        )
+        conn.execute("INSERT INTO arc VALUES (1, 3, -8, 9)")
+
+
+def test_impact_map(git_project: Path, monkeypatch) -> None:
+    monkeypatch.delenv("FASTDEVCLI_CHECK_CACHE_DIR", raising=False)
+    impact = ImpactMap(git_project)
+    impact.write_rc_file()
+    text = impact.rc_file.read_text()
+    assert text.endswith('[tool.coverage.run]\ndynamic_context = "test_function"\n')
+    test_files = ["tests/test_f.py", "tests/test_g.py"]
+    _write_coverage_data(impact.data_file, git_project)
+    data = impact.build(test_files, "abc")
+    assert (
+        data
+        == impact.load()
+        == {
+            "commit": "abc",
+            "tests": {
+                "": {"pkg/__init__.py": [1, 4, 8]},
+                "tests/test_f.py::test_f": {"pkg/__init__.py": [5]},
+                "tests/test_g.py::TestG::test_g": {"pkg/__init__.py": [9]},
+            },
+        }
+    )
+    assert impact.select(data, {}, test_files) == []
+    assert impact.select(data, {"pkg/__init__.py": {9, 10}}, test_files) == [
+        "tests/test_g.py::TestG::test_g"
+    ]
+    # Module level code changed
+    assert impact.select(data, {"pkg/__init__.py": {1}}, test_files) == [
+        "tests/test_f.py::test_f",
+        "tests/test_g.py::TestG::test_g",
+    ]
+    changed: dict[str, set[int] | None] = {
+        "tests/test_g.py": {1},
+        "pkg/__init__.py": {9},
+    }
+    assert impact.select(data, changed, test_files) == ["tests/test_g.py"]
+    assert impact.select(data, {"README.md": None}, test_files) == []
+    for name in ("tests/conftest.py", TOML_FILE, "tests/utils.py"):
+        assert impact.select(data, {name: {1}}, test_files) is None
+
+
+def test_affected(git_project: Path, mocker, capsys) -> None:
+    mocker.patch("fast_dev_cli.commands.test._coverage_prefix", return_value="")
+    unitcase(dry=True, affected=True)
+    out = capsys.readouterr().out
+    assert "Run all tests to record" in out
+    assert "--parallel-mode -m pytest -s && coverage combine" in out
+    impact = ImpactMap(git_project)
+    impact.path.parent.mkdir(parents=True, exist_ok=True)
+    head = impact.head_commit()
+    data = {"commit": head, "tests": {"tests/test_f.py::test_f": {"pkg/a.py": [1]}}}
+    impact.path.write_text(json.dumps(data))
+    unitcase(dry=True, affected=True)
+    assert "No tests affected by the changes since" in capsys.readouterr().out
+    Path("pkg/a.py").write_text("a = 2\n")
+    run_and_echo("git add . && git commit -m 2")
+    unitcase(dry=True, affected=True)
+    out = capsys.readouterr().out
+    assert "Run 1 tests affected by the changes since" in out
+    assert "coverage run -m pytest -s tests/test_f.py::test_f && " in out
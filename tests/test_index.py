@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from fast_dev_cli.cli import IndexCache
+from fast_dev_cli.index import (
+    PackageIndex,
+    allows_python,
+    file_version,
+    normalize,
+    parse_html,
+    version_key,
+)
+
+
+def test_version_helpers() -> None:
+    assert normalize("Typing_Extensions") == "typing-extensions"
+    assert version_key("1.10.0") > version_key("1.9.2")  # type:ignore[operator]
+    assert version_key("1.0.post1") > version_key("1.0")  # type:ignore[operator]
+    assert version_key("2.0.0rc1") is None
+    assert file_version("fast_dev_cli-0.25.5-py3-none-any.whl") == "0.25.5"
+    assert file_version("fast-dev-cli-0.25.5.tar.gz") == "0.25.5"
+    assert file_version("fast_dev_cli-0.25.5.dist-info") is None
+
+
+def test_stable_versions() -> None:
+    page = """<html><body>
+    <a href="../a-1.0.tar.gz#sha256=x">a-1.0.tar.gz</a>
+    <a href="../a-1.1-py3-none-any.whl" data-yanked="">a-1.1-py3-none-any.whl</a>
+    <a href="../a-1.2b1.tar.gz">a-1.2b1.tar.gz</a>
+    <a href="../a-1.0.1-py3-none-any.whl">a-1.0.1-py3-none-any.whl</a>
+    </body></html>"""
+    detail = parse_html(page)
+    assert PackageIndex.stable_versions(detail) == ["1.0", "1.0.1"]
+    detail = {
+        "versions": ["1.0", "1.1", "1.2b1"],
+        "files": [{"filename": "a-1.1.tar.gz", "yanked": "broken"}],
+    }
+    assert PackageIndex.stable_versions(detail) == ["1.0"]
+
+
+def test_requires_python(mocker) -> None:
+    assert allows_python(">=3.10", (3, 10))
+    assert not allows_python(">=3.11", (3, 10))
+    assert allows_python("!=3.0.*,>=2.7", (3, 10))
+    assert not allows_python("~=3.8.0", (3, 10))
+    assert allows_python("", (3, 10)) and allows_python("unknown", (3, 10))
+    pages = {
+        "a": """
+        <a href="x" data-requires-python="&gt;=3.10">a-2.2.6.tar.gz</a>
+        <a href="x" data-requires-python="&gt;=3.11">a-2.3.0-cp311-none-any.whl</a>
+        """,
+        "b": '<a href="x">b-1.0.tar.gz</a>',
+    }
+    assert PackageIndex.requires_python(parse_html(pages["a"])) == {
+        "2.2.6": [">=3.10"],
+        "2.3.0": [">=3.11"],
+    }
+    mocker.patch.object(
+        PackageIndex, "fetch", lambda self, name: parse_html(pages[name])
+    )
+    index = PackageIndex("https://example.com/requires-python/")
+    assert index.latest_version("a") == "2.3.0"
+    assert index.latest_version("a", (3, 10)) == "2.2.6"
+    assert index.latest_version("a", (3, 9)) is None
+    # Files without requires-python support all versions
+    assert index.latest_versions(["b"], (3, 9)) == {"b": "1.0"}
+    # Entries cached before requires-python was recorded are fetched again
+    path = index.cache.directory / "a.json"
+    path.write_text(json.dumps({"name": "a", "versions": ["2.2.6", "2.3.0"]}))
+    assert index.cache.get("a") is None
+    assert index.cache.get("a", offline=True) == (["2.2.6", "2.3.0"], {})
+
+
+def test_latest_versions(mocker) -> None:
+    def fetch(self, name):
+        if name == "missing":
+            raise OSError("404")
+        return {"versions": ["0.1", "0.10", "0.9"]}
+
+    mocker.patch.object(PackageIndex, "fetch", fetch)
+    index = PackageIndex("https://example.com/simple")
+    assert index.url == "https://example.com/simple/"
+    assert index.latest_versions(["a", "missing", "a"]) == {"a": "0.10"}
+
+
+def test_local_index(tmp_path: Path) -> None:
+    (project := tmp_path / "simple" / "typing-extensions").mkdir(parents=True)
+    project.joinpath("index.json").write_text(
+        json.dumps({"versions": ["4.0.0", "4.12.2", "5.0.0a1"], "files": []})
+    )
+    (project := tmp_path / "simple" / "ruff").mkdir()
+    project.joinpath("index.html").write_text(
+        '<a href="x">ruff-0.4.4.tar.gz</a><a href="x">ruff-0.5.0.tar.gz</a>'
+    )
+    index = PackageIndex(str(tmp_path / "simple"))
+    assert index.local is not None
+    assert index.latest_versions(["typing_extensions", "ruff", "missing"]) == {
+        "typing_extensions": "4.12.2",
+        "ruff": "0.5.0",
+    }
+    stand_in = tmp_path / "versions.json"
+    stand_in.write_text(json.dumps({"Typer": ["0.12.3", "0.12.5"]}))
+    index = PackageIndex(stand_in.as_uri())
+    assert index.latest_version("typer") == "0.12.5"
+
+
+def test_index_cache(mocker, monkeypatch) -> None:
+    fetch = mocker.patch.object(
+        PackageIndex, "fetch", return_value={"versions": ["1.0", "1.1"]}
+    )
+    index = PackageIndex("https://example.com/simple/")
+    index.cache.clear()
+    assert index.latest_versions(["a", "b"]) == {"a": "1.1", "b": "1.1"}
+    assert fetch.call_count == 2
+    assert PackageIndex("https://example.com/simple").latest_version("a") == "1.1"
+    assert IndexCache.count() == 2
+    assert fetch.call_count == 2
+    # Expired entries are fetched again, but still readable offline
+    monkeypatch.setenv("FASTDEVCLI_INDEX_TTL", "0")
+    index = PackageIndex("https://example.com/simple")
+    path = index.cache.directory / "a.json"
+    os.utime(path, (time.time() - 10, time.time() - 10))
+    assert PackageIndex("https://example.com/simple", offline=True).versions("a")
+    assert fetch.call_count == 2
+    assert index.versions("a") == ["1.0", "1.1"]
+    assert fetch.call_count == 3
+    with pytest.raises(FileNotFoundError):
+        PackageIndex("https://example.com/simple", offline=True).versions("c")
+    # The least recently fetched ones are evicted
+    index.cache.max_entries = 1
+    assert index.cache.evict() == 1
+    assert [p.stem for p in index.cache.directory.glob("*.json")] == ["a"]
+    assert IndexCache.clear() == 1
+    assert IndexCache.count() == 0
+
+
+def test_connection_pool(mocker) -> None:
+    clients: set[int] = set()
+    flaky: list[int] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            clients.add(self.client_address[1])
+            if self.path == "/simple/flaky/" and not flaky:
+                # Broken response of a kept alive connection
+                flaky.append(1)
+                self.wfile.write(b"garbage\r\n\r\n")
+                self.close_connection = True
+                return
+            if self.path == "/simple/flaky/":
+                self.path = "/simple/a/"
+            if self.path == "/old/a/":
+                self.send_response(301)
+                self.send_header("Location", "/simple/a/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if self.path != "/simple/a/":
+                self.send_error(404)
+                return
+            body = json.dumps({"versions": ["0.1", "0.2"]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/vnd.pypi.simple.v1+json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    mocker.patch("urllib.request.getproxies", return_value={})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        index = PackageIndex(f"http://127.0.0.1:{server.server_port}/simple")
+        for _ in range(3):
+            assert index.fetch("a") == {"versions": ["0.1", "0.2"]}
+        with pytest.raises(OSError, match="HTTP 404"):
+            index.fetch("b")
+        # Connection is rebuilt after a bad response
+        assert index.fetch("flaky") == {"versions": ["0.1", "0.2"]}
+        assert index._pool is not None
+        assert index.latest_versions(["a"]) == {"a": "0.2"}
+        # Connections of the threads are closed with the executor
+        assert index._pool._opened == []
+        index = PackageIndex(f"http://127.0.0.1:{server.server_port}/old")
+        assert index.fetch("a") == {"versions": ["0.1", "0.2"]}
+    finally:
+        server.shutdown()
+        server.server_close()
+    # Connection is reused by the requests of same thread, new ones are only
+    # opened after 404 and the garbage closed them, by the executor thread and
+    # by the second index
+    assert len(clients) == 5
+
+
+def test_skip_bad_response(mocker) -> None:
+    def fetch(self, name):
+        if name == "bad":
+            raise http.client.IncompleteRead(b"")
+        return {"versions": ["1.0"]}
+
+    mocker.patch("fast_dev_cli.index.PackageIndex.fetch", fetch)
+    warn = mocker.patch("fast_dev_cli.index.yellow_warn")
+    index = PackageIndex("https://example.com/simple", offline=False)
+    assert index.latest_versions(["good", "bad"]) == {"good": "1.0"}
+    assert "Failed to get versions of bad" in warn.call_args[0][0]
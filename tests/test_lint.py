@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 import platform
 import re
 import shlex
@@ -7,17 +8,22 @@ import shutil
 from pathlib import Path
 
 import pytest
+from typer import Exit
 
 from fast_dev_cli.cli import (
     TOML_FILE,
+    DmypyDaemon,
     LintCode,
     Project,
+    ToolRegistry,
     capture_cmd_output,
+    get_changed_files,
     is_windows,
     lint,
     make_style,
     only_check,
     run_and_echo,
+    run_parallel,
 )
 
 from .utils import capture_stdout, chdir, mock_sys_argv
@@ -78,9 +84,12 @@ def test_check(mock_no_dmypy, monkeypatch, mocker):
     command = capture_cmd_output("fast check --dry")
     for cmd in CHECK_CMD.split(SEP):
         assert cmd in command
+    # Checks are independent of each other, so the plan is printed
+    assert "Plan:" in command and "(after" not in command
     command2 = capture_cmd_output("fast check --bandit --dry")
     bandit_check = "bandit -c pyproject.toml -r ."
-    assert command2 == command + " && " + BIN_DIR + bandit_check
+    first_line = command.splitlines()[0]
+    assert command2.splitlines()[0] == first_line + " && " + BIN_DIR + bandit_check
     monkeypatch.setenv("FASTDEVCLI_BANDIT", "1")
     command3 = capture_cmd_output("fast check --dry")
     assert command3 == command2
@@ -164,7 +173,7 @@ def test_check_bandit(tmp_path):
 def test_check_skip_mypy(mock_skip_mypy_0, mocker):
     cmd = "fast check --skip-mypy --dry"
     cmd2 = "fast lint --check-only --skip-mypy --dry"
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=True)
     command = capture_cmd_output(cmd)
     command2 = capture_cmd_output(cmd2)
     expected = "--> " + SEP.join(
@@ -172,7 +181,7 @@ def test_check_skip_mypy(mock_skip_mypy_0, mocker):
             lambda i: not i.strip().split()[0].endswith("mypy"), CHECK_CMD.split(SEP)
         )
     )
-    assert command == command2 == expected
+    assert command.splitlines()[0] == command2.splitlines()[0] == expected
 
 
 def test_fast_check():
@@ -239,6 +248,51 @@ def test_lint_quotes_paths(mocker):
         assert shlex.split(segment)[-2:] == paths
 
 
+def test_group_commands():
+    commands = ["ruff format .", "ruff check --fix .", "mypy .", "bandit -r src"]
+    assert LintCode.group_commands(commands, check_only=True) == commands
+    assert LintCode.group_commands(commands) == [
+        "ruff format . && ruff check --fix .",
+        "mypy .",
+        "bandit -r src",
+    ]
+    commands = [".venv/bin/ruff format .", ".venv/bin/ruff check .", "pdm run mypy ."]
+    assert LintCode.group_commands(commands) == [SEP.join(commands[:2]), commands[2]]
+    assert LintCode.group_commands(["prettier -w a.html"]) == ["prettier -w a.html"]
+
+
+def test_to_plan():
+    commands = ["ruff format .", "ruff check --fix .", "mypy .", "bandit -r src"]
+    assert LintCode.to_plan(commands, check_only=True).waves() == [[0, 1, 2, 3]]
+    plan = LintCode.to_plan(commands)
+    assert plan.waves() == [[0, 2, 3], [1]]
+    assert str(plan) == SEP.join(commands)
+    assert LintCode.to_plan(["prettier -w a.html"]).is_linear()
+
+
+def test_lint_parallel(mocker, mock_no_dmypy, mock_skip_mypy_0):
+    mocker.patch.object(LintCode, "check_lint_tool_installed", return_value=True)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=True)
+    mocker.patch.object(LintCode, "missing_mypy_exec", return_value=False)
+    with capture_stdout() as stream:
+        only_check(dry=True, parallel=True)
+    assert stream.getvalue().splitlines() == [f"--> {i}" for i in CHECK_CMD.split(SEP)]
+    with capture_stdout() as stream:
+        make_style(["."], dry=True, parallel=True)
+    lines = stream.getvalue().splitlines()
+    assert lines == ["--> " + LINT_CMD.rsplit(SEP, 1)[0], "--> mypy ."]
+
+
+def test_run_parallel(capsys):
+    assert run_parallel(["echo hello", "echo world && exit 3", "exit 1"]) == [0, 3, 1]
+    out = capsys.readouterr().out
+    assert re.search(r"==> echo hello \(exit code: 0, [\d.]+s\)\nhello\n", out)
+    assert re.search(r"==> echo world && exit 3 \(exit code: 3, .*\)\nworld\n", out)
+    assert out.index("hello") < out.index("world") < out.index("exit 1 (")
+    assert run_parallel(["exit 1"], dry=True) == [0]
+    assert capsys.readouterr().out == "--> exit 1\n"
+
+
 def test_with_dmypy():
     cmd = "fast lint --dmypy --dry ."
     assert "dmypy run ." in capture_cmd_output(cmd)
@@ -249,6 +303,62 @@ def test_with_dmypy():
     assert "dmypy run ." not in command
 
 
+def test_dmypy_with_paths():
+    command = LintCode.to_cmd("a.py", use_dmypy=True, mypy_strict=True)
+    assert command.endswith("dmypy run -- --strict a.py")
+    daemon = DmypyDaemon.from_command(command.split(SEP)[-1])
+    assert daemon is not None
+    assert daemon.flags == ["--strict"]
+    assert daemon.paths == ["a.py"]
+    assert daemon.check_command().endswith("check a.py")
+    assert DmypyDaemon.from_command("mypy .") is None
+
+
+def test_dmypy_daemon(tmp_work_dir, mocker):
+    Path(TOML_FILE).write_text("[tool.mypy]")
+    run = mocker.patch("fast_dev_cli.daemon.run_and_echo", return_value=0)
+    mocker.patch.object(DmypyDaemon, "is_running", return_value=False)
+    daemon = DmypyDaemon(["dmypy"], ["--strict"], ["."])
+    assert daemon.ensure() is False
+    assert "start --timeout 3600 -- --strict" in run.call_args[0][0]
+    assert daemon.load_state()["flags"] == ["--strict"]
+    mocker.patch.object(DmypyDaemon, "is_running", return_value=True)
+    run.reset_mock()
+    assert daemon.run() == 0
+    run.assert_called_once_with(daemon.check_command())
+    # Restart when config changed
+    Path(TOML_FILE).write_text("[tool.mypy]\nstrict = true")
+    assert daemon.ensure() is False
+    commands = [i[0][0] for i in run.call_args_list[1:]]
+    assert commands[0].endswith("stop")
+    assert "start" in commands[1]
+    assert daemon.ensure() is True
+
+
+@pytest.mark.skipif(is_windows(), reason="Layout of venv is different")
+def test_dmypy_venv_changed(tmp_work_dir, monkeypatch):
+    monkeypatch.delenv("VIRTUAL_ENV", raising=False)
+    Path(TOML_FILE).write_text("[tool.mypy]")
+    site = Path(".venv/lib/python3.11/site-packages")
+    site.mkdir(parents=True)
+    Path("python3.11").touch()
+    Path("python3.12").touch()
+    Path(".venv/bin").mkdir()
+    Path(".venv/bin/python").symlink_to(Path("python3.11").resolve())
+    (dist := site / "mypy-1.10.0.dist-info").mkdir()
+    # dmypy of `pdm run` is resolved to the project venv instead of pdm
+    daemon = DmypyDaemon(["pdm", "run", "dmypy"])
+    assert daemon.interpreter() == tmp_work_dir / ".venv/bin/python"
+    config = daemon.config_hash()
+    assert daemon.config_hash() == config
+    dist.rename(site / "mypy-1.11.0.dist-info")
+    assert daemon.config_hash() != config
+    config = daemon.config_hash()
+    Path(".venv/bin/python").unlink()
+    Path(".venv/bin/python").symlink_to(Path("python3.12").resolve())
+    assert daemon.config_hash() != config
+
+
 def test_dmypy_run(monkeypatch):
     command = capture_cmd_output("python -m fast_dev_cli lint --dry .")
     assert "dmypy run ." not in command
@@ -260,7 +370,7 @@ def test_dmypy_run(monkeypatch):
 
 
 def test_lint_with_prefix(mocker):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=False)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=False)
     with capture_stdout() as stream:
         make_style(["."], check_only=False, dry=True, prefix=True)
     prefix = "uv run" if platform.system() == "Windows" else ".venv/bin/mypy"
@@ -277,14 +387,17 @@ def test_lint_auto_suffix(tmp_work_dir):
 
 def test_fast_lint_with_uv():
     command = capture_cmd_output("fast lint --tool=uv --prefix --dry")
-    assert (
-        command
-        == "--> ruff format . && ruff check --extend-select=I,B,SIM --fix . && .venv/bin/mypy ."
-    )
+    assert command.splitlines() == [
+        "--> ruff format . && ruff check --extend-select=I,B,SIM --fix . && .venv/bin/mypy .",
+        "Plan:",
+        "  [1] ruff format .",
+        "  [2] ruff check --extend-select=I,B,SIM --fix .  (after 1)",
+        "  [3] .venv/bin/mypy .",
+    ]
 
 
 def test_make_style(mock_skip_mypy_0, mocker, mock_no_dmypy):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=True)
     expected = LINT_CMD
     check_expected = CHECK_CMD
     if shutil.which("mypy") is None:
@@ -309,7 +422,7 @@ def test_make_style(mock_skip_mypy_0, mocker, mock_no_dmypy):
 
 
 def test_lint_class(mocker, mock_no_dmypy):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=True)
     expected = LINT_CMD
     check_expected = CHECK_CMD
     if shutil.which("mypy") is None:
@@ -324,7 +437,7 @@ def test_lint_class(mocker, mock_no_dmypy):
 
 
 def test_lint_func(mocker, mock_no_dmypy, mock_ty_0):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=True)
     expected = LINT_CMD
     if shutil.which("mypy") is None:
         prefix = "uv run " if platform.system() == "Windows" else ".venv/bin/"
@@ -344,7 +457,7 @@ def test_lint_func(mocker, mock_no_dmypy, mock_ty_0):
 
 
 def test_lint_without_ruff_installed(mocker, mock_no_dmypy):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=True)
     mocker.patch(
         "fast_dev_cli.cli.LintCode.check_lint_tool_installed", return_value=False
     )
@@ -359,7 +472,7 @@ def test_lint_without_ruff_installed(mocker, mock_no_dmypy):
 
 
 def test_lint_without_mypy_installed(mocker, mock_no_dmypy):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=True)
     mocker.patch("fast_dev_cli.cli.LintCode.missing_mypy_exec", return_value=True)
     with capture_stdout() as stream:
         lint(".", dry=True)
@@ -372,7 +485,7 @@ def test_lint_without_mypy_installed(mocker, mock_no_dmypy):
 
 
 def test_no_fix(mock_no_fix, mocker, mock_no_dmypy):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=True)
     expected = LINT_CMD.replace(" --fix", "")
     if shutil.which("mypy") is None:
         prefix = "uv run " if platform.system() == "Windows" else ".venv/bin/"
@@ -381,13 +494,13 @@ def test_no_fix(mock_no_fix, mocker, mock_no_dmypy):
 
 
 def test_skip_mypy(mock_skip_mypy, mocker):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=True)
     cmds = LINT_CMD.split(SEP)
     assert LintCode(".").gen() == SEP.join(i for i in cmds if not i.startswith("mypy"))
 
 
 def test_skip_mypy_option(mock_skip_mypy_0, mocker):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=True)
     cmds = LINT_CMD.split(SEP)
     assert LintCode(".", skip_mypy=True).gen() == SEP.join(
         i for i in cmds if not i.startswith("mypy")
@@ -395,7 +508,7 @@ def test_skip_mypy_option(mock_skip_mypy_0, mocker):
 
 
 def test_skip_mypy_fast_lint(mock_skip_mypy_0, mocker):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=True)
     command = capture_cmd_output("fast lint --skip-mypy --dry")
     cmds = LINT_CMD.split(SEP)
     assert command.replace("--> ", "") == SEP.join(
@@ -404,7 +517,7 @@ def test_skip_mypy_fast_lint(mock_skip_mypy_0, mocker):
 
 
 def test_skip_mypy_0(mock_skip_mypy_0, mocker, mock_no_dmypy):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=True)
     expected = LINT_CMD
     if shutil.which("mypy") is None:
         prefix = "uv run " if platform.system() == "Windows" else ".venv/bin/"
@@ -413,7 +526,7 @@ def test_skip_mypy_0(mock_skip_mypy_0, mocker, mock_no_dmypy):
 
 
 def test_ignore_missing_imports(mock_ignore_missing_imports, mocker, mock_no_dmypy):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=True)
     expected = LINT_CMD.replace("mypy ", "mypy --ignore-missing-imports ")
     if shutil.which("mypy") is None:
         prefix = "uv run " if platform.system() == "Windows" else ".venv/bin/"
@@ -422,7 +535,7 @@ def test_ignore_missing_imports(mock_ignore_missing_imports, mocker, mock_no_dmy
 
 
 def test_ignore_missing_imports_0(mock_ignore_missing_imports_0, mocker, mock_no_dmypy):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=True)
     expected = LINT_CMD
     if shutil.which("mypy") is None:
         prefix = "uv run " if platform.system() == "Windows" else ".venv/bin/"
@@ -431,7 +544,7 @@ def test_ignore_missing_imports_0(mock_ignore_missing_imports_0, mocker, mock_no
 
 
 def test_not_in_root(mocker, mock_no_dmypy, mock_ty_0):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=True)
     root = Path(__file__).parent.parent
     expected = LINT_CMD
     if shutil.which("mypy") is None:
@@ -448,6 +561,112 @@ def test_not_in_root(mocker, mock_no_dmypy, mock_ty_0):
         assert cmd == expected
 
 
+def test_check_cache(tmp_work_dir, mocker, monkeypatch):
+    monkeypatch.setenv("FASTDEVCLI_NO_MYPY", "1")
+    mocker.patch.object(LintCode, "check_lint_tool_installed", return_value=True)
+    mocker.patch("fast_dev_cli.commands.lint.is_venv", return_value=True)
+    Path(TOML_FILE).write_text('[project]\nname = "foo"')
+    Path("a.py").write_text("a = 1\n")
+    Path(".venv").mkdir()
+    Path(".venv/b.py").write_text("b=2")
+    with capture_stdout() as stream:
+        only_check(cache=True)
+    assert "Check cache: 0 hit, 2 miss" in stream.getvalue()
+    results = list(Path(".fast_cache/check").iterdir())
+    assert len(results) == 2
+    with capture_stdout() as stream:
+        only_check(cache=True, parallel=True)
+    out = stream.getvalue()
+    assert "--> ruff format --check . (cached)" in out
+    assert "Check cache: 2 hit, 0 miss" in out
+    # Files in skipped directories are not inputs
+    Path(".venv/b.py").write_text("b = 3")
+    with capture_stdout() as stream:
+        only_check(cache=True)
+    assert "Check cache: 2 hit, 0 miss" in stream.getvalue()
+    # Upgraded dependencies or another interpreter may change the results
+    Path("uv.lock").write_text("version = 1\n")
+    with capture_stdout() as stream:
+        only_check(cache=True)
+    assert "Check cache: 0 hit, 2 miss" in stream.getvalue()
+    monkeypatch.setenv("VIRTUAL_ENV", str(tmp_work_dir / "other-venv"))
+    with capture_stdout() as stream:
+        only_check(cache=True)
+    assert "Check cache: 0 hit, 2 miss" in stream.getvalue()
+    # Failed result is not cached
+    Path("a.py").write_text("import os\n")
+    with capture_stdout() as stream, pytest.raises(SystemExit):
+        only_check(cache=True)
+    assert "Check cache: 0 hit, 2 miss" in stream.getvalue()
+    assert len(list(Path(".fast_cache/check").iterdir())) == 7
+    with capture_stdout() as stream, pytest.raises(SystemExit):
+        only_check(cache=True)
+    assert "Check cache: 1 hit, 1 miss" in stream.getvalue()
+
+
+@pytest.mark.skipif(is_windows(), reason="Shims of pyenv/asdf are shell scripts")
+def test_tool_version_behind_shim(tmp_work_dir, monkeypatch):
+    shim = Path("shims/ruff")
+    shim.parent.mkdir()
+    shim.write_text('#!/bin/sh\ncat "$(dirname "$0")/../version"\n')
+    shim.chmod(0o755)
+    Path("version").write_text("ruff 0.9.1")
+    monkeypatch.setenv(
+        "PATH", f"{shim.parent.resolve()}{os.pathsep}{os.environ['PATH']}"
+    )
+    ToolRegistry.clear()
+    try:
+        assert LintCode.get_tool_version("ruff check .").endswith(" 0.9.1")
+        # Upgraded behind the shim, which is not changed
+        Path("version").write_text("ruff 0.10.0")
+        assert LintCode.get_tool_version("ruff check .").endswith(" 0.10.0")
+    finally:
+        ToolRegistry.clear()
+
+
+@pytest.fixture
+def git_project(tmp_work_dir):
+    Path(TOML_FILE).write_text("[project]")
+    Path("src").mkdir()
+    for name in ("a.py", "src/b.py", "src/c.py"):
+        Path(name).write_text("x = 1")
+    run_and_echo("git init")
+    run_and_echo("git config user.name xxx")
+    run_and_echo("git config user.email xxx@a.com")
+    run_and_echo("git add . && git commit -m init")
+    return tmp_work_dir
+
+
+def test_changed_files(git_project, mocker):
+    assert get_changed_files() == []
+    Path("src/b.py").write_text("x = 2")
+    Path("d.py").touch()
+    Path("README.md").touch()
+    assert get_changed_files() == ["src/b.py", "d.py"]
+    run_and_echo("git add . && git commit -m 2")
+    assert get_changed_files() == []
+    assert (changed := get_changed_files("HEAD~1")) is not None
+    assert sorted(changed) == ["d.py", "src/b.py"]
+    with chdir("src"):
+        assert get_changed_files("HEAD~1") == ["b.py"]
+        Path("e.py").touch()
+        assert get_changed_files() == ["e.py"]
+        Path("e.py").unlink()
+    Path(TOML_FILE).write_text("[tool.ruff]")
+    assert get_changed_files() is None
+    with chdir("src"):
+        # Config of the parent directory is changed
+        assert get_changed_files() is None
+    run_and_echo("git checkout .")
+    mocker.patch.object(LintCode, "check_lint_tool_installed", return_value=True)
+    with capture_stdout() as stream:
+        make_style(["src"], since="HEAD~1", dry=True, skip_mypy=True)
+    assert "ruff format src/b.py && " in stream.getvalue()
+    with capture_stdout() as stream, pytest.raises(Exit):
+        only_check(changed=True, dry=True)
+    assert stream.getvalue().strip() == "No python file changed."
+
+
 def test_get_manage_tool(tmp_path):
     with chdir(tmp_path):
         try:
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import sys
+
+import pytest
+from typer import Exit
+
+from fast_dev_cli.cli import Plan, Shell, split_and
+
+
+def test_split_and() -> None:
+    assert split_and("a && b -m 'x && y' && c") == ["a", "b -m 'x && y'", "c"]
+    assert split_and('coverage report --omit="tests/*"') == [
+        'coverage report --omit="tests/*"'
+    ]
+    for command in ("a || b", "a | b", "a > f", "echo $HOME", "ls *.py", "a; b"):
+        assert split_and(command) is None
+    assert split_and('echo "$HOME"') is None
+    assert split_and("echo '$HOME'") == ["echo '$HOME'"]
+    assert split_and("echo 'unclosed") is None
+
+
+def test_parse_plan() -> None:
+    command = "git commit -m 'a && b' && git push && git push --tags && git log -1"
+    plan = Plan.parse(command)
+    assert str(plan) == command
+    assert [s.argv for s in plan.steps] == [
+        ["git", "commit", "-m", "a && b"],
+        ["git", "push"],
+        ["git", "push", "--tags"],
+        ["git", "log", "-1"],
+    ]
+    # `git push --tags` must not run if `git push` is rejected
+    assert plan.waves() == [[0], [1], [2], [3]]
+    assert plan.describe()[-1] == "  [4] git log -1  (after 3)"
+    # Command that need shell is kept as one step
+    plan = Plan.parse("uv export -o a.txt && FOO=1 pip install -r a.txt")
+    assert len(plan) == 1
+    assert plan.steps[0].argv is None
+    assert plan.describe() == [
+        "  [1] uv export -o a.txt && FOO=1 pip install -r a.txt  (by shell)"
+    ]
+    assert len(Plan.parse("")) == 0
+
+
+def test_dry_run_plan(capsys) -> None:
+    plan = Plan()
+    first = plan.add("ruff format --check .")
+    plan.add("mypy .", [first])
+    plan.add("bandit -r .", [first])
+    plan.finish(dry=True)
+    assert capsys.readouterr().out == (
+        "--> ruff format --check . && mypy . && bandit -r .\n"
+        "Plan:\n"
+        "  [1] ruff format --check .\n"
+        "  [2] mypy .  (after 1)\n"
+        "  [3] bandit -r .  (after 1)\n"
+    )
+    Plan.parse("uv lock && uv sync").finish(dry=True)
+    assert capsys.readouterr().out == "--> uv lock && uv sync\n"
+
+
+def test_execute_plan(tmp_work_dir, capsys, mocker) -> None:
+    python = sys.executable.replace("\\", "/")
+    plan = Plan()
+    first = plan.add(f"{python} -c \"open('a.txt', 'w').write('a')\"")
+    plan.add(f"{python} -c \"print(open('a.txt').read() + 'b')\"")
+    plan.add(f"{python} -c \"print(open('a.txt').read() + 'c')\"", [first])
+    assert plan.waves() == [[0], [1, 2]]
+    spy = mocker.spy(Shell, "run_by_subprocess")
+    assert plan.finish() == 0
+    out = capsys.readouterr().out
+    assert "ab\n" in out and "ac\n" in out
+    # Run directly, not by shell
+    assert all(isinstance(c.args[0], list) for c in spy.call_args_list)
+    plan = Plan.parse(f"{python} -c 'exit(3)' && {python} -c 'exit(0)'")
+    assert plan.execute() == 3
+    with pytest.raises(Exit):
+        plan.finish()
+    assert Plan.parse("not-exist-command-xxx --version").execute() == 127
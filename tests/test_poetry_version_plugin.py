@@ -78,7 +78,8 @@ def test_version_plugin(mark, tmp_path: Path) -> None:
     project_path = tmp_path / "helloworld"
     with _prepare_package(project_path, mark=mark) as init_file:
         command = _build_bump_cmd(init_file, project_path, should_sync=True)
-        assert BumpUp(part="patch", commit=False, dry=True).gen() == command
+        bump_up = BumpUp(part="patch", commit=False, dry=True, bumpversion=True)
+        assert bump_up.gen() == command
         run_and_echo("poetry run fast bump patch")
         assert init_file.read_text() == '__version__ = "0.0.2"\n'
         init_file.unlink()
@@ -91,7 +92,8 @@ def test_version_plugin_include_defined(mark, tmp_path: Path) -> None:
     project_path = tmp_path / "hello world"
     with _prepare_package(project_path, True, mark=mark) as init_file:
         command = _build_bump_cmd(init_file, project_path, should_sync=True)
-        assert BumpUp(part="patch", commit=False, dry=True).gen() == command
+        bump_up = BumpUp(part="patch", commit=False, dry=True, bumpversion=True)
+        assert bump_up.gen() == command
         run_and_echo("poetry run fast bump patch")
         assert init_file.read_text() == '__version__ = "0.0.2"\n'
 
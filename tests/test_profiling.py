@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from fast_dev_cli.cli import (
+    TOML_FILE,
+    Profiler,
+    Project,
+    ProjectContext,
+    capture_cmd_output,
+    common,
+    profiled,
+    run_parallel,
+)
+
+
+@pytest.fixture
+def profiler():
+    yield Profiler
+    Profiler.disable()
+
+
+def test_profile_report(tmp_work_dir: Path, profiler, capsys, monkeypatch) -> None:
+    @profiled("foo")
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    assert add(1, 2) == 3
+    capture_cmd_output("echo hi")
+    assert profiler.records == []
+    monkeypatch.setenv("FASTDEVCLI_PROFILE", "1")
+    common(version=False, profile=False)
+    assert profiler.enabled
+    Path(TOML_FILE).write_text('[project]\nname = "foo"\n')
+    assert add(1, 2) == 3
+    assert capture_cmd_output(["echo", "a b"]) == "a b"
+    ProjectContext.clear()
+    assert Project.get_manage_tool() is None
+    rows = {(phase, label): calls for phase, label, calls, _ in profiler.summary()}
+    assert rows[("foo", "test_profile_report.<locals>.add")] == 1
+    assert rows[("subprocess", "echo 'a b'")] == 1
+    assert rows[("detect", "ProjectContext.current")] >= 1
+    assert rows[("toml", str(tmp_work_dir / TOML_FILE))] == 1
+    profiler.report(limit=2)
+    err = capsys.readouterr().err
+    assert "Phase" in err
+    assert "more" in err
+    assert "(wall time)" in err
+
+
+def test_trace_file(tmp_work_dir: Path, profiler, capsys) -> None:
+    trace_file = tmp_work_dir / "trace/fast.json"
+    common(version=False, profile=False, trace_file=str(trace_file))
+    assert profiler.enabled
+    run_parallel(["echo a", "echo bb"])
+    assert capture_cmd_output("exit 3", shell=True) == ""
+    profiler.finish()
+    assert capsys.readouterr().err == ""
+    data = json.loads(trace_file.read_text())
+    events = [e for e in data["traceEvents"] if e["ph"] == "X"]
+    assert [e["cat"] for e in events[:2]] == ["startup", "command"]
+    subprocesses = {e["name"]: e for e in events if e["cat"] == "subprocess"}
+    assert subprocesses["echo a"]["args"]["output_bytes"] == 2
+    assert subprocesses["exit 3"]["args"]["returncode"] == 3
+    assert subprocesses["exit 3"]["tid"] == 0
+    lanes = {subprocesses[i]["tid"] for i in ("echo a", "echo bb")}
+    assert len(lanes) == 2 and 0 not in lanes
+    assert all(isinstance(e["args"]["pid"], int) for e in subprocesses.values())
+    names = {e["args"]["name"] for e in data["traceEvents"] if e["ph"] == "M"}
+    assert {"fast", "main", "worker-1", "worker-2"} <= names
@@ -3,7 +3,14 @@ from pathlib import Path
 
 import pytest
 
-from fast_dev_cli.cli import Exit, UvPypi, pypi, run_and_echo
+from fast_dev_cli.cli import (
+    Exit,
+    LockRewriter,
+    UvPypi,
+    find_lock_files,
+    pypi,
+    run_and_echo,
+)
 
 ASSERTS_DIR = Path(__file__).parent / "assets"
 
@@ -47,12 +54,12 @@ def test_pypi(tmp_work_dir, capsys):
     shutil.copy(uv_tx, ".")
     text = lock_file.read_text("utf-8")
     with pytest.raises(Exit):
-        pypi(uv_tx.name)
+        pypi([uv_tx.name])
     new_text = lock_file.read_text("utf-8")
     shutil.copy(uv_tx, ".")
-    pypi(uv_tx.name, quiet=True)
+    pypi([uv_tx.name], quiet=True)
     assert new_text == lock_file.read_text("utf-8")
-    pypi(uv_tx.name)
+    pypi([uv_tx.name])
     assert new_text == lock_file.read_text("utf-8")
 
 
@@ -116,3 +123,74 @@ def test_pypi_reverse(tmp_work_dir, mocker, capsys):
         "Skip register reverse as global uv config file not found."
         in capsys.readouterr().out
     )
+
+
+def test_lock_rewriter(tmp_work_dir, capsys):
+    lines = [
+        'source = { registry = "https://mirror.com/simple" }\n',
+        (
+            'sdist = { url = "https://mirror.com/packages/a.tar.gz", size = 1,'
+            ' upload-time = "2025-01-01T00:00:00Z" }\n'
+        ),
+        'name = "url = registry"\n',
+    ]
+    rewriter = LockRewriter(UvPypi.PYPI, UvPypi.HOST, slim=True)
+    assert list(rewriter.rewrite(lines)) == [
+        f'source = {{ registry = "{UvPypi.PYPI}" }}\n',
+        f'sdist = {{ url = "{UvPypi.HOST}/packages/a.tar.gz" }}\n',
+        lines[2],
+    ]
+    assert rewriter.check(verbose=True) is False
+    out = capsys.readouterr().out
+    assert f"https://mirror.com/simple --> {UvPypi.PYPI}" in out
+    assert f"https://mirror.com --> {UvPypi.HOST}" in out
+    with pytest.raises(ValueError, match="Failed to find pattern"):
+        LockRewriter(UvPypi.PYPI, UvPypi.HOST).check()
+    # Rewrite to temp file, then rename to the lock file
+    lock_file = Path("uv.lock")
+    lock_file.write_text("".join(lines))
+    lock_file.chmod(0o600)
+    assert UvPypi.update_lock(lock_file, verbose=False, quiet=True) == 0
+    assert UvPypi.PYPI in lock_file.read_text()
+    assert lock_file.stat().st_mode & 0o777 == 0o600
+    assert [p.name for p in Path().iterdir()] == ["uv.lock"]
+
+
+def test_pypi_batch(tmp_work_dir, capsys):
+    Path("pyproject.toml").touch()
+    for name in ("a", "b/c", ".venv", "node_modules/x"):
+        Path(name).mkdir(parents=True)
+        shutil.copy(ASSERTS_DIR / "uv.lock", Path(name, "uv.lock"))
+    Path("b/c/bad.lock").write_text("x = 1\n")
+    assert find_lock_files([], recursive=True) == [
+        Path("a/uv.lock"),
+        Path("b/c/uv.lock"),
+    ]
+    assert find_lock_files(["b/**/*.lock", "a", "a/uv.lock", "missing"]) == [
+        Path("b/c/bad.lock"),
+        Path("b/c/uv.lock"),
+        Path("a/uv.lock"),
+    ]
+    assert "'missing' not found!" in capsys.readouterr().out
+    with pytest.raises(Exit):
+        pypi(["a", "b/c"])
+    out = capsys.readouterr().out
+    assert "a/uv.lock    yes" in out and "b/c/uv.lock  yes" in out
+    assert "2 of 2 lock files changed, 0 failed." in out
+    assert "pypi.org" in Path("b/c/uv.lock").read_text()
+    assert "tsinghua" in Path(".venv/uv.lock").read_text()
+    pypi(recursive=True, quiet=True)
+    assert "0 of 2 lock files changed, 0 failed." in capsys.readouterr().out
+    with pytest.raises(Exit):
+        pypi(["a", "b/c/bad.lock"], quiet=True)
+    assert "b/c/bad.lock  error: Failed to find pattern" in capsys.readouterr().out
+    # A single glob or directory is expanded as well
+    shutil.copy(ASSERTS_DIR / "uv.lock", "b/c/uv.lock")
+    pypi(["b/*/uv.lock"], quiet=True)
+    assert "1 of 1 lock files changed, 0 failed." in capsys.readouterr().out
+    assert "pypi.org" in Path("b/c/uv.lock").read_text()
+    pypi(["a"], quiet=True)
+    assert "0 of 1 lock files changed, 0 failed." in capsys.readouterr().out
+    with pytest.raises(Exit):
+        pypi(["*/uv.lock.bak"])
+    assert "No lock files found!" in capsys.readouterr().out
@@ -5,6 +5,7 @@ import functools
 from asynctor.compat import chdir
 
 import fast_dev_cli.cli
+import fast_dev_cli.commands
 from fast_dev_cli.cli import dev, main, run_and_echo, runserver
 
 
@@ -142,9 +143,9 @@ def test_run_by_module(tmp_path):
 
 
 def test_main(mocker):
-    mocker.patch("fast_dev_cli.cli.cli")
+    mocker.patch("fast_dev_cli.commands.cli")
     main()
-    fast_dev_cli.cli.cli.assert_called_once()  # type:ignore
+    fast_dev_cli.commands.cli.assert_called_once()  # type:ignore
 
 
 def test_invalid_justfile(tmp_work_dir):
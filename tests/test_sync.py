@@ -43,7 +43,7 @@ def is_pip_installed() -> bool:
 
 
 def test_sync_not_in_venv(mocker, capsys):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=False)
+    mocker.patch("fast_dev_cli.commands.sync.is_venv", return_value=False)
     test_dir = Path(__file__).parent
     with temp_file(TOML_FILE, TOML_TEXT), chdir(test_dir):
         cmd = Sync("req.txt", "all", save=False, dry=True).gen()
@@ -72,7 +72,7 @@ def test_sync_not_in_venv(mocker, capsys):
 
 
 def test_sync(mocker):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+    mocker.patch("fast_dev_cli.commands.sync.is_venv", return_value=True)
     test_dir = Path(__file__).parent
     with temp_file(TOML_FILE, TOML_TEXT), chdir(test_dir):
         cmd = Sync("req.txt", "all", save=False, dry=True).gen()
@@ -210,7 +210,7 @@ wheels = [
 
 
 def test_sync_uv(mocker, tmp_path):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=False)
+    mocker.patch("fast_dev_cli.commands.sync.is_venv", return_value=False)
     with chdir(tmp_path):
         toml = tmp_path / TOML_FILE
         toml.write_text(UV_TOML_EXAMPLE)
@@ -227,14 +227,14 @@ def test_sync_uv(mocker, tmp_path):
 
 
 def test_sync_no_tool(mocker, tmp_path):
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=False)
+    mocker.patch("fast_dev_cli.commands.sync.is_venv", return_value=False)
     with chdir(tmp_path):
         with pytest.raises(EnvError):
             Sync("req.txt", "", True, dry=True).gen()
         Path("req.txt").write_text("six")
         with pytest.raises(EnvError):
             Sync("req.txt", "", True, dry=True).gen()
-        mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+        mocker.patch("fast_dev_cli.commands.sync.is_venv", return_value=True)
         assert (
             Sync("req.txt", "", True, dry=True).gen()
             == "python -m pip install -r req.txt"
@@ -243,7 +243,7 @@ def test_sync_no_tool(mocker, tmp_path):
 
 def test_sync_quotes_shell_arguments(mocker, tmp_path):
     mocker.patch("fast_dev_cli.cli.Project.get_manage_tool", return_value="poetry")
-    mocker.patch("fast_dev_cli.cli.is_venv", return_value=True)
+    mocker.patch("fast_dev_cli.commands.sync.is_venv", return_value=True)
     mocker.patch(
         "fast_dev_cli.cli.UpgradeDependencies.should_with_dev", return_value=True
     )
@@ -39,7 +39,9 @@ def test_echo_when_not_dry(mocker, capsys):
 def test_tag_quotes_message(mocker):
     message = "release $(echo injected) & next"
     git_tag = GitTag(message, dry=True)
-    mocker.patch("fast_dev_cli.cli.get_current_version", return_value=(False, "1.2.3"))
+    mocker.patch(
+        "fast_dev_cli.commands.tag.get_current_version", return_value=(False, "1.2.3")
+    )
     mocker.patch.object(git_tag, "has_v_prefix", return_value=False)
     mocker.patch.object(git_tag, "should_push", return_value=False)
     tag_command = git_tag.gen().split(" && ", 1)[0]
@@ -67,9 +69,9 @@ def _clear_tags():
 
 def test_with_push(mocker):
     git_tag = GitTag("", dry=True)
-    mocker.patch.object(git_tag, "git_status", return_value="git push")
+    mocker.patch.object(git_tag, "should_push", return_value=False)
     should_sync, version = get_current_version(check_version=True)
-    prefix = "v" if "v" in capture_cmd_output(["git", "tag"]) else ""
+    prefix = "v" if capture_cmd_output(["git", "tag", "-l", "v[0-9]*"]) else ""
     sync = "pdm sync --prod"
     push = "git push --tags"
     expected = f"git tag -a {prefix}{version} -m '' && {push}"
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+
+from fast_dev_cli.cli import ToolRegistry, doctor
+
+
+@pytest.fixture
+def fake_env(tmp_work_dir: Path, monkeypatch) -> Generator[Path]:
+    bin_dir = tmp_work_dir / "env" / "bin"
+    site = tmp_work_dir / "env" / "lib" / "python3.11" / "site-packages"
+    site.joinpath("my_tool-1.2.3.dist-info").mkdir(parents=True)
+    site.joinpath("my_mod").mkdir()
+    bin_dir.mkdir()
+    for name, text in (("my-tool", "exit 1"), ("other", "echo 'other 0.3.1rc1'")):
+        exe = bin_dir / name
+        exe.write_text(f"#!/bin/sh\n{text}\n")
+        exe.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    ToolRegistry.clear()
+    yield bin_dir
+    ToolRegistry.clear()
+
+
+def test_which_cached_by_fingerprint(fake_env: Path, mocker) -> None:
+    which = mocker.spy(shutil, "which")
+    assert ToolRegistry.which("my-tool") == str(fake_env / "my-tool")
+    assert ToolRegistry.is_installed("my-tool")
+    assert not ToolRegistry.is_installed("not-exist-tool")
+    assert which.call_count == 2
+    # Read from the cache file by another process
+    ToolRegistry.clear()
+    assert ToolRegistry.is_installed("my-tool")
+    assert which.call_count == 2
+    # Installing a tool changes the mtime of PATH directory
+    fingerprint = ToolRegistry.fingerprint()
+    fake_env.joinpath("new-tool").touch()
+    os.utime(fake_env, ns=(0, 0))
+    ToolRegistry.clear()
+    assert ToolRegistry.fingerprint() != fingerprint
+    assert ToolRegistry.is_installed("my-tool")
+    assert which.call_count == 3
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="shell script as executable")
+def test_resolve_version(fake_env: Path, mocker) -> None:
+    capture = mocker.spy(sys.modules["fast_dev_cli.cache"], "capture_cmd_output")
+    tool = ToolRegistry.resolve("my-tool")
+    assert (tool.version, tool.source) == ("1.2.3", "metadata")
+    assert ToolRegistry.resolve("my-tool").source == "cache"
+    # Fallback to run `<tool> --version` when there is no metadata
+    tool = ToolRegistry.resolve("other")
+    assert (tool.version, tool.source) == ("0.3.1rc1", "--version")
+    assert ToolRegistry.version("other") == "0.3.1rc1"
+    assert capture.call_count == 1
+    tool = ToolRegistry.resolve("not-exist-tool")
+    assert (tool.path, tool.version) == (None, "")
+
+
+def test_has_module(fake_env: Path) -> None:
+    python = str(fake_env / "python")
+    assert ToolRegistry.has_module("my_mod", python)
+    assert ToolRegistry.has_module("my_tool", python)
+    assert not ToolRegistry.has_module("pytest", python)
+    assert ToolRegistry.has_module("pytest", sys.executable)
+    assert not ToolRegistry.has_module("not_exist_module", sys.executable)
+
+
+def test_doctor(fake_env: Path, capsys) -> None:
+    doctor()
+    out = capsys.readouterr().out
+    assert out.splitlines()[0].split() == ["Tool", "Version", "Source", "ms", "Path"]
+    assert "git " in out
+    assert f"PATH fingerprint: {ToolRegistry.fingerprint()}" in out
+    assert "Resolved 12 tools in " in out
@@ -3,20 +3,25 @@ from __future__ import annotations
 from contextlib import redirect_stdout
 from io import StringIO
 from pathlib import Path
+from typing import Any
 
 import pytest
 from typer import Exit
 from typer.colors import YELLOW
 
-import fast_dev_cli
+import fast_dev_cli.commands.upgrade
 from fast_dev_cli.cli import (
     TOML_FILE,
+    Dependency,
     Project,
     UpgradeDependencies,
     capture_cmd_output,
+    load_dependencies,
     run_and_echo,
+    tomllib,
     upgrade,
 )
+from fast_dev_cli.commands.upgrade import python_lower_bound
 
 from .utils import chdir, prepare_poetry_project
 
@@ -111,18 +116,54 @@ def _test_dev_flag(poetry):
         assert UpgradeDependencies.should_with_dev()
 
 
-def test_parse_item():
+def test_load_dependencies():
     segment = """
 [tool.poetry.dependencies]
 bumpversion = "*"
-fastapi = {extras = ["all"], version = "*"}
+fastapi = {version = "^0.110.0", extras = [
+    "all",
+    "standard",
+], source = "jumping"}
+
+[project]
+dependencies = [
+    "typer[all] (>=0.12.3,<0.13.0); python_version>'3.8'",
+    "httpx @ https://example.com/httpx-0.27.0.whl",
+]
 
 [tool.isort]
     """.strip()
-    assert UpgradeDependencies.parse_item(segment) == [
-        'bumpversion = "*"',
-        'fastapi = {extras = ["all"], version = "*"}',
-    ]
+    bumpversion, fastapi, typer, httpx = load_dependencies(tomllib.loads(segment))
+    assert bumpversion == Dependency(
+        "bumpversion",
+        "*",
+        table="tool.poetry.dependencies",
+        text='bumpversion = "*"',
+    )
+    assert (fastapi.constraint, fastapi.extras, fastapi.source) == (
+        "^0.110.0",
+        ("all", "standard"),
+        "jumping",
+    )
+    assert str(fastapi) == (
+        'fastapi = {version = "^0.110.0", extras = ["all", "standard"],'
+        ' source = "jumping"}'
+    )
+    assert not fastapi.upgradable
+    assert (typer.constraint, typer.extras, typer.markers) == (
+        ">=0.12.3,<0.13.0",
+        ("all",),
+        "python_version>'3.8'",
+    )
+    assert typer.raised("0.15.2") == ">=0.15.2,<0.16.0"
+    assert typer.requirement(">=0.15.2,<0.16.0") == (
+        "typer[all] (>=0.15.2,<0.16.0); python_version>'3.8'"
+    )
+    assert typer.raised("0.12.3") is None
+    assert (httpx.url, httpx.upgradable) == (
+        "https://example.com/httpx-0.27.0.whl",
+        False,
+    )
 
 
 def test_get_args_hard(tmp_poetry_project):
@@ -314,9 +355,155 @@ def test_upgrade_unknown_tool(mocker):
     assert expected in capture_cmd_output("pdm run " + cmd)
     assert run_and_echo(cmd, verbose=False) == 1
     assert run_and_echo("pdm run " + cmd, verbose=False) == 1
-    mocker.patch("fast_dev_cli.cli.secho")
+    mocker.patch("fast_dev_cli.commands.upgrade.secho")
     with pytest.raises(Exit):
         upgrade(tool="pipenv")
-    fast_dev_cli.cli.secho.assert_called_once_with(  # type:ignore
+    fast_dev_cli.commands.upgrade.secho.assert_called_once_with(  # type:ignore
         "Unknown tool 'pipenv'", fg=YELLOW
     )
+
+
+def test_upgrade_rewrite(tmp_poetry_project, mocker, capsys):
+    text = Path(TOML_FILE).read_text()
+    latest = {"ruff": "0.9.1", "typer": "0.15.2", "mypy": "1.10.0", "pytest": "8.3.4"}
+
+    def fetch(self, name):
+        files: list[dict[str, Any]] = [
+            {"filename": f"{name}-{latest.get(name, '0.0.1')}.tar.gz"}
+        ]
+        files += [{"filename": f"{name}-99.0.tar.gz", "yanked": True}]
+        return {"versions": ["9.0.0rc1"], "files": files}
+
+    mocker.patch("fast_dev_cli.index.PackageIndex.fetch", fetch)
+    execute = mocker.patch("fast_dev_cli.plan.Plan.execute", return_value=0)
+    UpgradeDependencies(tool="poetry", rewrite=True, dry=True).run()
+    out = capsys.readouterr().out
+    assert "ruff: ^0.4.4 → ^0.9.1" in out
+    assert "mypy: " not in out
+    assert "--> poetry update" in out
+    assert Path(TOML_FILE).read_text() == text
+    execute.assert_not_called()
+    UpgradeDependencies(tool="poetry", rewrite=True).run()
+    execute.assert_called_once()
+    new_text = Path(TOML_FILE).read_text()
+    assert 'ruff = {version = "^0.9.1", optional = true}' in new_text
+    assert 'ruff = "^0.9.1"' in new_text
+    assert 'typer = "^0.15.2"' in new_text
+    assert 'click = ">=7.1.1"' in new_text
+    assert new_text.count("\n") == text.count("\n")
+
+
+def test_upgrade_rewrite_requires_python(tmp_work_dir, mocker, capsys):
+    Path(TOML_FILE).write_text(
+        '[tool.poetry]\nname = "foo"\n\n[tool.poetry.dependencies]\n'
+        'python = "^3.10"\nnumpy = "^1.26.0"\n'
+    )
+    files = [
+        {"filename": "numpy-2.2.6.tar.gz", "requires-python": ">=3.10"},
+        {
+            "filename": "numpy-2.3.0-cp311-cp311-linux_x86_64.whl",
+            "requires-python": ">=3.11",
+        },
+        {"filename": "numpy-2.3.0.tar.gz", "requires-python": ">=3.11"},
+    ]
+    mocker.patch("fast_dev_cli.index.PackageIndex.fetch", return_value={"files": files})
+    UpgradeDependencies(tool="poetry", rewrite=True, dry=True).run()
+    assert "numpy: ^1.26.0 → ^2.2.6" in capsys.readouterr().out
+    assert python_lower_bound({"project": {"requires-python": ">=3.11,<4"}}) == (3, 11)
+    assert python_lower_bound({}) is None
+
+
+def test_upgrade_plan(tmp_poetry_project, monkeypatch, capsys):
+    stand_in = Path("versions.json")
+    stand_in.write_text('{"ruff": ["0.4.4", "0.9.1"], "pytest-mock": ["3.14.0"]}')
+    monkeypatch.setenv("FASTDEVCLI_INDEX_URL", str(stand_in.absolute()))
+    text = Path(TOML_FILE).read_text()
+    UpgradeDependencies(tool="poetry", show_plan=True, dry=True).run()
+    out = capsys.readouterr().out
+    assert out.splitlines()[-4].split() == [
+        "Package",
+        "Group",
+        "Current",
+        "Latest",
+        "Proposed",
+    ]
+    rows = [line.split() for line in out.splitlines()[-3:-1]]
+    assert rows == [
+        ["ruff", "main", "^0.4.4", "0.9.1", "^0.9.1"],
+        ["ruff", "dev", "^0.4.4", "0.9.1", "^0.9.1"],
+    ]
+    assert "2 constraints to raise, planned in " in out
+    assert "pytest-mock " not in out
+    assert Path(TOML_FILE).read_text() == text
+
+
+PEP621_CONTENT = """
+[project]
+name = "demo"
+version = "0.1.0"
+dependencies = [
+    "typer[all]>=0.12.3",
+    "click (>=7.1.1,<8.0.0)",
+    "anyio",
+    "mylib>=0.1",
+]
+
+[project.optional-dependencies]
+mysql = ["aiomysql~=0.2.0; sys_platform != 'win32'"]
+
+[dependency-groups]
+dev = ["ruff==0.4.4", {include-group = "lint"}]
+lint = ["ruff==0.4.4", "mypy>=1.10,<2"]
+
+[tool.uv.sources]
+mylib = { path = "../mylib" }
+"""
+
+
+def test_upgrade_pep621_project(tmp_work_dir, monkeypatch, capsys):
+    Path(TOML_FILE).write_text(PEP621_CONTENT)
+    stand_in = Path("versions.json")
+    stand_in.write_text(
+        '{"typer": ["0.15.2"], "click": ["8.1.8"], "anyio": ["4.8.0"],'
+        ' "aiomysql": ["0.2.0"], "ruff": ["0.9.1"], "mypy": ["1.15.0"]}'
+    )
+    monkeypatch.setenv("FASTDEVCLI_INDEX_URL", str(stand_in.absolute()))
+    UpgradeDependencies(tool="uv", show_plan=True).run()
+    out = capsys.readouterr().out
+    assert [line.split() for line in out.splitlines()[-6:-1]] == [
+        ["Package", "Group", "Current", "Latest", "Proposed"],
+        ["typer", "main", ">=0.12.3", "0.15.2", ">=0.15.2"],
+        ["click", "main", ">=7.1.1,<8.0.0", "8.1.8", ">=8.1.8,<9.0.0"],
+        ["ruff", "dev", "==0.4.4", "0.9.1", "==0.9.1"],
+        ["ruff", "lint", "==0.4.4", "0.9.1", "==0.9.1"],
+    ]
+    assert "mylib" not in out
+    assert Path(TOML_FILE).read_text() == PEP621_CONTENT
+    up = UpgradeDependencies(tool="uv", rewrite=True)
+    assert up.gen().startswith("uv lock --upgrade --verbose && uv sync ")
+    up.rewrite()
+    assert Path(TOML_FILE).read_text() == (
+        PEP621_CONTENT.replace("typer[all]>=0.12.3", "typer[all]>=0.15.2")
+        .replace("(>=7.1.1,<8.0.0)", "(>=8.1.8,<9.0.0)")
+        .replace("ruff==0.4.4", "ruff==0.9.1")
+    )
+
+
+def test_raise_multiline_constraint():
+    text = """
+[tool.poetry.dependencies]
+python = "^3.8"
+fastapi = {version = "^0.110.0", extras = [
+    "all",
+]}
+"ruff" = '^0.4.4'  # lint
+"""
+    assert UpgradeDependencies.get_args(text)[0] == [
+        '"fastapi[all]@latest"',
+        '"ruff@latest"',
+    ]
+    new_text, changes = UpgradeDependencies.raise_constraints(
+        text, {"fastapi": "0.115.6", "ruff": "0.9.1", "python": "3.13.1"}
+    )
+    assert new_text == text.replace("^0.110.0", "^0.115.6").replace("^0.4.4", "^0.9.1")
+    assert [c.name for c in changes] == ["fastapi", "ruff"]
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from fast_dev_cli.cli import TOML_FILE, FileWatcher, rerun
+
+
+def _touch(path: Path, text: str = "") -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def test_watcher_ignores(tmp_work_dir: Path) -> None:
+    Path(".gitignore").write_text("# comment\n*.log\n/build/\n!keep.log\n")
+    Path(TOML_FILE).write_text(
+        '[project]\nname = "foo"\n'
+        '[tool.pdm.build]\nexcludes = ["./tests", "docs/*.md"]\n'
+    )
+    for name in ("a.py", "b.log", "build/c.py", "tests/test_a.py", "docs/d.md"):
+        _touch(Path(name))
+    watcher = FileWatcher(tmp_work_dir)
+    assert watcher.patterns == ["*.log", "/build", "tests", "docs/*.md"]
+    assert sorted(watcher.snapshot()) == [".gitignore", "a.py", TOML_FILE]
+    watcher = FileWatcher(tmp_work_dir, keep=("tests",))
+    assert "tests/test_a.py" in watcher.snapshot()
+
+
+def test_watcher_skips_hidden_dirs(tmp_work_dir: Path) -> None:
+    for name in (".venv/lib/a.py", ".mypy_cache/b.json", ".tox/c.py", "src/.x/d.py"):
+        _touch(Path(name))
+    _touch(Path("src/e.py"))
+    assert sorted(FileWatcher(tmp_work_dir).snapshot()) == ["src/e.py"]
+
+
+def test_watcher_poll(tmp_work_dir: Path) -> None:
+    _touch(Path("a.py"))
+    _touch(Path("b.py"))
+    watcher = FileWatcher(tmp_work_dir)
+    assert watcher.poll() == []
+    Path("c.py").touch()
+    Path("a.py").write_text("a = 1")
+    Path("b.py").unlink()
+    assert sorted(watcher.poll()) == ["a.py", "b.py", "c.py"]
+    assert watcher.poll() == []
+
+
+def test_watcher_wait(tmp_work_dir: Path) -> None:
+    _touch(Path("a.py"))
+    watcher = FileWatcher(tmp_work_dir, interval=1, debounce=0.1)
+    sleeps: list[float] = []
+    actions = [
+        lambda: None,
+        lambda: Path("b.py").touch(),
+        lambda: Path("a.py").write_text("a = 1"),
+        lambda: None,
+    ]
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        actions.pop(0)()
+
+    assert watcher.wait(sleep=fake_sleep) == ["a.py", "b.py"]
+    assert sleeps == [1, 1, 0.1, 0.1]
+
+
+def test_rerun(tmp_work_dir: Path, mocker) -> None:
+    mock_lint = mocker.patch("fast_dev_cli.commands.watch.LintCode")
+    mock_test = mocker.patch("fast_dev_cli.commands.watch.test")
+    for name in ("a.py", "b.html", "tests/test_a.py"):
+        _touch(Path(name))
+    assert rerun("lint") == 0
+    mock_lint.assert_called_once_with(".", check_only=False)
+    mock_lint.reset_mock()
+    assert rerun("check", ["a.py", "b.html", "gone.py"]) == 0
+    assert [c.args for c in mock_lint.call_args_list] == [(["a.py"],), (["b.html"],)]
+    mock_lint.reset_mock()
+    assert rerun("check", ["gone.py"]) == 0
+    mock_lint.assert_not_called()
+    assert rerun("check", ["a.py", TOML_FILE]) == 0
+    mock_lint.assert_called_once_with(".", check_only=True)
+    assert rerun("test", ["tests/test_a.py"]) == 0
+    mock_test.assert_called_once_with(dry=False, paths=["tests/test_a.py"])
+    mock_test.reset_mock()
+    assert rerun("test", ["a.py", "tests/test_a.py"]) == 0
+    mock_test.assert_called_once_with(dry=False)
+    mock_test.side_effect = SystemExit(2)
+    assert rerun("test", ["a.py"]) == 2
+    assert os.getcwd() == str(tmp_work_dir)